@@ -0,0 +1,294 @@
+# pseint_colombiano/__main__.py
+"""
+Interfaz de línea de comandos de PseudoCol (sin GUI).
+Solo importa `core`, nunca customtkinter, para poder usarse en servidores.
+
+Uso:
+    python -m pseint_colombiano run programa.pseudocol [--entrada datos.txt] [--perfil] [--pilas pilas.txt]
+                                   [--cobertura cobertura.json] [--grabar registro.json]
+                                   [--punto-control estado.bin [--cada N]] [--desde estado.bin]
+    python -m pseint_colombiano reproducir programa.pseudocol registro.json
+    python -m pseint_colombiano calificar entregas/ casos/ [--resultados r.jsonl] [--procesos N]
+                                   [--cobertura cobertura.json] [--cache resultados.sqlite [--cache-max-mb N]]
+    python -m pseint_colombiano servir [--puerto 8080] [--trabajadores 4]
+    python -m pseint_colombiano bench-arranque [--repeticiones 10]
+"""
+import argparse
+import sys
+
+# Códigos de salida (2 lo usa argparse para errores de uso)
+SALIDA_OK = 0
+SALIDA_ERROR_ARCHIVO = 1
+SALIDA_ERROR_LEXICO = 3
+SALIDA_ERROR_SINTACTICO = 4
+SALIDA_ERROR_EJECUCION = 5
+SALIDA_LIMITE_EXCEDIDO = 6
+SALIDA_REPRODUCCION_DIVERGENTE = 7
+
+# Presupuesto de arranque en frío para 'run' (mediana, milisegundos)
+PRESUPUESTO_ARRANQUE_MS = 100
+
+
+def _comando_run(args):
+    from .core.ejecutor import (ejecutar_codigo, LectorEntrada, ESTADO_OK, ESTADO_ERROR_LEXICO,
+                                ESTADO_ERROR_SINTACTICO, ESTADO_LIMITE_EXCEDIDO)
+    from .core.limites import LimitesEjecucion
+    from .core.salida import SalidaBuffer, DestinoEstandar
+
+    try:
+        with open(args.archivo, "r", encoding="utf-8") as f:
+            codigo = f.read()
+        flujo_entrada = open(args.entrada, "r", encoding="utf-8") if args.entrada else sys.stdin
+    except OSError as e:
+        print(f"Error al abrir archivo: {e}", file=sys.stderr)
+        return SALIDA_ERROR_ARCHIVO
+
+    salida = SalidaBuffer(DestinoEstandar())
+    try:
+        limites = LimitesEjecucion(args.max_pasos, args.tiempo_limite, args.max_memoria)
+        if args.grabar or args.punto_control or args.desde:
+            from .core.reproduccion import ejecutar_grabando, Instantanea
+            try:
+                desde = Instantanea.cargar(args.desde) if args.desde else None
+                resultado = ejecutar_grabando(
+                    codigo, LectorEntrada(flujo_entrada), salida, limites, cada=args.cada if args.punto_control else None,
+                    al_capturar=(lambda instantanea: instantanea.guardar(args.punto_control)), desde=desde)
+            except (OSError, ValueError) as e:
+                print(f"Error con la instantánea: {e}", file=sys.stderr)
+                return SALIDA_ERROR_ARCHIVO
+        else:
+            perfilar = args.perfil or args.pilas is not None
+            resultado = ejecutar_codigo(codigo, LectorEntrada(flujo_entrada), salida, limites, perfilar,
+                                        cobertura=args.cobertura is not None)
+    finally:
+        if flujo_entrada is not sys.stdin:
+            flujo_entrada.close()
+
+    for error in resultado.errores:
+        print(error, file=sys.stderr)
+    if resultado.perfil is not None:
+        if args.perfil:
+            print(resultado.perfil.reporte(codigo), file=sys.stderr)
+        if args.pilas is not None:
+            try:
+                with open(args.pilas, "w", encoding="utf-8") as f:
+                    resultado.perfil.escribir_pilas(f)
+            except OSError as e:
+                print(f"Error al escribir las pilas: {e}", file=sys.stderr)
+                return SALIDA_ERROR_ARCHIVO
+    if resultado.registro is not None and args.grabar:
+        try:
+            resultado.registro.guardar(args.grabar)
+        except OSError as e:
+            print(f"Error al escribir el registro: {e}", file=sys.stderr)
+            return SALIDA_ERROR_ARCHIVO
+    if resultado.cobertura is not None:
+        import json
+        try:
+            with open(args.cobertura, "w", encoding="utf-8") as f:
+                json.dump(resultado.mapa_cobertura.reporte(resultado.cobertura), f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"Error al escribir la cobertura: {e}", file=sys.stderr)
+            return SALIDA_ERROR_ARCHIVO
+    if resultado.estado == ESTADO_OK:
+        return SALIDA_OK
+    if resultado.estado == ESTADO_ERROR_LEXICO:
+        return SALIDA_ERROR_LEXICO
+    if resultado.estado == ESTADO_ERROR_SINTACTICO:
+        return SALIDA_ERROR_SINTACTICO
+    if resultado.estado == ESTADO_LIMITE_EXCEDIDO:
+        print(f"Consumo: {resultado.estadisticas}", file=sys.stderr)
+        return SALIDA_LIMITE_EXCEDIDO
+    return SALIDA_ERROR_EJECUCION
+
+
+def _comando_reproducir(args):
+    """Repite una ejecución grabada con --grabar y verifica que dé los mismos pasos y la misma salida."""
+    from .core.ejecutor import analizar, resultado_de_analisis
+    from .core.reproduccion import RegistroReproduccion, reproducir
+    from .core.salida import SalidaBuffer, DestinoEstandar
+
+    try:
+        with open(args.archivo, "r", encoding="utf-8") as f:
+            codigo = f.read()
+        registro = RegistroReproduccion.cargar(args.registro)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error al abrir archivo: {e}", file=sys.stderr)
+        return SALIDA_ERROR_ARCHIVO
+    ast, errores_lexicos, errores_sintacticos = analizar(codigo)
+    resultado = resultado_de_analisis(ast, errores_lexicos, errores_sintacticos)
+    if resultado is not None:
+        for error in resultado.errores:
+            print(error, file=sys.stderr)
+        return SALIDA_ERROR_LEXICO if errores_lexicos else SALIDA_ERROR_SINTACTICO
+    salida = SalidaBuffer(DestinoEstandar())
+    resultado, diferencias = reproducir(ast, registro, salida)
+    salida.cerrar()
+    for error in resultado.errores:
+        print(error, file=sys.stderr)
+    for diferencia in diferencias:
+        print(f"Diferencia: {diferencia}", file=sys.stderr)
+    return SALIDA_REPRODUCCION_DIVERGENTE if diferencias else SALIDA_OK
+
+
+def _comando_calificar(args):
+    import json
+    from .servicio.calificador import Calificador
+
+    calificador = Calificador(procesos=args.procesos, tiempo_limite=args.tiempo_limite,
+                              max_pasos=args.max_pasos, max_memoria=args.max_memoria,
+                              cobertura=args.cobertura is not None, cache=args.cache,
+                              cache_max_bytes=args.cache_max_mb * 1024 * 1024)
+    if args.resultados:
+        with open(args.resultados, "w", encoding="utf-8") as flujo:
+            resumen = calificador.calificar(args.programas, args.casos, flujo)
+    else:
+        resumen = calificador.calificar(args.programas, args.casos, sys.stdout)
+    print(json.dumps({"resumen": resumen}, ensure_ascii=False), file=sys.stderr)
+    if args.cobertura is not None:
+        try:
+            with open(args.cobertura, "w", encoding="utf-8") as f:
+                json.dump(calificador.cobertura, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"Error al escribir la cobertura: {e}", file=sys.stderr)
+            return SALIDA_ERROR_ARCHIVO
+    return SALIDA_OK
+
+
+def _comando_servir(args):
+    from .servicio.pool_trabajadores import PoolTrabajadores, crear_servidor_http
+
+    pool = PoolTrabajadores(num_trabajadores=args.trabajadores, max_ejecuciones=args.max_ejecuciones,
+                            tiempo_limite=args.tiempo_limite, max_pasos=args.max_pasos,
+                            max_memoria=args.max_memoria)
+    servidor = crear_servidor_http(pool, args.host, args.puerto)
+    print(f"Sirviendo POST /ejecutar en http://{args.host}:{servidor.server_address[1]}", file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        pool.cerrar()
+    return SALIDA_OK
+
+
+def _medir_arranque(comando, cwd, repeticiones):
+    """Ejecuta `comando` en procesos nuevos y devuelve la mediana en ms (o None si falla)."""
+    import os
+    import statistics
+    import subprocess
+    import time
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        proceso = subprocess.run(comando, cwd=cwd, stdin=subprocess.DEVNULL,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                 env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"))
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        if proceso.returncode != 0:
+            return None
+    return statistics.median(tiempos)
+
+
+def _comando_bench_arranque(args):
+    """Compara el arranque en frío de la CLI contra la ruta de importación de la GUI."""
+    import os
+    import tempfile
+
+    paquete = os.path.dirname(os.path.abspath(__file__))
+    raiz = os.path.dirname(paquete)
+    with tempfile.NamedTemporaryFile("w", suffix=".pseudocol", delete=False, encoding="utf-8") as f:
+        f.write('ALGORITMO Hola\n    MUESTRE "Hola"\nFINALGORITMO\n')
+        programa = f.name
+    try:
+        mediciones = [
+            ("python (vacío)", [sys.executable, "-c", "pass"], raiz),
+            ("CLI run", [sys.executable, "-m", "pseint_colombiano", "run", programa], raiz),
+            ("importar GUI", [sys.executable, "-c", "import customtkinter, gui.main_window"], paquete),
+        ]
+        resultados = {}
+        for nombre, comando, cwd in mediciones:
+            resultados[nombre] = _medir_arranque(comando, cwd, args.repeticiones)
+            valor = f"{resultados[nombre]:.1f} ms" if resultados[nombre] is not None else "no disponible"
+            print(f"{nombre:<16} mediana de {args.repeticiones}: {valor}")
+    finally:
+        os.remove(programa)
+
+    cli = resultados["CLI run"]
+    if cli is None or cli > PRESUPUESTO_ARRANQUE_MS:
+        print(f"Arranque de la CLI fuera del presupuesto ({PRESUPUESTO_ARRANQUE_MS} ms).", file=sys.stderr)
+        return 1
+    return SALIDA_OK
+
+
+def _agregar_opciones_limites(parser, tiempo_por_defecto=5.0):
+    parser.add_argument("--tiempo-limite", type=float, default=tiempo_por_defecto,
+                        help="Segundos de reloj máximos por ejecución")
+    parser.add_argument("--max-pasos", type=int, default=None, help="Sentencias ejecutadas como máximo")
+    parser.add_argument("--max-memoria", type=int, default=None,
+                        help="Caracteres máximos guardados en variables de texto")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pseint_colombiano",
+                                     description="Ejecuta algoritmos PseudoCol sin interfaz gráfica.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    parser_run = subparsers.add_parser("run", help="Ejecuta un archivo .pseudocol")
+    parser_run.add_argument("archivo", help="Ruta del programa")
+    parser_run.add_argument("--entrada", "-i", help="Archivo con los datos para LEA (por defecto stdin)")
+    parser_run.add_argument("--perfil", action="store_true",
+                            help="Muestra en stderr las líneas y nodos que más tiempo consumen")
+    parser_run.add_argument("--pilas", metavar="ARCHIVO",
+                            help="Escribe las pilas colapsadas del perfil (para flamegraph.pl o speedscope)")
+    parser_run.add_argument("--cobertura", metavar="ARCHIVO",
+                            help="Escribe en JSON las líneas y ramas de SI/SINO ejecutadas")
+    parser_run.add_argument("--grabar", metavar="ARCHIVO",
+                            help="Graba las entradas de LEA, los pasos y el hash de la salida para reproducir la ejecución")
+    parser_run.add_argument("--punto-control", metavar="ARCHIVO",
+                            help="Guarda una instantánea del estado cada --cada pasos (reemplaza la anterior)")
+    parser_run.add_argument("--cada", type=int, default=100_000, help="Pasos entre puntos de control")
+    parser_run.add_argument("--desde", metavar="ARCHIVO",
+                            help="Continúa desde una instantánea; --entrada debe ser la de la ejecución original")
+    _agregar_opciones_limites(parser_run, tiempo_por_defecto=None)
+    parser_run.set_defaults(funcion=_comando_run)
+
+    parser_reproducir = subparsers.add_parser("reproducir", help="Repite una ejecución grabada y verifica que sea idéntica")
+    parser_reproducir.add_argument("archivo", help="Ruta del programa")
+    parser_reproducir.add_argument("registro", help="Registro escrito con run --grabar")
+    parser_reproducir.set_defaults(funcion=_comando_reproducir)
+
+    parser_calificar = subparsers.add_parser("calificar", help="Califica un directorio de programas contra casos de prueba")
+    parser_calificar.add_argument("programas", help="Directorio con archivos .pseudocol")
+    parser_calificar.add_argument("casos", help="Directorio con pares <caso>.in / <caso>.out")
+    parser_calificar.add_argument("--resultados", "-o", help="Archivo JSON lines de resultados (por defecto stdout)")
+    parser_calificar.add_argument("--procesos", "-j", type=int, default=None, help="Procesos trabajadores (por defecto, uno por núcleo)")
+    parser_calificar.add_argument("--cobertura", metavar="ARCHIVO",
+                                  help="Escribe en JSON la cobertura fusionada por programa y los casos que bastan para lograrla")
+    parser_calificar.add_argument("--cache", metavar="ARCHIVO",
+                                  help="Caché SQLite de resultados: no repite programas deterministas con la misma entrada")
+    parser_calificar.add_argument("--cache-max-mb", type=int, default=256,
+                                  help="Tamaño máximo del caché; se descartan los resultados usados hace más tiempo (por defecto 256)")
+    _agregar_opciones_limites(parser_calificar)
+    parser_calificar.set_defaults(funcion=_comando_calificar)
+
+    parser_servir = subparsers.add_parser("servir", help="Servidor HTTP local con un pool de trabajadores precalentados")
+    parser_servir.add_argument("--host", default="127.0.0.1")
+    parser_servir.add_argument("--puerto", type=int, default=8080)
+    parser_servir.add_argument("--trabajadores", type=int, default=4)
+    parser_servir.add_argument("--max-ejecuciones", type=int, default=500, help="Ejecuciones antes de reciclar un trabajador")
+    _agregar_opciones_limites(parser_servir)
+    parser_servir.set_defaults(funcion=_comando_servir)
+
+    parser_bench = subparsers.add_parser("bench-arranque", help="Mide el arranque en frío de la CLI y de la GUI")
+    parser_bench.add_argument("--repeticiones", type=int, default=10)
+    parser_bench.set_defaults(funcion=_comando_bench_arranque)
+
+    args = parser.parse_args(argv)
+    return args.funcion(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# pseint_colombiano/core/analisis_fondo.py
+"""
+Análisis léxico y sintáctico en segundo plano, para diagnósticos en vivo.
+
+solicitar(codigo) no bloquea: deja el código como único trabajo pendiente
+(si había otro sin empezar, se descarta) y un hilo trabajador lo analiza.
+Si llega una solicitud nueva mientras se analiza una vieja, el parser la
+abandona en la próxima sentencia (Parser.debe_cancelar). Solo se publica el
+resultado de la última versión pedida.
+
+Los resultados se guardan por versión (los últimos MAX_RESULTADOS) con el
+código analizado: resultado_para(codigo) devuelve el análisis de ese texto
+exacto si ya existe, para que ejecutar no vuelva a analizar.
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from .lexer import Lexer
+from .parser import Parser
+from .pseudo_error import PseudoAnalisisCanceladoError
+
+# Resultados que se conservan (por versión del documento)
+MAX_RESULTADOS = 4
+
+
+class ResultadoAnalisis:
+    """Análisis de una versión del documento."""
+    __slots__ = ("version", "codigo", "ast", "errores_lexicos", "errores_sintacticos", "diagnosticos", "duracion")
+
+    def __init__(self, version, codigo, ast, errores_lexicos, errores_sintacticos, diagnosticos, duracion):
+        self.version = version
+        self.codigo = codigo
+        self.ast = ast # None si hubo errores léxicos (como core.ejecutor.analizar)
+        self.errores_lexicos = errores_lexicos
+        self.errores_sintacticos = errores_sintacticos
+        self.diagnosticos = diagnosticos # [pseudo_error.Diagnostico]
+        self.duracion = duracion
+
+    @property
+    def limpio(self):
+        """True si el AST se puede ejecutar."""
+        return self.ast is not None and not self.errores_lexicos and not self.errores_sintacticos
+
+    def __repr__(self):
+        return f"ResultadoAnalisis(version={self.version}, diagnosticos={len(self.diagnosticos)})"
+
+
+def analizar_con_diagnosticos(codigo, version=0, debe_cancelar=None):
+    """Lexer -> Parser como core.ejecutor.analizar, conservando los errores con posición."""
+    inicio = time.perf_counter()
+    lexer = Lexer(codigo)
+    tokens, errores_lexicos = lexer.tokenize()
+    if errores_lexicos:
+        return ResultadoAnalisis(version, codigo, None, errores_lexicos, [], lexer.diagnosticos,
+                                 time.perf_counter() - inicio)
+    if debe_cancelar is not None and debe_cancelar():
+        raise PseudoAnalisisCanceladoError("Análisis cancelado: el código cambió.")
+    parser = Parser(tokens)
+    parser.debe_cancelar = debe_cancelar
+    ast, errores_sintacticos = parser.parse()
+    return ResultadoAnalisis(version, codigo, ast, [], errores_sintacticos, parser.diagnosticos,
+                             time.perf_counter() - inicio)
+
+
+class ServicioAnalisis:
+    """
+    Un hilo trabajador que analiza la última versión pedida. Cada resultado
+    vigente se entrega con publicar(resultado), desde el hilo trabajador (o
+    desde solicitar() si ese texto ya estaba analizado): por defecto va a la
+    queue.SimpleQueue `resultados`.
+    """
+    def __init__(self, publicar=None, max_resultados=MAX_RESULTADOS):
+        self.resultados = queue.SimpleQueue()
+        self.publicar = publicar or self.resultados.put
+        self.max_resultados = max_resultados
+        self._condicion = threading.Condition()
+        self._version = 0            # Última versión pedida
+        self._pendiente = None       # (version, codigo) aún sin empezar
+        self._analizando = False
+        self._cerrado = False
+        self._cache = OrderedDict()  # {version: ResultadoAnalisis}
+        self._hilo = None
+        self.completados = 0
+        self.cancelados = 0
+
+    @property
+    def ocupado(self):
+        """True mientras haya un análisis pendiente o en curso."""
+        return self._pendiente is not None or self._analizando
+
+    def solicitar(self, codigo):
+        """Pide analizar `codigo` y devuelve su número de versión. Nunca espera al análisis."""
+        with self._condicion:
+            self._version += 1
+            version = self._version
+            anterior = self._buscar(codigo)
+            if anterior is not None: # Mismo texto ya analizado (ej. deshacer): se vuelve a publicar
+                self._pendiente = None
+            else:
+                self._pendiente = (version, codigo)
+                if self._hilo is None:
+                    self._hilo = threading.Thread(target=self._trabajar, name="analisis", daemon=True)
+                    self._hilo.start()
+                self._condicion.notify()
+        if anterior is not None:
+            self.publicar(anterior)
+        return version
+
+    def resultado_para(self, codigo):
+        """ResultadoAnalisis de exactamente este código, o None si no se ha analizado (o ya se descartó)."""
+        with self._condicion:
+            return self._buscar(codigo)
+
+    def _buscar(self, codigo):
+        for resultado in reversed(self._cache.values()):
+            if resultado.codigo == codigo:
+                return resultado
+        return None
+
+    def cerrar(self):
+        with self._condicion:
+            self._cerrado = True
+            self._pendiente = None
+            self._condicion.notify()
+
+    def _trabajar(self):
+        while True:
+            with self._condicion:
+                while self._pendiente is None and not self._cerrado:
+                    self._condicion.wait()
+                if self._cerrado:
+                    return
+                version, codigo = self._pendiente
+                self._pendiente = None
+                self._analizando = True
+            try: # `ocupado` sigue en True hasta después de publicar
+                self._analizar(version, codigo)
+            except PseudoAnalisisCanceladoError:
+                self.cancelados += 1
+            except Exception: # Un error interno del análisis no debe matar al trabajador
+                pass
+            finally:
+                self._analizando = False
+
+    def _analizar(self, version, codigo):
+        resultado = analizar_con_diagnosticos(codigo, version, lambda: version != self._version)
+        with self._condicion:
+            self._cache[version] = resultado
+            while len(self._cache) > self.max_resultados:
+                self._cache.popitem(last=False)
+            vigente = version == self._version
+        self.completados += 1
+        if vigente:
+            self.publicar(resultado)
+
+
+if __name__ == '__main__':
+    # Ráfaga de ediciones sobre un programa de 3000 líneas: las versiones intermedias se descartan o se
+    # cancelan a mitad del análisis, solo se publica la última, y el hilo que pide nunca espera.
+    cuerpo = "".join(f"    DEFINA v{i} COMO ENTERO\n    v{i} <- {i} * 2\n    MUESTRE \"v = \", v{i}\n"
+                     for i in range(1000))
+    base = "ALGORITMO Grande\n" + cuerpo + "FINALGORITMO\n"
+    servicio = ServicioAnalisis()
+
+    esperas = []
+    for i in range(20):
+        codigo = base.replace("v7 <- 7", f"v7 <- {i}") if i < 19 else base.replace("v7 <-", "v7 <- <-")
+        inicio = time.perf_counter()
+        servicio.solicitar(codigo)
+        esperas.append(time.perf_counter() - inicio)
+        time.sleep(0.005) # Teclas cada 5 ms
+    resultado = servicio.resultados.get(timeout=30)
+    time.sleep(0.2)
+    print(f"20 solicitudes: mayor espera del que pide {max(esperas) * 1000:.3f} ms; "
+          f"{servicio.completados} análisis completos, {servicio.cancelados} cancelados a mitad, "
+          f"{servicio.resultados.qsize() + 1} publicados")
+    print(f"Publicado: versión {resultado.version} en {resultado.duracion * 1000:.1f} ms, "
+          f"diagnósticos {resultado.diagnosticos[:1]}")
+
+    inicio = time.perf_counter()
+    reutilizado = servicio.resultado_para(codigo)
+    print(f"Ejecutar reutiliza el análisis: {reutilizado is resultado} "
+          f"({(time.perf_counter() - inicio) * 1000:.3f} ms frente a {resultado.duracion * 1000:.1f} ms de analizar)")
+    servicio.cerrar()
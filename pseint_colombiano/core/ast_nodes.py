@@ -6,10 +6,19 @@ Cada nodo representa una construcción del lenguaje.
 
 class ASTNode:
     """Clase base para todos los nodos del AST."""
-    pass
+    # Posición en el código fuente. El parser la asigna a las sentencias
+    # (para el depurador, el perfilador, etc.); None si no se conoce.
+    linea = None
+    columna = None
+    # Número de sentencia dentro del programa (0, 1, 2, ...), asignado por el parser.
+    # Indexa estructuras preasignadas como los mapas de bits de core/cobertura.py.
+    id_nodo = None
 
 class ProgramaNode(ASTNode):
     """Nodo raíz que representa todo el algoritmo."""
+    cantidad_sentencias = None # Total de ids de sentencia asignados por el parser
+    huella = None # sha256 del programa sin posiciones; la calcula y guarda core/reproduccion.huella_ast
+
     def __init__(self, nombre_algoritmo, cuerpo):
         self.nombre_algoritmo = nombre_algoritmo # Token ID
         self.cuerpo = cuerpo # Lista de sentencias
@@ -0,0 +1,252 @@
+# pseint_colombiano/core/cobertura.py
+"""
+Cobertura de líneas y de ramas de SI/SINO. Cada sentencia tiene un id_nodo
+(lo asigna el parser) que indexa mapas preasignados: marcar una sentencia
+es escribir un byte, sin diccionarios ni búsquedas en cada ejecución.
+
+  sentencias[id]      1 si la sentencia se ejecutó
+  ramas[2 * id]       1 si el SI tomó la rama ENTONCES (condición verdadera)
+  ramas[2 * id + 1]   1 si no la tomó (SINO, o nada si el SI no tiene SINO)
+
+Los mapas de varias ejecuciones del mismo programa se fusionan con un OR
+(fusionar), así el calificador puede juntar los de procesos distintos.
+MapaCobertura traduce ids a líneas para los reportes (JSON y editor).
+"""
+from .ast_nodes import SiNode
+
+RAMA_VERDADERO = "verdadero"
+RAMA_FALSO = "falso"
+
+# Estado de una línea en la superposición del editor
+LINEA_CUBIERTA = "cubierta"
+LINEA_PARCIAL = "parcial"   # Un SI con una sola rama tomada, o una línea con sentencias sin ejecutar
+LINEA_NO_CUBIERTA = "no_cubierta"
+
+# Visitantes de sentencias que marcan su id (SI y LEA se marcan en _elegir_rama y _verificar_lea,
+# que se usan tanto en interpret() como en ejecutar_por_pasos())
+_TIPOS_MARCADOS = ("DefinicionVariableNode", "MuestreNode", "AsignacionNode")
+
+
+def _sentencias_de(cuerpo):
+    """Recorre las sentencias de un cuerpo en orden, incluyendo las anidadas en SI."""
+    for sentencia in cuerpo or ():
+        yield sentencia
+        if isinstance(sentencia, SiNode):
+            yield from _sentencias_de(sentencia.cuerpo_si)
+            yield from _sentencias_de(sentencia.cuerpo_sino)
+
+
+def numerar_sentencias(ast):
+    """
+    Asigna id_nodo a las sentencias que no lo tienen (ASTs construidos a mano)
+    y devuelve ast.cantidad_sentencias.
+    """
+    if ast.cantidad_sentencias is None:
+        cantidad = 0
+        for sentencia in _sentencias_de(ast.cuerpo):
+            if sentencia.id_nodo is None:
+                sentencia.id_nodo = cantidad
+                cantidad += 1
+            else:
+                cantidad = max(cantidad, sentencia.id_nodo + 1)
+        ast.cantidad_sentencias = cantidad
+    return ast.cantidad_sentencias
+
+
+def _o_en_el_lugar(destino, origen):
+    if len(destino) != len(origen):
+        raise ValueError("Las coberturas son de programas distintos (tamaños diferentes).")
+    destino[:] = (int.from_bytes(destino, "little") | int.from_bytes(origen, "little")).to_bytes(len(destino), "little")
+
+
+class Cobertura:
+    """Mapas de sentencias ejecutadas y ramas tomadas de un programa."""
+    def __init__(self, cantidad_sentencias):
+        self.sentencias = bytearray(cantidad_sentencias)
+        self.ramas = bytearray(2 * cantidad_sentencias)
+
+    @classmethod
+    def para(cls, ast):
+        return cls(numerar_sentencias(ast))
+
+    def instalar(self, interprete):
+        """Reemplaza en la instancia los métodos que marcan sentencias y ramas."""
+        sentencias, ramas = self.sentencias, self.ramas
+        for tipo in _TIPOS_MARCADOS:
+            nombre = f"_visit_{tipo}"
+            setattr(interprete, nombre, self._envolver_sentencia(getattr(interprete, nombre)))
+
+        elegir = interprete._elegir_rama
+        def elegir_rama_cubierta(node):
+            id_nodo = node.id_nodo
+            sentencias[id_nodo] = 1
+            cuerpo = elegir(node)
+            ramas[2 * id_nodo + (cuerpo is not node.cuerpo_si)] = 1
+            return cuerpo
+        interprete._elegir_rama = elegir_rama_cubierta
+
+        verificar = interprete._verificar_lea
+        def verificar_lea_cubierto(node):
+            sentencias[node.id_nodo] = 1
+            return verificar(node)
+        interprete._verificar_lea = verificar_lea_cubierto
+
+    def _envolver_sentencia(self, visitar):
+        sentencias = self.sentencias
+
+        def visitar_cubierto(node):
+            sentencias[node.id_nodo] = 1
+            return visitar(node)
+        return visitar_cubierto
+
+    def fusionar(self, otra):
+        """Agrega (OR) la cobertura de otra ejecución del mismo programa. Devuelve self."""
+        _o_en_el_lugar(self.sentencias, otra.sentencias)
+        _o_en_el_lugar(self.ramas, otra.ramas)
+        return self
+
+    def huella(self):
+        """Entero con un bit por sentencia y por rama cubiertas (para comparar y seleccionar casos)."""
+        return int.from_bytes(self.sentencias + self.ramas, "little")
+
+    def __eq__(self, otra):
+        return isinstance(otra, Cobertura) and self.sentencias == otra.sentencias and self.ramas == otra.ramas
+
+    def __repr__(self):
+        return f"Cobertura(sentencias={sum(self.sentencias)}/{len(self.sentencias)}, ramas={sum(self.ramas)})"
+
+
+def seleccionar_casos(coberturas):
+    """
+    Selección voraz de casos de prueba: {caso: Cobertura} -> [casos] que juntos
+    cubren lo mismo que todos, eligiendo primero el que más agrega.
+    """
+    pendientes = {caso: cobertura.huella() for caso, cobertura in coberturas.items()}
+    cubierto, seleccion = 0, []
+    while pendientes:
+        caso, nuevos = max(((caso, (huella & ~cubierto).bit_count()) for caso, huella in sorted(pendientes.items())),
+                           key=lambda par: par[1])
+        if nuevos == 0:
+            break
+        seleccion.append(caso)
+        cubierto |= pendientes.pop(caso)
+    return seleccion
+
+
+def _porcentaje(cubiertas, total):
+    return round(100.0 * cubiertas / total, 1) if total else 100.0
+
+
+class MapaCobertura:
+    """Información estática de un programa para interpretar sus coberturas: líneas y SI por id."""
+    def __init__(self, ast):
+        self.cantidad = numerar_sentencias(ast)
+        self.linea_de = [None] * self.cantidad # id -> línea
+        self.si = [] # ids de los SI, en orden de aparición
+        for sentencia in _sentencias_de(ast.cuerpo):
+            self.linea_de[sentencia.id_nodo] = sentencia.linea
+            if isinstance(sentencia, SiNode):
+                self.si.append(sentencia.id_nodo)
+
+    def ramas_tomadas(self, cobertura):
+        """[(linea, RAMA_VERDADERO | RAMA_FALSO)] de los SI ejecutados."""
+        ramas = cobertura.ramas
+        tomadas = []
+        for id_nodo in self.si:
+            if ramas[2 * id_nodo]:
+                tomadas.append((self.linea_de[id_nodo], RAMA_VERDADERO))
+            if ramas[2 * id_nodo + 1]:
+                tomadas.append((self.linea_de[id_nodo], RAMA_FALSO))
+        return tomadas
+
+    def estado_lineas(self, cobertura):
+        """{linea: LINEA_CUBIERTA | LINEA_PARCIAL | LINEA_NO_CUBIERTA} para la superposición del editor."""
+        ejecutadas, pendientes = set(), set()
+        for id_nodo, linea in enumerate(self.linea_de):
+            if linea is not None:
+                (ejecutadas if cobertura.sentencias[id_nodo] else pendientes).add(linea)
+        for id_nodo in self.si:
+            if cobertura.sentencias[id_nodo] and not (cobertura.ramas[2 * id_nodo] and cobertura.ramas[2 * id_nodo + 1]):
+                pendientes.add(self.linea_de[id_nodo])
+        estados = {linea: LINEA_NO_CUBIERTA for linea in pendientes}
+        for linea in ejecutadas:
+            estados[linea] = LINEA_PARCIAL if linea in pendientes else LINEA_CUBIERTA
+        return dict(sorted(estados.items()))
+
+    def reporte(self, cobertura):
+        """Resumen exportable como JSON."""
+        estados = self.estado_lineas(cobertura)
+        ramas_cubiertas = sum(cobertura.ramas[2 * i] + cobertura.ramas[2 * i + 1] for i in self.si)
+        lineas_cubiertas = sum(estado != LINEA_NO_CUBIERTA for estado in estados.values())
+        return {
+            "sentencias": {"total": self.cantidad, "cubiertas": sum(cobertura.sentencias),
+                           "porcentaje": _porcentaje(sum(cobertura.sentencias), self.cantidad)},
+            "lineas": {"total": len(estados), "cubiertas": lineas_cubiertas,
+                       "porcentaje": _porcentaje(lineas_cubiertas, len(estados))},
+            "ramas": {"total": 2 * len(self.si), "cubiertas": ramas_cubiertas,
+                      "porcentaje": _porcentaje(ramas_cubiertas, 2 * len(self.si))},
+            "lineas_no_cubiertas": sorted(linea for linea, estado in estados.items() if estado == LINEA_NO_CUBIERTA),
+            "si": [{"linea": self.linea_de[i], RAMA_VERDADERO: bool(cobertura.ramas[2 * i]),
+                    RAMA_FALSO: bool(cobertura.ramas[2 * i + 1])} for i in self.si],
+        }
+
+
+if __name__ == '__main__':
+    # Cobertura de tres casos, fusión, selección de casos y sobrecosto frente a no medir.
+    import json
+    import time
+    from .ejecutor import analizar
+    from .interpreter import Interpreter
+    from .salida import SalidaBuffer, DestinoMemoria
+
+    codigo = ('ALGORITMO Clasifica\n    DEFINA n COMO ENTERO\n    LEA n\n'
+              '    SI n > 10 ENTONCES\n        MUESTRE "grande"\n    SINO\n'
+              '        SI n < 0 ENTONCES\n            MUESTRE "negativo"\n        FINSI\n'
+              '        MUESTRE "pequeño"\n    FINSI\nFINALGORITMO\n')
+    ast, _, _ = analizar(codigo)
+    mapa = MapaCobertura(ast)
+    por_caso = {}
+    for caso, entrada in (("cero", "0"), ("cien", "100"), ("cinco", "5"), ("menos", "-3")):
+        cobertura = Cobertura.para(ast)
+        interprete = Interpreter(console_input_func=lambda entrada=entrada: entrada,
+                                 salida=SalidaBuffer(DestinoMemoria()))
+        cobertura.instalar(interprete)
+        interprete.interpret(ast)
+        por_caso[caso] = cobertura
+        print(f"{caso:>6}: ramas {mapa.ramas_tomadas(cobertura)}")
+    total = Cobertura.para(ast)
+    for cobertura in por_caso.values():
+        total.fusionar(cobertura)
+    print(json.dumps(mapa.reporte(total), ensure_ascii=False))
+    print(f"Superposición con solo 'cero': {mapa.estado_lineas(por_caso['cero'])}")
+    print(f"Casos seleccionados: {seleccionar_casos(por_caso)}")
+
+    # En paso a paso se marca lo mismo
+    from .pasos import ejecutar_completo
+    cobertura = Cobertura.para(ast)
+    interprete = Interpreter(salida=SalidaBuffer(DestinoMemoria()))
+    cobertura.instalar(interprete)
+    ejecutar_completo(interprete.ejecutar_por_pasos(ast), lambda: "100")
+    print(f"Paso a paso igual a interpret(): {cobertura == por_caso['cien']}")
+
+    lineas = ["ALGORITMO Carga", "    DEFINA a, b, c COMO ENTERO", "    DEFINA s COMO TEXTO", "    a = 7", "    b = 3"]
+    for i in range(300):
+        lineas += [f"    c = (a * {i} + b) % 97", "    s = s + c",
+                   "    SI c > 48 ENTONCES", "        MUESTRE \"alto \", c", "    SINO", "        b = b + 1", "    FINSI"]
+    lineas.append("FINALGORITMO")
+    ast, _, _ = analizar("\n".join(lineas))
+
+    def medir(cubrir, repeticiones=15):
+        mejor = float("inf")
+        for _ in range(repeticiones):
+            interprete = Interpreter(salida=SalidaBuffer(DestinoMemoria()))
+            if cubrir:
+                Cobertura.para(ast).instalar(interprete)
+            inicio = time.perf_counter()
+            interprete.interpret(ast)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        return mejor
+
+    base, cubierto = medir(False), medir(True)
+    print(f"Sin cobertura: {base * 1000:.2f} ms; con cobertura: {cubierto * 1000:.2f} ms "
+          f"({(cubierto / base - 1) * 100:+.1f}%)")
@@ -0,0 +1,116 @@
+# pseint_colombiano/core/control_ejecucion.py
+"""
+Control cooperativo de una ejecución en curso: cancelar, pausar y reanudar.
+Los métodos se llaman desde otro hilo (ej. la GUI); el intérprete revisa una
+bandera barata en cada frontera de sentencia y después de cada espera de LEA.
+La misma bandera sirve para pedir que se vacíe la salida (ver SalidaBuffer) y
+para avisar que venció el tiempo máximo (ver ControlLimites).
+"""
+import threading
+
+from .pseudo_error import PseudoEjecucionCanceladaError
+
+
+class ControlEjecucion:
+    """Estado de control compartido entre quien ejecuta y quien controla."""
+    def __init__(self):
+        # `solicitado` es lo único que el intérprete lee en el camino rápido.
+        self.solicitado = False
+        self.cancelado = False
+        self._continuar = threading.Event()
+        self._continuar.set()
+        self.vaciar_salida = None # Lo asigna el intérprete: vacía su búfer de salida
+        self._vaciado_pedido = False
+        self._al_vencer = None # Lanza el error del límite de tiempo (ver instalar_plazo)
+        self._vencido = False
+
+    @property
+    def pausado(self):
+        return not self._continuar.is_set()
+
+    def cancelar(self):
+        self.cancelado = True
+        self.solicitado = True
+        self._continuar.set() # Despertar si estaba en pausa, para que pueda terminar
+
+    def pausar(self):
+        if not self.cancelado:
+            self._continuar.clear()
+            self.solicitado = True
+
+    def reanudar(self):
+        self.solicitado = self.cancelado or self._vaciado_pedido or self._vencido
+        self._continuar.set()
+
+    def instalar_plazo(self, al_vencer):
+        """Fija (o con None, quita) la función que lanza el error cuando se llame a vencer()."""
+        self._vencido = False
+        self._al_vencer = al_vencer
+
+    def vencer(self):
+        """Avisa que se cumplió el tiempo máximo: el error sale en la próxima frontera de sentencia."""
+        self._vencido = True
+        self.solicitado = True
+
+    def solicitar_vaciado(self):
+        """Pide que la salida pendiente se entregue en la próxima frontera de sentencia."""
+        self._vaciado_pedido = True
+        self.solicitado = True
+
+    def atender(self):
+        """Punto de control: vacía la salida si se pidió, bloquea mientras esté en pausa y lanza el error si se canceló."""
+        if self._vaciado_pedido:
+            self._vaciado_pedido = False
+            # Primero se baja la bandera y después se revisa: un pausar() concurrente la vuelve a subir
+            self.solicitado = False
+            if self.cancelado or self.pausado or self._vaciado_pedido or self._vencido:
+                self.solicitado = True
+            if self.vaciar_salida is not None:
+                self.vaciar_salida()
+        elif self.pausado and self.vaciar_salida is not None: # Lo escrito hasta la pausa se ve durante la pausa
+            self.vaciar_salida()
+        if self._vencido:
+            self._vencido = False
+            self.solicitado = False
+            if self.cancelado or self.pausado or self._vaciado_pedido or self._vencido:
+                self.solicitado = True
+            if self._al_vencer is not None:
+                self._al_vencer()
+        self._continuar.wait()
+        if self.cancelado:
+            raise PseudoEjecucionCanceladaError("Ejecución detenida por el usuario.")
+
+
+if __name__ == '__main__':
+    # Cancelar un programa largo desde otro hilo y medir cuánto tarda en liberar la CPU.
+    import time
+    from .lexer import Token
+    from .ast_nodes import ProgramaNode, DefinicionVariableNode, AsignacionNode, \
+        OperacionBinariaNode, LiteralNode, VariableNode
+    from .interpreter import Interpreter
+    from .salida import SalidaBuffer, DestinoMemoria
+
+    x = Token("ID", "x", 1, 1)
+    incremento = AsignacionNode(x, OperacionBinariaNode(VariableNode(x), Token("OP_SUMA", "+", 1, 1),
+                                                        LiteralNode(Token("NUMERO_ENTERO", "1", 1, 1))))
+    programa = ProgramaNode(Token("ID", "Largo", 1, 1),
+                            [DefinicionVariableNode([x], Token("TIPO_ENTERO", "ENTERO", 1, 1))] + [incremento] * 5_000_000)
+
+    interprete = Interpreter(salida=SalidaBuffer(DestinoMemoria()), reportar_errores=False)
+    hilo = threading.Thread(target=interprete.interpret, args=(programa,))
+    hilo.start()
+
+    time.sleep(0.2)
+    interprete.pausar()
+    time.sleep(0.05)
+    x_pausa = interprete.symbol_table.get("x")
+    time.sleep(0.2)
+    print(f"Pausado: x no avanza durante la pausa: {x_pausa == interprete.symbol_table.get('x')} (x={x_pausa})")
+    interprete.reanudar()
+    time.sleep(0.1)
+    print(f"Reanudado: x={interprete.symbol_table.get('x')}")
+
+    inicio = time.perf_counter()
+    interprete.cancelar()
+    hilo.join()
+    print(f"Cancelado en {(time.perf_counter() - inicio) * 1000:.2f} ms: {interprete.error_ejecucion!r}")
@@ -0,0 +1,144 @@
+# pseint_colombiano/core/ejecutor.py
+"""
+Encadena Lexer -> Parser -> Interpreter para ejecutar un programa completo.
+Es el mismo flujo que usa la GUI, pero sin depender de ella, para que la CLI,
+el calificador y cualquier otro front-end lo reutilicen.
+"""
+from .lexer import Lexer
+from .parser import Parser
+from .interpreter import Interpreter
+from .cobertura import Cobertura, MapaCobertura
+from .pseudo_error import PseudoRuntimeError, PseudoLimiteExcedidoError, PseudoEjecucionCanceladaError
+
+# Resultado de una ejecución
+ESTADO_OK = "ok"
+ESTADO_ERROR_LEXICO = "error_lexico"
+ESTADO_ERROR_SINTACTICO = "error_sintactico"
+ESTADO_ERROR_EJECUCION = "error_ejecucion"
+ESTADO_LIMITE_EXCEDIDO = "limite_excedido"
+ESTADO_CANCELADO = "cancelado"
+
+
+class ResultadoEjecucion:
+    """Estado final de una ejecución y los mensajes de error asociados."""
+    def __init__(self, estado, errores=None, limite=None, estadisticas=None):
+        self.estado = estado
+        self.errores = errores or []
+        self.limite = limite # "pasos", "tiempo" o "memoria" si estado == ESTADO_LIMITE_EXCEDIDO
+        self.estadisticas = estadisticas
+        self.perfil = None # Perfilador de la ejecución si se pidió perfilar
+        self.cobertura = None # Cobertura (core/cobertura.py) si se pidió medirla
+        self.mapa_cobertura = None # MapaCobertura para sus reportes (solo ejecutar_codigo)
+        self.registro = None # RegistroReproduccion si se grabó (core/reproduccion.py)
+
+    @property
+    def exitoso(self):
+        return self.estado == ESTADO_OK
+
+    def __repr__(self):
+        return f"ResultadoEjecucion(estado='{self.estado}', errores={len(self.errores)})"
+
+
+class LectorEntrada:
+    """
+    Fuente de datos para LEA a partir de un flujo de texto (stdin, archivo, StringIO).
+    Cada llamado devuelve la siguiente línea sin el salto final.
+    """
+    def __init__(self, flujo):
+        self.flujo = flujo
+
+    def __call__(self):
+        linea = self.flujo.readline()
+        if not linea:
+            raise PseudoRuntimeError("No hay más datos de entrada para LEA.")
+        return linea.rstrip("\r\n")
+
+
+def analizar(codigo):
+    """
+    Realiza el análisis léxico y sintáctico.
+    Devuelve (ast, errores_lexicos, errores_sintacticos); el AST es None si hubo errores léxicos.
+    """
+    tokens, errores_lexicos = Lexer(codigo).tokenize()
+    if errores_lexicos:
+        return None, errores_lexicos, []
+    ast, errores_sintacticos = Parser(tokens).parse()
+    return ast, [], errores_sintacticos
+
+
+def ejecutar_ast(ast, console_input_func=None, salida=None, limites=None, perfilar=False, cobertura=None):
+    """
+    Interpreta un AST ya construido (sin errores) y devuelve un ResultadoEjecucion.
+    `cobertura` (una Cobertura del mismo programa) acumula las sentencias y ramas ejecutadas.
+    """
+    interprete = Interpreter(console_input_func=console_input_func, salida=salida,
+                             reportar_errores=False, limites=limites, perfilar=perfilar)
+    if cobertura is not None:
+        cobertura.instalar(interprete)
+    interprete.interpret(ast)
+    resultado = resultado_de_error(interprete.error_ejecucion)
+    resultado.perfil = interprete.perfilador
+    resultado.cobertura = cobertura
+    return resultado
+
+
+def resultado_de_error(error):
+    """ResultadoEjecucion correspondiente al error_ejecucion de un intérprete (None = éxito)."""
+    if isinstance(error, PseudoEjecucionCanceladaError):
+        return ResultadoEjecucion(ESTADO_CANCELADO, [str(error)])
+    if isinstance(error, PseudoLimiteExcedidoError):
+        return ResultadoEjecucion(ESTADO_LIMITE_EXCEDIDO, [str(error)], error.limite, error.estadisticas)
+    if error is not None:
+        return ResultadoEjecucion(ESTADO_ERROR_EJECUCION, [str(error)])
+    return ResultadoEjecucion(ESTADO_OK)
+
+
+def resultado_de_analisis(ast, errores_lexicos, errores_sintacticos):
+    """ResultadoEjecucion de error si el análisis falló; None si el AST se puede ejecutar."""
+    if errores_lexicos:
+        return ResultadoEjecucion(ESTADO_ERROR_LEXICO, errores_lexicos)
+    if errores_sintacticos:
+        return ResultadoEjecucion(ESTADO_ERROR_SINTACTICO, errores_sintacticos)
+    if ast is None:
+        return ResultadoEjecucion(ESTADO_ERROR_SINTACTICO,
+                                  ["Error: No se pudo construir el árbol de sintaxis (AST)."])
+    return None
+
+
+def ejecutar_codigo(codigo, console_input_func=None, salida=None, limites=None, perfilar=False,
+                    cobertura=False):
+    """
+    Analiza e interpreta el código fuente. Devuelve un ResultadoEjecucion.
+    Con cobertura=True, resultado.cobertura queda con la Cobertura de esta ejecución.
+    """
+    ast, errores_lexicos, errores_sintacticos = analizar(codigo)
+    resultado = resultado_de_analisis(ast, errores_lexicos, errores_sintacticos)
+    if resultado is not None:
+        return resultado
+    resultado = ejecutar_ast(ast, console_input_func, salida, limites, perfilar,
+                             Cobertura.para(ast) if cobertura else None)
+    if cobertura:
+        resultado.mapa_cobertura = MapaCobertura(ast)
+    return resultado
+
+
+if __name__ == '__main__':
+    import io
+    from .salida import SalidaBuffer, DestinoMemoria
+
+    codigo = """
+    ALGORITMO Suma
+        DEFINA a, b COMO ENTERO
+        MUESTRE "Ingrese dos números:"
+        LEA a
+        LEA b
+        MUESTRE "Suma: ", a + b
+    FINALGORITMO
+    """
+    for entrada in ("3\n4\n", "3\n", "tres\n4\n"):
+        destino = DestinoMemoria()
+        resultado = ejecutar_codigo(codigo, LectorEntrada(io.StringIO(entrada)), SalidaBuffer(destino))
+        print(f"Entrada {entrada!r}: {resultado} salida={destino.lineas} errores={resultado.errores}")
+
+    print(ejecutar_codigo("ALGORITMO X\n @ \nFINALGORITMO"))
+    print(ejecutar_codigo("ALGORITMO X\n MUESTRE \nFINALGORITMO"))
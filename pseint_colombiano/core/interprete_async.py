@@ -0,0 +1,158 @@
+# pseint_colombiano/core/interprete_async.py
+"""
+Variante asyncio del intérprete para alojar muchas sesiones interactivas en un
+solo proceso. Avanza el generador de Interpreter.ejecutar_por_pasos(): LEA
+espera la entrada con await (sin ocupar un hilo) y los programas de cálculo
+ceden el bucle de eventos cada `quantum` sentencias.
+"""
+import asyncio
+import inspect
+
+from .interpreter import Interpreter
+from .pasos import ControladorPasos
+from .pseudo_error import PseudoRuntimeError, PseudoEjecucionCanceladaError
+from .salida import SalidaBuffer, DestinoMemoria
+
+# Sentencias entre cesiones al bucle de eventos
+PASOS_POR_QUANTUM = 1000
+
+
+async def _resolver(valor):
+    """Permite que console_input/console_output sean funciones normales o corrutinas."""
+    if inspect.isawaitable(valor):
+        return await valor
+    return valor
+
+
+class InterpreteAsync:
+    """
+    Ejecuta un AST dentro de un bucle asyncio.
+
+    console_input(): devuelve (o es una corrutina que devuelve) la línea para LEA.
+    console_output(texto): recibe la salida pendiente, líneas unidas por "\\n",
+    cada vez que el programa cede el control (LEA, fin de quantum o final).
+    """
+    def __init__(self, console_input=None, console_output=None, limites=None,
+                 quantum=PASOS_POR_QUANTUM, reportar_errores=True):
+        self._destino = DestinoMemoria()
+        # La salida se entrega al ceder el control, no por tiempo
+        salida = SalidaBuffer(self._destino, intervalo=float("inf"))
+        self.interprete = Interpreter(salida=salida, reportar_errores=reportar_errores, limites=limites)
+        self.console_input = console_input
+        self.console_output = console_output
+        self.quantum = quantum
+
+    @property
+    def error_ejecucion(self):
+        return self.interprete.error_ejecucion
+
+    def cancelar(self):
+        """Detiene un programa de cálculo en la próxima sentencia. Si espera un LEA, cancele su tarea."""
+        self.interprete.cancelar()
+
+    async def _emitir(self):
+        lineas = self._destino.lineas
+        if lineas and self.console_output is not None:
+            self._destino.lineas = []
+            await _resolver(self.console_output("\n".join(lineas)))
+
+    async def interpret(self, ast_node):
+        """Corrutina equivalente a Interpreter.interpret()."""
+        if ast_node is None:
+            self.interprete.interpret(None)
+            await self._emitir()
+            return
+        controlador = ControladorPasos(self.interprete.ejecutar_por_pasos(ast_node))
+        try:
+            while True:
+                detenido = controlador.continuar(self.quantum)
+                await self._emitir()
+                if controlador.terminado:
+                    break
+                if not detenido:
+                    await asyncio.sleep(0) # Fin del quantum: dejar correr a las demás sesiones
+                    continue
+                try: # Detenido en un LEA
+                    controlador.entregar_entrada(await _resolver(self.console_input()))
+                except PseudoRuntimeError as e: # Ej. la sesión se cerró: error de ejecución del LEA
+                    controlador.detener(e)
+        except asyncio.CancelledError:
+            controlador.detener(PseudoEjecucionCanceladaError("Ejecución detenida por el usuario."))
+            raise
+        finally:
+            controlador.detener() # Solo tiene efecto si la salida falló a mitad de la ejecución
+
+
+if __name__ == '__main__':
+    # 1) Sobrecosto frente al intérprete normal en un programa de cálculo.
+    # 2) Equidad: dos programas largos avanzan intercalados.
+    # 3) 10.000 sesiones esperando un LEA en un solo proceso (memoria por sesión).
+    import time
+    from .lexer import Token
+    from .ast_nodes import ProgramaNode, DefinicionVariableNode, AsignacionNode, \
+        OperacionBinariaNode, LiteralNode, VariableNode
+    from .ejecutor import analizar
+
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    x = Token("ID", "x", 1, 1)
+    incremento = AsignacionNode(x, OperacionBinariaNode(VariableNode(x), Token("OP_SUMA", "+", 1, 1),
+                                                        LiteralNode(Token("NUMERO_ENTERO", "1", 1, 1))))
+    calculo = ProgramaNode(Token("ID", "Calculo", 1, 1),
+                           [DefinicionVariableNode([x], Token("TIPO_ENTERO", "ENTERO", 1, 1))] + [incremento] * 300_000)
+
+    inicio = time.perf_counter()
+    Interpreter(salida=SalidaBuffer(DestinoMemoria())).interpret(calculo)
+    sincrono = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    asyncio.run(InterpreteAsync().interpret(calculo))
+    asincrono = time.perf_counter() - inicio
+    print(f"Cálculo de 300.000 sentencias: síncrono {sincrono:.3f} s, asyncio {asincrono:.3f} s "
+          f"(x{asincrono / sincrono:.2f})")
+
+    async def equidad():
+        orden = []
+        async def marcar(nombre):
+            while True:
+                orden.append(nombre)
+                await asyncio.sleep(0)
+        marcador = asyncio.ensure_future(marcar("latido"))
+        await asyncio.gather(InterpreteAsync().interpret(calculo), InterpreteAsync().interpret(calculo))
+        marcador.cancel()
+        return len(orden)
+    print(f"Dos cálculos en paralelo: el bucle atendió otras tareas {asyncio.run(equidad())} veces")
+
+    ast_saludo, _, _ = analizar('ALGORITMO Saludo\n    DEFINA nombre COMO TEXTO\n    MUESTRE "Nombre:"\n'
+                                '    LEA nombre\n    MUESTRE "Hola, ", nombre\nFINALGORITMO\n')
+
+    async def sesiones(n):
+        colas = [asyncio.Queue() for _ in range(n)]
+        salidas = [[] for _ in range(n)]
+        esperando = [0]
+
+        async def leer(i):
+            esperando[0] += 1
+            valor = await colas[i].get()
+            esperando[0] -= 1
+            return valor
+
+        memoria_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+        tareas = [asyncio.ensure_future(InterpreteAsync(console_input=lambda i=i: leer(i),
+                                                        console_output=salidas[i].append).interpret(ast_saludo))
+                  for i in range(n)]
+        while esperando[0] < n:
+            await asyncio.sleep(0.01)
+        memoria = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+        for i, cola in enumerate(colas):
+            cola.put_nowait(f"estudiante{i}")
+        await asyncio.gather(*tareas)
+        correctas = sum(salidas[i] == ["Nombre:", f"Hola, estudiante{i}"] for i in range(n))
+        return correctas, (memoria - memoria_antes) / n
+
+    inicio = time.perf_counter()
+    correctas, kb_por_sesion = asyncio.run(sesiones(10_000))
+    print(f"10.000 sesiones esperando LEA: {correctas} correctas en {time.perf_counter() - inicio:.2f} s, "
+          f"~{kb_por_sesion:.1f} KB por sesión en espera")
@@ -8,30 +8,208 @@ from .ast_nodes import (
     AsignacionNode, SiNode, LiteralNode, VariableNode, OperacionBinariaNode
 )
 from .symbol_table import SymbolTable
-from .pseudo_error import PseudoRuntimeError
+from .pseudo_error import PseudoRuntimeError, PseudoEjecucionCanceladaError
+from .texto import TextoAcumulado, es_texto, nombre_tipo
+from .salida import SalidaBuffer, DestinoFuncion, DestinoEstandar
+from .limites import ControlLimites
+from .control_ejecucion import ControlEjecucion
+from .pasos import SolicitudEntrada
+from .perfilador import Perfilador
+from .trazas import Trazador, EVENTO_ENTRADA_SENTENCIA, EVENTO_SALIDA_SENTENCIA
 
 class Interpreter:
     """
     Interpreta un AST y ejecuta el pseudocódigo.
     Utiliza un patrón Visitor para recorrer los nodos del AST.
     """
-    def __init__(self, console_input_func=None, console_output_func=None):
+    def __init__(self, console_input_func=None, console_output_func=None, salida=None,
+                 reportar_errores=True, limites=None, perfilar=False):
         self.symbol_table = SymbolTable()
+        # Asignación a variables. Es un atributo para poder reemplazarlo por una versión
+        # que mide memoria solo cuando hay límites (sin costo extra en el caso normal).
+        self._asignar = self.symbol_table.assign
+        # Límites de ejecución (core/limites.py). None o sin límites activos = sin verificaciones.
+        self.limites = limites if limites is not None and limites.activos else None
+        self.control_limites = None
+        # Cancelar / pausar / reanudar desde otro hilo (core/control_ejecucion.py)
+        self.control = ControlEjecucion()
+        # Si reportar_errores es False, los errores de ejecución no se escriben en la salida;
+        # quien llama los consulta en error_ejecucion (ej. la CLI los envía a stderr).
+        self.reportar_errores = reportar_errores
+        self.error_ejecucion = None
         self.console_input = console_input_func or input  # Para pruebas o integración GUI
-        self.console_output = console_output_func or print # Para pruebas o integración GUI
-
-    def interpret(self, ast_node):
-        """Inicia la interpretación desde el nodo raíz del AST."""
+        # La salida de MUESTRE pasa por un búfer que se vacía por tamaño, por tiempo,
+        # antes de cada LEA y al terminar. `salida` permite inyectar uno propio (ver core/salida.py).
+        if salida is None:
+            destino = DestinoFuncion(console_output_func) if console_output_func else DestinoEstandar()
+            salida = SalidaBuffer(destino)
+        self.salida = salida
+        # El vaciado por tiempo sin nuevos MUESTRE lo hace este hilo, en una frontera de sentencia
+        self.control.vaciar_salida = salida.vaciar
+        salida.solicitar_vaciado = self.control.solicitar_vaciado
+        # MUESTRE escribe por este atributo, que los ganchos de trazas pueden envolver
+        self._escribir = salida.escribir
+        # Suscriptores a eventos de ejecución (core/trazas.py); se crea al primer suscribir()
+        self.trazador = None
+        # Perfilado por línea y por tipo de nodo (core/perfilador.py); solo reemplaza _visit si se pide
+        self.perfilador = Perfilador(self) if perfilar else None
+
+    def interpret(self, ast_node, continuacion=None):
+        """
+        Inicia la interpretación desde el nodo raíz del AST.
+        `continuacion` ([(sentencias, indice)], de la lista más interna a la más externa)
+        reanuda a mitad del programa; la construye core/reproduccion.py.
+        """
         if ast_node is None:
-            self.console_output("Error: No se pudo generar el AST para interpretar.")
+            self.salida.escribir("Error: No se pudo generar el AST para interpretar.")
+            self.salida.vaciar()
             return
+        if self.limites is not None:
+            self._instalar_limites()
         try:
-            return self._visit(ast_node)
-        except PseudoRuntimeError as e:
-            self.console_output(f"Error de Ejecución: {e}")
+            if continuacion is None:
+                return self._visit(ast_node)
+            for sentencias, indice in continuacion:
+                self._ejecutar_bloque(sentencias[indice:])
         except Exception as e:
-            self.console_output(f"Error Inesperado en Intérprete: {e}")
+            self._registrar_error(e)
+        finally:
+            self._quitar_plazo()
+            self.salida.vaciar()
+            if self.trazador is not None:
+                self.trazador.vaciar()
+
+    def ejecutar_por_pasos(self, ast_node):
+        """
+        Generador que ejecuta el programa una sentencia a la vez (ver core/pasos.py).
+        Antes de cada sentencia produce el nodo (con .linea y .columna); en cada LEA
+        produce una SolicitudEntrada y espera el valor leído con send().
+        Quien lo maneja decide cuándo avanzar: no necesita un hilo propio.
+        """
+        if ast_node is None:
+            self.salida.escribir("Error: No se pudo generar el AST para interpretar.")
+            self.salida.vaciar()
+            return
+        if self.limites is not None:
+            self._instalar_limites()
+        try:
+            yield from self._pasos_bloque(ast_node.cuerpo)
+        except Exception as e:
+            self._registrar_error(e)
+        finally:
+            self._quitar_plazo()
+            self.salida.vaciar()
+            if self.trazador is not None:
+                self.trazador.vaciar()
+
+    def suscribir(self, funcion, eventos=None):
+        """
+        Suscribe funcion(lote) a los eventos de ejecución (ver core/trazas.py).
+        Llamar antes de interpret(). Solo se instalan los ganchos de los eventos pedidos.
+        """
+        if self.trazador is None:
+            self.trazador = Trazador(self)
+        self.trazador.suscribir(funcion, eventos)
+
+    def _registrar_error(self, e):
+        """Guarda el error de ejecución y, si corresponde, lo escribe en la salida."""
+        self.error_ejecucion = e
+        if not self.reportar_errores:
+            return
+        if isinstance(e, PseudoEjecucionCanceladaError):
+            self.salida.escribir(str(e))
+        elif isinstance(e, PseudoRuntimeError):
+            self.salida.escribir(f"Error de Ejecución: {e}")
+        else:
+            self.salida.escribir(f"Error Inesperado en Intérprete: {e}")
+
+
+    # --- Control de la ejecución (seguro de llamar desde otro hilo) ---
+    def cancelar(self):
+        """Detiene la ejecución en la próxima frontera de sentencia o al volver de un LEA."""
+        self.control.cancelar()
+
+    def pausar(self):
+        """Suspende la ejecución en la próxima frontera de sentencia."""
+        self.control.pausar()
+
+    def reanudar(self):
+        self.control.reanudar()
+
+    def _instalar_limites(self):
+        """Reemplaza, solo para esta instancia, los puntos de ejecución por versiones verificadas."""
+        self.control_limites = ControlLimites(self.limites)
+        self.control.instalar_plazo(self.control_limites.exceder_tiempo)
+        self.control_limites.armar_temporizador(self.control.vencer)
+        self._ejecutar_bloque = self._ejecutar_bloque_limitado
+        if self.limites.max_memoria is not None:
+            self._asignar = self._asignar_midiendo_memoria
+
+    def _quitar_plazo(self):
+        """Detiene el temporizador del límite de tiempo al terminar la ejecución."""
+        if self.control_limites is not None:
+            self.control_limites.desarmar_temporizador()
+            self.control.instalar_plazo(None)
+
+    def _ejecutar_bloque(self, sentencias):
+        """Ejecuta una lista de sentencias (cuerpo del algoritmo, de un SI, etc.)."""
+        control = self.control
+        for sentencia in sentencias:
+            if control.solicitado:
+                control.atender()
+            self._visit(sentencia)
 
+    def _ejecutar_bloque_limitado(self, sentencias):
+        """Como _ejecutar_bloque, contando pasos y verificando límites en cada frontera de sentencia."""
+        control_limites = self.control_limites
+        control = self.control
+        for sentencia in sentencias:
+            control_limites.pasos += 1
+            if control_limites.pasos >= control_limites.proximo_chequeo:
+                control_limites.verificar()
+            if control.solicitado:
+                control.atender()
+            self._visit(sentencia)
+
+    def _pasos_bloque(self, sentencias):
+        """Versión generadora de _ejecutar_bloque. Solo SI y LEA necesitan suspenderse por dentro."""
+        control = self.control
+        visitar = self._visit
+        # SI y LEA no pasan por su visitante (envuelto por las trazas): sus eventos se emiten aquí
+        trazador = self.trazador
+        if trazador is None or EVENTO_ENTRADA_SENTENCIA not in trazador.emitidos:
+            trazador = None
+        for sentencia in sentencias:
+            control_limites = self.control_limites
+            if control_limites is not None:
+                control_limites.pasos += 1
+                if control_limites.pasos >= control_limites.proximo_chequeo:
+                    control_limites.verificar()
+            if control.solicitado:
+                control.atender()
+            yield sentencia
+            tipo = type(sentencia)
+            if tipo is SiNode or tipo is LeaNode:
+                if trazador is not None:
+                    trazador.emitir((EVENTO_ENTRADA_SENTENCIA, sentencia))
+                if tipo is SiNode:
+                    cuerpo = self._elegir_rama(sentencia)
+                    if cuerpo:
+                        yield from self._pasos_bloque(cuerpo)
+                else:
+                    var_nombre = self._verificar_lea(sentencia)
+                    raw_input = yield SolicitudEntrada(sentencia, var_nombre)
+                    if control.solicitado:
+                        control.atender()
+                    self._asignar(var_nombre, self._convertir_entrada(var_nombre, raw_input))
+                if trazador is not None:
+                    trazador.emitir((EVENTO_SALIDA_SENTENCIA, sentencia))
+            else:
+                visitar(sentencia)
+
+    def _asignar_midiendo_memoria(self, nombre, valor):
+        self.control_limites.registrar_memoria(self.symbol_table.get(nombre), valor)
+        self.symbol_table.assign(nombre, valor)
 
     def _visit(self, node):
         """Método visitor genérico que llama al método específico para el tipo de nodo."""
@@ -44,8 +222,7 @@ class Interpreter:
 
     def _visit_ProgramaNode(self, node: ProgramaNode):
         # self.console_output(f"--- Ejecutando Algoritmo: {node.nombre_algoritmo.value} ---")
-        for sentencia in node.cuerpo:
-            self._visit(sentencia)
+        self._ejecutar_bloque(node.cuerpo)
         # self.console_output(f"--- Fin Algoritmo: {node.nombre_algoritmo.value} ---")
 
 
@@ -59,7 +236,7 @@ class Interpreter:
             if tipo_dato_str == "ENTERO" or tipo_dato_str == "REAL":
                 default_value = 0
             elif tipo_dato_str == "TEXTO":
-                default_value = ""
+                default_value = TextoAcumulado()
             elif tipo_dato_str == "LOGICO":
                 default_value = False
             else:
@@ -73,20 +250,31 @@ class Interpreter:
         for expr_node in node.expresiones:
             value = self._visit(expr_node)
             output_parts.append(str(value))
-        self.console_output("".join(output_parts)) # PSeInt concatena sin espacios por defecto
+        self._escribir("".join(output_parts)) # PSeInt concatena sin espacios por defecto
 
     def _visit_LeaNode(self, node: LeaNode):
-        var_nombre = node.variable.value
-        if not self.symbol_table.exists(var_nombre):
-            raise PseudoRuntimeError(f"Variable '{var_nombre}' no ha sido definida antes de LEA.")
-        
+        var_nombre = self._verificar_lea(node)
+
         # Prompt para la entrada. En PSeInt no hay prompt explícito en LEA,
         # la GUI debe manejar cómo se pide la entrada.
         # Para la consola, podemos hacer un input simple.
         # No incluimos un mensaje en el input() porque PSeInt no lo hace;
         # el MUESTRE previo es el que debe dar el contexto.
         raw_input = self.console_input()
-        
+        if self.control.solicitado: # Pudo cancelarse mientras se esperaba la entrada
+            self.control.atender()
+        self._asignar(var_nombre, self._convertir_entrada(var_nombre, raw_input))
+
+    def _verificar_lea(self, node: LeaNode):
+        """Valida la variable de un LEA y vacía la salida pendiente. Devuelve el nombre."""
+        var_nombre = node.variable.value
+        if not self.symbol_table.exists(var_nombre):
+            raise PseudoRuntimeError(f"Variable '{var_nombre}' no ha sido definida antes de LEA.")
+        self.salida.vaciar() # El mensaje previo debe verse antes de pedir la entrada
+        return var_nombre
+
+    def _convertir_entrada(self, var_nombre, raw_input):
+        """Convierte el texto leído al tipo de la variable."""
         # Intentar convertir al tipo de la variable (PSeInt es flexible aquí)
         var_type = self.symbol_table.get_type(var_nombre)
         converted_value = None
@@ -104,13 +292,12 @@ class Interpreter:
                 else:
                     raise ValueError("Entrada no es un valor lógico válido.")
             elif var_type == "TEXTO":
-                converted_value = str(raw_input)
+                converted_value = TextoAcumulado(raw_input)
             else: # Seguridad
                 converted_value = raw_input
         except ValueError:
             raise PseudoRuntimeError(f"Entrada '{raw_input}' no es válida para la variable '{var_nombre}' de tipo {var_type}.")
-
-        self.symbol_table.assign(var_nombre, converted_value)
+        return converted_value
 
     def _visit_AsignacionNode(self, node: AsignacionNode):
         var_nombre = node.variable.value
@@ -123,39 +310,40 @@ class Interpreter:
         
         # Validación de tipo (simplificada)
         var_type = self.symbol_table.get_type(var_nombre)
-        val_py_type = type(valor_expresion)
+        tipo_valor = nombre_tipo(valor_expresion)
 
         if var_type == "ENTERO" and not isinstance(valor_expresion, int):
              # PSeInt permite truncar reales a enteros, o convertir si es posible
             try:
                 valor_expresion = int(valor_expresion)
             except (ValueError, TypeError):
-                 raise PseudoRuntimeError(f"No se puede asignar valor '{valor_expresion}' (tipo {val_py_type.__name__}) a variable entera '{var_nombre}'.")
+                 raise PseudoRuntimeError(f"No se puede asignar valor '{valor_expresion}' (tipo {tipo_valor}) a variable entera '{var_nombre}'.")
         elif var_type == "REAL" and not isinstance(valor_expresion, (int, float)):
             try:
                 valor_expresion = float(valor_expresion)
             except (ValueError, TypeError):
-                raise PseudoRuntimeError(f"No se puede asignar valor '{valor_expresion}' (tipo {val_py_type.__name__}) a variable real '{var_nombre}'.")
+                raise PseudoRuntimeError(f"No se puede asignar valor '{valor_expresion}' (tipo {tipo_valor}) a variable real '{var_nombre}'.")
         elif var_type == "LOGICO" and not isinstance(valor_expresion, bool):
-            raise PseudoRuntimeError(f"No se puede asignar valor '{valor_expresion}' (tipo {val_py_type.__name__}) a variable lógica '{var_nombre}'.")
-        elif var_type == "TEXTO" and not isinstance(valor_expresion, str):
-             # PSeInt convierte casi todo a texto para asignación a cadena
-            valor_expresion = str(valor_expresion)
+            raise PseudoRuntimeError(f"No se puede asignar valor '{valor_expresion}' (tipo {tipo_valor}) a variable lógica '{var_nombre}'.")
+        elif var_type == "TEXTO" and not isinstance(valor_expresion, TextoAcumulado):
+             # PSeInt convierte casi todo a texto para asignación a cadena.
+             # Se guarda como TextoAcumulado para que 's <- s + x' no sea cuadrático.
+            valor_expresion = TextoAcumulado(valor_expresion)
 
 
-        self.symbol_table.assign(var_nombre, valor_expresion)
+        self._asignar(var_nombre, valor_expresion)
 
     def _visit_SiNode(self, node: SiNode):
+        cuerpo = self._elegir_rama(node)
+        if cuerpo:
+            self._ejecutar_bloque(cuerpo)
+
+    def _elegir_rama(self, node: SiNode):
+        """Evalúa la condición del SI y devuelve el cuerpo a ejecutar (o None si no hay SINO)."""
         condicion_val = self._visit(node.condicion)
         if not isinstance(condicion_val, bool):
-            raise PseudoRuntimeError(f"La condición del SI debe ser un valor lógico, se obtuvo {condicion_val} (tipo {type(condicion_val).__name__}).")
-
-        if condicion_val: # Verdadero
-            for sentencia in node.cuerpo_si:
-                self._visit(sentencia)
-        elif node.cuerpo_sino: # Falso y hay un SINO
-            for sentencia in node.cuerpo_sino:
-                self._visit(sentencia)
+            raise PseudoRuntimeError(f"La condición del SI debe ser un valor lógico, se obtuvo {condicion_val} (tipo {nombre_tipo(condicion_val)}).")
+        return node.cuerpo_si if condicion_val else node.cuerpo_sino
 
     # --- Visitantes para Nodos de Expresión ---
     def _visit_LiteralNode(self, node: LiteralNode):
@@ -175,7 +363,9 @@ class Interpreter:
         # Aritméticos
         if op_tipo == 'OP_SUMA':
             # En PSeInt, la suma con cadenas es concatenación
-            if isinstance(val_izq, str) or isinstance(val_der, str):
+            if isinstance(val_izq, TextoAcumulado):
+                return val_izq.concatenar(val_der) # Amortizado O(1), se aplana al observarlo
+            if es_texto(val_izq) or es_texto(val_der):
                 return str(val_izq) + str(val_der)
             return val_izq + val_der
         elif op_tipo == 'OP_RESTA': return val_izq - val_der
@@ -202,11 +392,11 @@ class Interpreter:
         # Lógicos
         elif op_tipo == 'OP_Y':
             if not (isinstance(val_izq, bool) and isinstance(val_der, bool)):
-                 raise PseudoRuntimeError(f"Operador 'Y' requiere operandos lógicos. Se obtuvo {type(val_izq).__name__} y {type(val_der).__name__}")
+                 raise PseudoRuntimeError(f"Operador 'Y' requiere operandos lógicos. Se obtuvo {nombre_tipo(val_izq)} y {nombre_tipo(val_der)}")
             return val_izq and val_der
         elif op_tipo == 'OP_O':
             if not (isinstance(val_izq, bool) and isinstance(val_der, bool)):
-                 raise PseudoRuntimeError(f"Operador 'O' requiere operandos lógicos. Se obtuvo {type(val_izq).__name__} y {type(val_der).__name__}")
+                 raise PseudoRuntimeError(f"Operador 'O' requiere operandos lógicos. Se obtuvo {nombre_tipo(val_izq)} y {nombre_tipo(val_der)}")
             return val_izq or val_der
         
         # TODO: OP_NO es unario, necesitaría su propio nodo o manejo especial
@@ -53,6 +53,9 @@ PALABRAS_CLAVE = {
     "O": "OP_O",
     "NO": "OP_NO",
 
+    # Operadores aritméticos como palabras
+    "MOD": "OP_MOD",
+
     # Valores lógicos
     "VERDADERO": "VALOR_VERDADERO",
     "FALSO": "VALOR_FALSO",
@@ -82,7 +85,7 @@ TOKEN_TIPOS = [
     ('ID', r'[a-zA-Z_][a-zA-Z0-9_]*'), # Identificadores
     ('NUMERO_REAL', r'\d+\.\d*|\.\d+'), # Números reales (ANTES DE ENTEROS para capturar el punto)
     ('NUMERO_ENTERO', r'\d+'),         # Números enteros
-    ('CADENA', r'"[^"]*"|\'[^\']*\''),  # Cadenas de texto
+    ('CADENA', r'"[^"\n]*"|\'[^\'\n]*\''),  # Cadenas de texto, de una sola línea (una comilla sin cerrar es ERROR)
 
     # -- Operadores de un caracter y otros símbolos --
     # Aquí re-añadimos '=' a ASIGNACION si se decide que es un operador de asignación además de '<-'
@@ -99,7 +102,7 @@ TOKEN_TIPOS = [
     # ('ID', r'[a-zA-Z_][a-zA-Z0-9_]*'), # (ya arriba)
     # ('NUMERO_REAL', r'\d+\.\d*|\.\d+'), # (ya arriba)
     # ('NUMERO_ENTERO', r'\d+'), # (ya arriba)
-    # ('CADENA', r'"[^"]*"|\'[^\']*\''), # (ya arriba)
+    # ('CADENA', r'"[^"\n]*"|\'[^\'\n]*\''), # (ya arriba)
 
     # Re-declarando ASIGNACION aquí para asegurar que está en la lista.
     # Si '<-' y '=' son asignación, y '==' es comparación:
@@ -2,12 +2,31 @@
 """
 Analizador Léxico (Lexer) para el pseudocódigo colombiano.
 Convierte el código fuente en una secuencia de tokens.
+
+Una sola expresión regular con un grupo por tipo de TOKEN_TIPOS (en su orden:
+el primero que coincide gana) recorre el código una vez, sin copiar el resto
+del texto en cada token. Las palabras clave no están en la expresión: un ID
+cuyo texto en mayúsculas está en PALABRAS_CLAVE toma el tipo de la palabra,
+salvo que lo siga una letra no ASCII ("Yñ"), como con el \b de las antiguas
+expresiones por palabra clave. tests/test_lexer.py fija la equivalencia.
 """
 import re
-from .keywords_col import REGEX_TOKENS
+from .keywords_col import PALABRAS_CLAVE, TOKEN_TIPOS
+from .pseudo_error import Diagnostico
+
+_PATRON = re.compile("|".join(f"({patron})" for _, patron in TOKEN_TIPOS))
+_TIPOS = (None,) + tuple(tipo for tipo, _ in TOKEN_TIPOS) # Por número de grupo (match.lastindex)
+_CARACTER_DE_PALABRA = re.compile(r"\w").match # Unicode: también "ñ" o "é", que ID no incluye
+
+
+def mensaje_error_lexico(valor, linea, columna):
+    return f"Error Léxico: Caracter no reconocido '{valor}' en línea {linea}, columna {columna}"
+
 
 class Token:
     """Representa un token con su tipo, valor y posición (línea, columna)."""
+    __slots__ = ("type", "value", "line", "column")
+
     def __init__(self, type, value, line, column):
         self.type = type
         self.value = value
@@ -18,67 +37,71 @@ class Token:
         return f"Token({self.type}, '{self.value}', Ln {self.line}, Col {self.column})"
 
 class Lexer:
-    """Analizador léxico que tokeniza el código fuente."""
-    def __init__(self, code):
+    """
+    Analizador léxico que tokeniza el código fuente.
+    Con conservar_comentarios=True (para el editor) los comentarios y los caracteres
+    no reconocidos también quedan en la lista, como COMENTARIO y ERROR; el parser
+    no los acepta. linea_inicial permite tokenizar un fragmento con sus líneas reales.
+    """
+    def __init__(self, code, conservar_comentarios=False, linea_inicial=1):
         self.code = code
+        self.conservar_comentarios = conservar_comentarios
         self.tokens = []
-        self.current_line = 1
+        self.current_line = linea_inicial
         self.current_column = 1
         self.errors = [] # Lista para almacenar errores léxicos
+        self.diagnosticos = [] # Los mismos errores, con posición (pseudo_error.Diagnostico)
 
     def tokenize(self):
-        """Realiza la tokenización del código."""
-        remaining_code = self.code
-        line_start_pos = 0 # Para calcular la columna correctamente
-
-        while remaining_code:
-            match = None
-            # Ajustar la columna para la posición actual en la línea
-            # La columna se basa en la posición desde el último '\n'
-            # self.current_column = len(self.code) - len(remaining_code) - line_start_pos + 1
-            
-            # Calcular la posición actual absoluta y luego la columna en la línea actual
-            current_pos_abs = len(self.code) - len(remaining_code)
-            last_newline_pos = self.code.rfind('\n', 0, current_pos_abs)
-            if last_newline_pos == -1: # Primera línea
-                self.current_column = current_pos_abs + 1
-            else:
-                self.current_column = current_pos_abs - last_newline_pos
-
-            for token_type, pattern in REGEX_TOKENS:
-                regex = re.compile(pattern)
-                m = regex.match(remaining_code)
-                if m:
-                    value = m.group(0)
-                    if token_type == 'NUEVALINEA':
-                        self.current_line += 1
-                        line_start_pos = current_pos_abs + len(value) # Actualizar para el cálculo de columna
-                    elif token_type == 'ESPACIO' or token_type == 'COMENTARIO':
-                        # Ignorar espacios y comentarios para la lista de tokens,
-                        # pero avanzar el puntero.
-                        pass
-                    elif token_type == 'ERROR':
-                        self.errors.append(
-                            f"Error Léxico: Caracter no reconocido '{value}' en línea {self.current_line}, columna {self.current_column}"
-                        )
-                    else:
-                        self.tokens.append(Token(token_type, value, self.current_line, self.current_column))
-                    
-                    remaining_code = remaining_code[len(value):]
-                    match = True
-                    break
-            
-            if not match: # Debería ser manejado por el token 'ERROR'
+        """Realiza la tokenización del código en una sola pasada."""
+        code = self.code
+        coincidir = _PATRON.match
+        tipos, palabras_clave, sigue_palabra = _TIPOS, PALABRAS_CLAVE, _CARACTER_DE_PALABRA
+        conservar = self.conservar_comentarios
+        tokens, agregar = self.tokens, self.tokens.append
+        linea = self.current_line
+        columna = self.current_column
+        pos, fin = 0, len(code)
+        inicio_linea = 0 # Posición donde empieza la línea actual
+
+        while pos < fin:
+            m = coincidir(code, pos)
+            columna = pos - inicio_linea + 1
+            if m is None: # Debería ser manejado por el token 'ERROR'
                 # Esto es una salvaguarda, en teoría el token 'ERROR' debería atraparlo.
-                # Si se llega aquí, hay un problema con la definición de REGEX_TOKENS.
-                error_char = remaining_code[0]
+                # Si se llega aquí, hay un problema con la definición de TOKEN_TIPOS.
                 self.errors.append(
-                    f"Error Léxico Fatal: Caracter inesperado '{error_char}' en línea {self.current_line}, columna {self.current_column}."
+                    f"Error Léxico Fatal: Caracter inesperado '{code[pos]}' en línea {linea}, columna {columna}."
                 )
-                remaining_code = remaining_code[1:] # Avanzar para evitar bucle infinito
+                self.diagnosticos.append(Diagnostico("lexico", self.errors[-1], linea, columna))
+                pos += 1 # Avanzar para evitar bucle infinito
+                continue
+            tipo, valor = tipos[m.lastindex], m.group()
+            pos = m.end()
+            if tipo == 'ESPACIO':
+                continue
+            if tipo == 'ID':
+                tipo = palabras_clave.get(valor.upper(), 'ID')
+                if tipo != 'ID' and pos < fin and sigue_palabra(code, pos): # "Yñ" no es la palabra Y
+                    tipo = 'ID'
+                agregar(Token(tipo, valor, linea, columna))
+            elif tipo == 'NUEVALINEA':
+                linea += 1
+                inicio_linea = pos
+            elif tipo == 'COMENTARIO':
+                if conservar:
+                    agregar(Token(tipo, valor, linea, columna))
+            elif tipo == 'ERROR':
+                self.errors.append(mensaje_error_lexico(valor, linea, columna))
+                self.diagnosticos.append(Diagnostico("lexico", self.errors[-1], linea, columna, len(valor)))
+                if conservar:
+                    agregar(Token(tipo, valor, linea, columna))
+            else:
+                agregar(Token(tipo, valor, linea, columna))
 
-        self.tokens.append(Token("EOF", "EOF", self.current_line, self.current_column)) # End of File token
-        return self.tokens, self.errors
+        self.current_line, self.current_column = linea, columna
+        agregar(Token("EOF", "EOF", linea, columna)) # End of File token
+        return tokens, self.errors
 
 if __name__ == '__main__':
     # Ejemplo de uso
@@ -118,4 +141,19 @@ if __name__ == '__main__':
     tokens_err, errors_err = lexer_error.tokenize()
     print("\nPrueba con error léxico:")
     for t in tokens_err: print(t)
-    for e in errors_err: print(e)
\ No newline at end of file
+    for e in errors_err: print(e)
+
+    print(f"\nMOD es operador: {[t.type for t in Lexer('a = b MOD 3').tokenize()[0]]}")
+    print(f"Comentarios conservados: {Lexer('a = 1 // uno', conservar_comentarios=True).tokenize()[0][-2]}")
+
+    # Tiempo lineal en el tamaño del código (antes se copiaba el resto del texto en cada token)
+    import time
+    bloque = ('    // Bloque\n    a = (b * 7 + 3) MOD 97\n    s = "valor " + a\n'
+              '    SI a > 48 ENTONCES\n        MUESTRE s\n    FINSI\n')
+    for repeticiones in (250, 500, 1000, 2000):
+        codigo = "ALGORITMO Grande\n" + bloque * repeticiones + "FINALGORITMO"
+        inicio = time.perf_counter()
+        tokens, _ = Lexer(codigo).tokenize()
+        duracion = time.perf_counter() - inicio
+        print(f"{codigo.count(chr(10)) + 1:>6} líneas: {duracion * 1000:6.1f} ms ({len(tokens)} tokens, "
+              f"{duracion / len(tokens) * 1e6:.2f} us por token)")
@@ -0,0 +1,146 @@
+# pseint_colombiano/core/limites.py
+"""
+Límites de ejecución para programas no confiables: presupuesto de pasos
+(sentencias ejecutadas), tiempo de reloj y memoria de texto.
+El intérprete solo instala estas verificaciones si hay algún límite activo,
+así que sin límites no hay costo adicional.
+
+El tiempo no depende de contar pasos (un programa corto con expresiones caras
+nunca llegaría a la cuenta): un temporizador sube la bandera de
+ControlEjecucion al vencer y el intérprete lanza el error en la próxima
+frontera de sentencia.
+"""
+import threading
+import time
+
+from .pseudo_error import PseudoLimiteExcedidoError
+from .texto import es_texto
+
+
+class LimitesEjecucion:
+    """
+    Configuración de límites. Un valor None desactiva ese límite.
+
+    max_pasos: sentencias ejecutadas como máximo.
+    tiempo_maximo: segundos de reloj desde el inicio de interpret().
+    max_memoria: caracteres totales guardados en variables de texto.
+    """
+    def __init__(self, max_pasos=None, tiempo_maximo=None, max_memoria=None):
+        self.max_pasos = max_pasos
+        self.tiempo_maximo = tiempo_maximo
+        self.max_memoria = max_memoria
+
+    @property
+    def activos(self):
+        return any(v is not None for v in (self.max_pasos, self.tiempo_maximo, self.max_memoria))
+
+    def __repr__(self):
+        return (f"LimitesEjecucion(max_pasos={self.max_pasos}, tiempo_maximo={self.tiempo_maximo}, "
+                f"max_memoria={self.max_memoria})")
+
+
+def tamano_valor(valor):
+    """Memoria contabilizada para un valor: su longitud si es texto, 0 en otro caso."""
+    return len(valor) if es_texto(valor) else 0
+
+
+class ControlLimites:
+    """Lleva la cuenta de pasos, tiempo y memoria de una ejecución y lanza el error al excederlos."""
+    def __init__(self, limites):
+        self.limites = limites
+        self.pasos = 0
+        self.memoria = 0
+        self.inicio = time.monotonic()
+        self.fin = None if limites.tiempo_maximo is None else self.inicio + limites.tiempo_maximo
+        self.proximo_chequeo = self._calcular_proximo_chequeo()
+        self._temporizador = None
+
+    def _calcular_proximo_chequeo(self):
+        return float("inf") if self.limites.max_pasos is None else self.limites.max_pasos + 1
+
+    def armar_temporizador(self, al_vencer):
+        """Llama a al_vencer() desde otro hilo cuando se cumple el tiempo máximo (si lo hay)."""
+        if self.fin is None:
+            return
+        self._temporizador = threading.Timer(max(0.0, self.fin - time.monotonic()), al_vencer)
+        self._temporizador.daemon = True
+        self._temporizador.start()
+
+    def desarmar_temporizador(self):
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+
+    def exceder_tiempo(self):
+        raise PseudoLimiteExcedidoError(
+            f"Límite de tiempo excedido ({self.limites.tiempo_maximo} s).",
+            "tiempo", self.estadisticas())
+
+    def estadisticas(self):
+        return {
+            "pasos": self.pasos,
+            "tiempo_s": round(time.monotonic() - self.inicio, 6),
+            "memoria": self.memoria,
+        }
+
+    def verificar(self):
+        """Se llama cuando pasos alcanza proximo_chequeo."""
+        if self.limites.max_pasos is not None and self.pasos > self.limites.max_pasos:
+            raise PseudoLimiteExcedidoError(
+                f"Límite de pasos excedido ({self.limites.max_pasos} sentencias).",
+                "pasos", self.estadisticas())
+        if self.fin is not None and time.monotonic() >= self.fin:
+            self.exceder_tiempo()
+        self.proximo_chequeo = self._calcular_proximo_chequeo()
+
+    def registrar_memoria(self, anterior, nuevo):
+        """Actualiza la memoria al reemplazar el valor `anterior` por `nuevo` en una variable."""
+        self.memoria += tamano_valor(nuevo) - tamano_valor(anterior)
+        if self.memoria > self.limites.max_memoria:
+            raise PseudoLimiteExcedidoError(
+                f"Límite de memoria excedido ({self.limites.max_memoria} caracteres de texto).",
+                "memoria", self.estadisticas())
+
+
+if __name__ == '__main__':
+    # Sobrecosto de los límites: programa de 200.000 sentencias sin límites,
+    # con límites holgados (que nunca se alcanzan) y con cada límite excedido.
+    from .lexer import Token
+    from .ast_nodes import ProgramaNode, DefinicionVariableNode, AsignacionNode, \
+        OperacionBinariaNode, LiteralNode, VariableNode
+    from .interpreter import Interpreter
+    from .salida import SalidaBuffer, DestinoMemoria
+
+    N = 200_000
+    x = Token("ID", "x", 1, 1)
+    s = Token("ID", "s", 1, 1)
+    suma = Token("OP_SUMA", "+", 1, 1)
+    cuerpo = [DefinicionVariableNode([x], Token("TIPO_ENTERO", "ENTERO", 1, 1)),
+              DefinicionVariableNode([s], Token("TIPO_TEXTO", "TEXTO", 1, 1))]
+    for _ in range(N // 2):
+        cuerpo.append(AsignacionNode(x, OperacionBinariaNode(VariableNode(x), suma,
+                                                             LiteralNode(Token("NUMERO_ENTERO", "1", 1, 1)))))
+        cuerpo.append(AsignacionNode(s, OperacionBinariaNode(VariableNode(s), suma,
+                                                             LiteralNode(Token("CADENA", '"ab"', 1, 1)))))
+    programa = ProgramaNode(Token("ID", "Limites", 1, 1), cuerpo)
+
+    def medir(limites, repeticiones=5):
+        mejor, interprete = float("inf"), None
+        for _ in range(repeticiones):
+            interprete = Interpreter(salida=SalidaBuffer(DestinoMemoria()), limites=limites)
+            inicio = time.perf_counter()
+            interprete.interpret(programa)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        return mejor, interprete
+
+    base, _ = medir(None)
+    print(f"Sin límites:      {base:.3f} s")
+    holgados = LimitesEjecucion(max_pasos=10 * N, tiempo_maximo=60, max_memoria=10 * N)
+    con_limites, _ = medir(holgados)
+    print(f"Límites holgados: {con_limites:.3f} s (sobrecosto {100 * (con_limites / base - 1):+.1f}%)")
+
+    for limites in (LimitesEjecucion(max_pasos=1000), LimitesEjecucion(tiempo_maximo=0.01),
+                    LimitesEjecucion(max_memoria=500)):
+        _, interprete = medir(limites, repeticiones=1)
+        error = interprete.error_ejecucion
+        print(f"{limites}: {type(error).__name__} limite={error.limite} estadisticas={error.estadisticas}")
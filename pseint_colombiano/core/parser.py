@@ -10,6 +10,7 @@ from .ast_nodes import (
     AsignacionNode, SiNode, LiteralNode, VariableNode, OperacionBinariaNode
 )
 from .keywords_col import PALABRAS_CLAVE
+from .pseudo_error import Diagnostico, PseudoAnalisisCanceladoError
 
 class Parser:
     """
@@ -21,11 +22,18 @@ class Parser:
         self.pos = 0
         self.current_token = self.tokens[self.pos] if self.tokens else Token("EOF", "EOF", 0, 0)
         self.errors = []
+        self.diagnosticos = [] # Los mismos errores, con posición (pseudo_error.Diagnostico)
+        self.cantidad_sentencias = 0 # Próximo id_nodo de sentencia
+        # Función sin argumentos que se consulta antes de cada sentencia; si devuelve True,
+        # parse() lanza PseudoAnalisisCanceladoError (análisis en segundo plano que quedó viejo)
+        self.debe_cancelar = None
 
     def _error(self, message, token=None):
         token = token or self.current_token
         err_msg = f"Error Sintáctico: {message} en línea {token.line}, columna {token.column} (token: {token.type} '{token.value}')"
         self.errors.append(err_msg)
+        largo = 1 if token.type == "EOF" else len(str(token.value))
+        self.diagnosticos.append(Diagnostico("sintactico", err_msg, token.line, token.column, largo))
         # Podríamos lanzar una excepción aquí para detener el parsing,
         # o intentar sincronizar para encontrar más errores.
         # Por simplicidad, solo registramos y continuamos si es posible.
@@ -62,6 +70,7 @@ class Parser:
         """Método principal para iniciar el análisis."""
         # Un programa debe empezar con ALGORITMO y terminar con FINALGORITMO
         programa_node = self._parse_programa()
+        programa_node.cantidad_sentencias = self.cantidad_sentencias
         if self.current_token.type != "EOF" and not self.errors:
              self._error(f"Tokens extra después del final del programa.")
         return programa_node, self.errors
@@ -100,6 +109,19 @@ class Parser:
         return sentencias
 
     def _parse_sentencia(self):
+        """Parsea una sentencia y le asigna la posición de su primer token y su id_nodo."""
+        if self.debe_cancelar is not None and self.debe_cancelar():
+            raise PseudoAnalisisCanceladoError("Análisis cancelado: el código cambió.")
+        token_inicio = self.current_token
+        sentencia = self._parse_sentencia_sin_posicion()
+        if sentencia is not None:
+            sentencia.linea = token_inicio.line
+            sentencia.columna = token_inicio.column
+            sentencia.id_nodo = self.cantidad_sentencias
+            self.cantidad_sentencias += 1
+        return sentencia
+
+    def _parse_sentencia_sin_posicion(self):
         """Determina qué tipo de sentencia parsear."""
         if self.current_token.type == PALABRAS_CLAVE["DEFINA"]:
             return self._parse_definicion_variable()
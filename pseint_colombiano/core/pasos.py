@@ -0,0 +1,200 @@
+# pseint_colombiano/core/pasos.py
+"""
+Ejecución paso a paso sobre el generador Interpreter.ejecutar_por_pasos().
+El generador produce cada sentencia antes de ejecutarla y una SolicitudEntrada
+en cada LEA; ControladorPasos lo avanza paso a paso, hasta un punto de
+interrupción o hasta una línea, en tramos cortos que un bucle de eventos
+(ej. after() de Tk) puede intercalar con el resto de la interfaz.
+"""
+from .pseudo_error import PseudoEjecucionCanceladaError
+
+
+class SolicitudEntrada:
+    """Producida por el generador cuando un LEA necesita un valor; se responde con send(valor)."""
+    __slots__ = ("nodo", "variable")
+
+    def __init__(self, nodo, variable):
+        self.nodo = nodo
+        self.variable = variable
+
+    @property
+    def linea(self):
+        return self.nodo.linea
+
+    def __repr__(self):
+        return f"SolicitudEntrada(variable='{self.variable}', linea={self.linea})"
+
+
+class ControladorPasos:
+    """
+    Avanza un generador de ejecutar_por_pasos().
+
+    `actual` es la sentencia en la que está detenido (aún sin ejecutar), una
+    SolicitudEntrada si espera un valor de LEA, o None al terminar.
+    `puntos_interrupcion` es un conjunto de números de línea; se puede
+    modificar mientras la ejecución avanza.
+    """
+    def __init__(self, generador, puntos_interrupcion=None):
+        self._generador = generador
+        self.puntos_interrupcion = puntos_interrupcion if puntos_interrupcion is not None else set()
+        self.actual = None
+        self.iniciado = False
+        self.terminado = False
+        self._entrada = None # Valor a enviar en el próximo avance (respuesta a un LEA)
+        self._entrada_entregada = False
+
+    @property
+    def esperando_entrada(self):
+        """True si está detenido en un LEA al que todavía no se le entregó el valor."""
+        return type(self.actual) is SolicitudEntrada and not self._entrada_entregada
+
+    def entregar_entrada(self, valor):
+        """Responde la SolicitudEntrada actual; el LEA se completa en el próximo avance."""
+        self._entrada = valor
+        self._entrada_entregada = True
+
+    def _avanzar(self):
+        valor, self._entrada = self._entrada, None
+        self._entrada_entregada = False
+        self.iniciado = True
+        try:
+            self.actual = self._generador.send(valor)
+        except StopIteration:
+            self.actual = None
+            self.terminado = True
+        return self.actual
+
+    def paso(self):
+        """Ejecuta la sentencia actual y se detiene antes de la siguiente (o en el LEA que pida entrada)."""
+        if not self.terminado:
+            self._avanzar()
+        return self.actual
+
+    def continuar(self, max_sentencias, linea_destino=None):
+        """
+        Avanza como máximo max_sentencias. Devuelve True si se detuvo (punto de
+        interrupción, linea_destino, solicitud de entrada o fin) y False si se
+        agotó el tramo y hay que llamarlo de nuevo para seguir.
+        """
+        if self.terminado:
+            return True
+        puntos = self.puntos_interrupcion
+        avanzar = self._avanzar
+        if linea_destino is None:
+            linea_destino = -1 # Nunca coincide (los nodos sin posición tienen linea None)
+        for _ in range(max_sentencias):
+            evento = avanzar()
+            if evento is None or type(evento) is SolicitudEntrada:
+                return True
+            linea = evento.linea
+            if linea == linea_destino or linea in puntos:
+                return True
+        return False
+
+    def detener(self, error=None):
+        """
+        Termina la ejecución donde esté. El intérprete registra `error` (por defecto,
+        la cancelación de Detener) como si hubiera ocurrido en la sentencia actual.
+        """
+        if self.terminado:
+            return
+        if not self.iniciado:
+            self._generador.close()
+        else:
+            try:
+                self._generador.throw(error or PseudoEjecucionCanceladaError("Ejecución detenida por el usuario."))
+            except StopIteration:
+                pass
+        self.actual = None
+        self.terminado = True
+
+
+def ejecutar_completo(generador, console_input):
+    """Maneja el generador hasta el final leyendo cada LEA con console_input (sin detenerse)."""
+    try:
+        evento = next(generador)
+        while True:
+            if type(evento) is SolicitudEntrada:
+                evento = generador.send(console_input())
+            else:
+                evento = next(generador)
+    except StopIteration:
+        pass
+
+
+if __name__ == '__main__':
+    # Costo del modo paso a paso a máxima velocidad frente al intérprete normal.
+    import time
+    from .lexer import Token
+    from .ast_nodes import ProgramaNode, DefinicionVariableNode, AsignacionNode, SiNode, MuestreNode, \
+        LeaNode, OperacionBinariaNode, LiteralNode, VariableNode
+    from .interpreter import Interpreter
+    from .salida import SalidaBuffer, DestinoMemoria
+    from .ejecutor import analizar
+    # Al correr como __main__ este archivo es otro módulo: usar las clases que ve el intérprete
+    from .pasos import SolicitudEntrada, ControladorPasos, ejecutar_completo
+
+    # Recorrido de un programa pequeño: sentencias, posiciones y entrada
+    codigo = ('ALGORITMO Pasos\n    DEFINA n COMO ENTERO\n    MUESTRE "Número:"\n    LEA n\n'
+              '    SI n > 5 ENTONCES\n        MUESTRE "grande"\n    SINO\n        MUESTRE "pequeño"\n'
+              '    FINSI\n    MUESTRE "fin"\nFINALGORITMO\n')
+    ast, _, _ = analizar(codigo)
+    destino = DestinoMemoria()
+    interprete = Interpreter(salida=SalidaBuffer(destino))
+    controlador = ControladorPasos(interprete.ejecutar_por_pasos(ast))
+    while controlador.paso() is not None:
+        evento = controlador.actual
+        if controlador.esperando_entrada:
+            print(f"  {evento} -> 7")
+            controlador.entregar_entrada("7")
+        else:
+            print(f"  línea {evento.linea}, columna {evento.columna}: {type(evento).__name__}")
+    print(f"Salida: {destino.lineas}")
+
+    controlador = ControladorPasos(Interpreter(salida=SalidaBuffer(DestinoMemoria()))
+                                   .ejecutar_por_pasos(ast), puntos_interrupcion={6})
+    controlador.continuar(100)
+    print(f"Punto de interrupción en la línea 6: detenido en {controlador.actual}")
+    controlador.entregar_entrada("9")
+    controlador.continuar(100)
+    print(f"Tras la entrada, detenido en la línea {controlador.actual.linea}")
+
+    # Benchmark: 300.000 sentencias (asignaciones, SI y LEA)
+    N = 100_000
+    x = Token("ID", "x", 1, 1)
+    suma = Token("OP_SUMA", "+", 1, 1)
+    uno = LiteralNode(Token("NUMERO_ENTERO", "1", 1, 1))
+    cuerpo = [DefinicionVariableNode([x], Token("TIPO_ENTERO", "ENTERO", 1, 1))]
+    for i in range(N):
+        incremento = AsignacionNode(x, OperacionBinariaNode(VariableNode(x), suma, uno))
+        incremento.linea = i + 2
+        si = SiNode(OperacionBinariaNode(VariableNode(x), Token("OP_MAYOR", ">", 1, 1),
+                                         LiteralNode(Token("NUMERO_ENTERO", "0", 1, 1))),
+                    [MuestreNode([VariableNode(x)])] if i % 1000 == 0 else [], None)
+        cuerpo.append(incremento)
+        cuerpo.append(si if i % 100 else LeaNode(x))
+    programa = ProgramaNode(Token("ID", "Pasos", 1, 1), cuerpo)
+
+    def medir(ejecutar, repeticiones=5):
+        mejor = float("inf")
+        for _ in range(repeticiones):
+            interprete = Interpreter(console_input_func=lambda: "0", salida=SalidaBuffer(DestinoMemoria()))
+            inicio = time.perf_counter()
+            ejecutar(interprete)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        return mejor
+
+    def con_controlador(interprete):
+        controlador = ControladorPasos(interprete.ejecutar_por_pasos(programa))
+        while not controlador.continuar(2000):
+            pass
+        while not controlador.terminado:
+            controlador.entregar_entrada("0")
+            controlador.continuar(2000)
+
+    base = medir(lambda i: i.interpret(programa))
+    generador = medir(lambda i: ejecutar_completo(i.ejecutar_por_pasos(programa), i.console_input))
+    controlado = medir(con_controlador)
+    print(f"Intérprete normal:              {base:.3f} s")
+    print(f"Generador sin detenerse:        {generador:.3f} s (x{generador / base:.2f})")
+    print(f"ControladorPasos (tramos 2000): {controlado:.3f} s (x{controlado / base:.2f})")
@@ -0,0 +1,189 @@
+# pseint_colombiano/core/perfilador.py
+"""
+Perfilador de ejecución: cuántas veces y cuánto tiempo se ejecuta cada línea
+del programa y cada tipo de nodo del AST. Se instala reemplazando _visit solo
+en la instancia perfilada (Interpreter(perfilar=True)); sin perfilar no hay
+ningún costo extra.
+
+Tiempos:
+  total: tiempo inclusivo (con lo que se ejecuta dentro, ej. el cuerpo de un SI).
+  propio: tiempo exclusivo. Las expresiones se cuentan en la línea de su sentencia,
+  así la suma de los tiempos propios por línea es el tiempo del programa.
+El tiempo que un LEA pasa esperando a la persona no se cuenta (ni en el LEA ni
+en lo que lo contiene); se informa aparte en tiempo_espera.
+
+Costo: cada nodo visitado paga ~1.5-2.5 µs fijos (dos lecturas del reloj y la
+contabilidad). En programas de expresiones pequeñas eso hace la ejecución unas
+4 veces más lenta (lo mide el demo de este módulo); los tiempos relativos entre
+líneas siguen siendo comparables, los absolutos no.
+"""
+import time
+
+# Índices de las estadísticas [conteo, total, propio]
+CONTEO, TOTAL, PROPIO = 0, 1, 2
+
+_reloj = time.perf_counter
+
+
+def _nombre_tipo(tipo):
+    return tipo[:-len("Node")] if tipo.endswith("Node") else tipo
+
+
+class Perfilador:
+    """Acumula estadísticas por línea, por tipo de nodo y por pila de llamadas."""
+    def __init__(self, interprete):
+        self.por_linea = {} # linea -> [conteo, total, propio]
+        self.por_tipo = {}  # tipo de nodo -> [conteo, total, propio]
+        self.pilas = {}     # tupla de marcos -> tiempo propio (para el archivo de pilas colapsadas)
+        self._marcos = {}   # (tipo, linea) -> nombre del marco, para no formatearlo en cada visita
+        self._pila = []     # [tiempo de los hijos, linea a la que se atribuye] por nodo en curso
+        self._ruta = ()
+        self.tiempo_espera = 0.0 # Acumulado de esperas de entrada; se descuenta de los nodos en curso
+        self._visitar = interprete._visit
+        interprete._visit = self._visit_perfilado
+        interprete.console_input = self._medir_espera(interprete.console_input)
+
+    def _medir_espera(self, leer):
+        def leer_medido():
+            inicio = _reloj()
+            try:
+                return leer()
+            finally:
+                self.tiempo_espera += _reloj() - inicio
+        return leer_medido
+
+    def _visit_perfilado(self, node):
+        tipo = type(node).__name__
+        linea = node.linea
+        pila = self._pila
+        if linea is None: # Expresión (o nodo sin posición): se atribuye a la sentencia que la contiene
+            linea_atribuida = pila[-1][1] if pila else None
+        else:
+            linea_atribuida = linea
+        marco = self._marcos.get((tipo, linea))
+        if marco is None:
+            marco = _nombre_tipo(tipo) if linea is None else f"{_nombre_tipo(tipo)} (línea {linea})"
+            self._marcos[(tipo, linea)] = marco
+        ruta_padre = self._ruta
+        ruta = self._ruta = ruta_padre + (marco,)
+        actual = [0.0, linea_atribuida]
+        pila.append(actual)
+        espera_inicial = self.tiempo_espera
+        inicio = _reloj()
+        try:
+            return self._visitar(node)
+        finally:
+            duracion = _reloj() - inicio - (self.tiempo_espera - espera_inicial)
+            pila.pop()
+            self._ruta = ruta_padre
+            propio = duracion - actual[0]
+            if pila:
+                pila[-1][0] += duracion
+
+            estadistica = self.por_tipo.get(tipo)
+            if estadistica is None:
+                estadistica = self.por_tipo[tipo] = [0, 0.0, 0.0]
+            estadistica[CONTEO] += 1
+            estadistica[TOTAL] += duracion
+            estadistica[PROPIO] += propio
+
+            if linea_atribuida is not None:
+                estadistica = self.por_linea.get(linea_atribuida)
+                if estadistica is None:
+                    estadistica = self.por_linea[linea_atribuida] = [0, 0.0, 0.0]
+                if linea is not None: # Solo las sentencias cuentan como ejecuciones de la línea
+                    estadistica[CONTEO] += 1
+                    estadistica[TOTAL] += duracion
+                estadistica[PROPIO] += propio
+
+            self.pilas[ruta] = self.pilas.get(ruta, 0.0) + propio
+
+    # --- Resultados ---
+    @property
+    def tiempo_total(self):
+        return sum(estadistica[PROPIO] for estadistica in self.por_tipo.values())
+
+    def lineas_calientes(self, n=None):
+        """[(linea, conteo, total, propio)] ordenado por tiempo propio, de mayor a menor."""
+        filas = sorted(((linea, *estadistica) for linea, estadistica in self.por_linea.items()),
+                       key=lambda fila: fila[3], reverse=True)
+        return filas[:n] if n is not None else filas
+
+    def calor_por_linea(self):
+        """{linea: fracción entre 0 y 1} relativa a la línea más costosa (para sombrear el editor)."""
+        maximo = max((estadistica[PROPIO] for estadistica in self.por_linea.values()), default=0.0)
+        if maximo <= 0:
+            return {}
+        return {linea: estadistica[PROPIO] / maximo for linea, estadistica in self.por_linea.items()}
+
+    def reporte(self, codigo=None, n=15):
+        """Reporte de puntos calientes en texto. Con `codigo` incluye el texto de cada línea."""
+        total = self.tiempo_total or 1e-12
+        lineas_codigo = codigo.splitlines() if codigo is not None else []
+        partes = [f"Tiempo perfilado: {total * 1000:.2f} ms"
+                  + (f" (sin {self.tiempo_espera * 1000:.2f} ms esperando entrada)" if self.tiempo_espera else ""),
+                  "",
+                  f"{'Línea':>6} {'Ejecuciones':>11} {'Total ms':>10} {'Propio ms':>10} {'%':>6}  Código"]
+        for linea, conteo, tiempo, propio in self.lineas_calientes(n):
+            texto = lineas_codigo[linea - 1].strip() if 0 < linea <= len(lineas_codigo) else ""
+            partes.append(f"{linea:>6} {conteo:>11} {tiempo * 1000:>10.2f} {propio * 1000:>10.2f} "
+                          f"{100 * propio / total:>5.1f}%  {texto}")
+        partes += ["", f"{'Nodo':<22} {'Visitas':>9} {'Total ms':>10} {'Propio ms':>10} {'%':>6}"]
+        for tipo, (conteo, tiempo, propio) in sorted(self.por_tipo.items(), key=lambda t: t[1][PROPIO], reverse=True):
+            partes.append(f"{_nombre_tipo(tipo):<22} {conteo:>9} {tiempo * 1000:>10.2f} {propio * 1000:>10.2f} "
+                          f"{100 * propio / total:>5.1f}%")
+        return "\n".join(partes)
+
+    def escribir_pilas(self, flujo):
+        """Escribe las pilas colapsadas ("marco;marco;marco microsegundos"), formato de flamegraph.pl y speedscope."""
+        for ruta, propio in sorted(self.pilas.items()):
+            microsegundos = round(propio * 1e6)
+            if microsegundos > 0:
+                flujo.write(f"{';'.join(ruta)} {microsegundos}\n")
+
+
+if __name__ == '__main__':
+    # Reporte de un programa real y sobrecosto del perfilador frente a no perfilar.
+    import io
+    from .ejecutor import analizar
+    from .interpreter import Interpreter
+    from .salida import SalidaBuffer, DestinoMemoria
+
+    lineas = ["ALGORITMO Perfil", "    DEFINA a, b, c COMO ENTERO", "    DEFINA s COMO TEXTO", "    a = 7", "    b = 3"]
+    for i in range(300):
+        lineas += [f"    c = (a * {i} + b) % 97",
+                   "    s = s + c",
+                   "    SI c > 48 ENTONCES", "        MUESTRE \"alto \", c", "    SINO", "        b = b + 1", "    FINSI"]
+    lineas.append("FINALGORITMO")
+    codigo = "\n".join(lineas)
+    ast, _, _ = analizar(codigo)
+
+    def medir(perfilar, repeticiones=7):
+        mejor, interprete = float("inf"), None
+        for _ in range(repeticiones):
+            interprete = Interpreter(salida=SalidaBuffer(DestinoMemoria()), perfilar=perfilar)
+            inicio = time.perf_counter()
+            interprete.interpret(ast)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        return mejor, interprete
+
+    base, _ = medir(False)
+    perfilado, interprete = medir(True)
+    print(interprete.perfilador.reporte(codigo, n=8))
+    pilas = io.StringIO()
+    interprete.perfilador.escribir_pilas(pilas)
+    print(f"\nPilas colapsadas ({len(pilas.getvalue().splitlines())} líneas), por ejemplo:")
+    print("\n".join(pilas.getvalue().splitlines()[:3]))
+    # Un LEA que espera 0.2 s a la persona no debe aparecer como la línea más costosa
+    def entrada_lenta():
+        time.sleep(0.2)
+        return "5"
+    con_lea, _, _ = analizar("ALGORITMO Lea\n    DEFINA n COMO ENTERO\n    LEA n\n    n = n * 2\nFINALGORITMO")
+    interprete_lea = Interpreter(console_input_func=entrada_lenta, salida=SalidaBuffer(DestinoMemoria()), perfilar=True)
+    interprete_lea.interpret(con_lea)
+    linea_lea = interprete_lea.perfilador.por_linea[3]
+    print(f"\nLEA con 0.2 s de espera: {linea_lea[TOTAL] * 1000:.3f} ms contados, "
+          f"{interprete_lea.perfilador.tiempo_espera * 1000:.1f} ms de espera excluidos")
+
+    print(f"\nSin perfilar: {base * 1000:.2f} ms; perfilando: {perfilado * 1000:.2f} ms "
+          f"(x{perfilado / base:.2f}, {(perfilado - base) / sum(e[CONTEO] for e in interprete.perfilador.por_tipo.values()) * 1e6:.2f} µs por nodo)")
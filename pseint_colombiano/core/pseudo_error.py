@@ -28,6 +28,43 @@ class PseudoRuntimeError(PseudoError):
     """Errores durante la ejecución/interpretación del pseudocódigo."""
     pass
 
+class PseudoEjecucionCanceladaError(PseudoRuntimeError):
+    """La ejecución fue detenida desde fuera (ej. el botón Detener de la GUI)."""
+    pass
+
+class PseudoLimiteExcedidoError(PseudoRuntimeError):
+    """
+    El programa superó un límite de ejecución configurado.
+    `limite` es "pasos", "tiempo" o "memoria"; `estadisticas` es el consumo al detenerse.
+    """
+    def __init__(self, message, limite, estadisticas, line=None, column=None):
+        super().__init__(message, line, column)
+        self.limite = limite
+        self.estadisticas = estadisticas
+
+class PseudoAnalisisCanceladoError(PseudoError):
+    """Un análisis en segundo plano quedó viejo (el texto cambió) y se abandonó."""
+    pass
+
+
+class Diagnostico:
+    """
+    Error de análisis con posición, para marcarlo en el editor: `tipo` es "lexico"
+    o "sintactico"; linea y columna empiezan en 1 y `largo` son los caracteres
+    que abarca. `mensaje` es el mismo texto que la lista de errores.
+    """
+    __slots__ = ("tipo", "mensaje", "linea", "columna", "largo")
+
+    def __init__(self, tipo, mensaje, linea, columna, largo=1):
+        self.tipo = tipo
+        self.mensaje = mensaje
+        self.linea = linea
+        self.columna = columna
+        self.largo = max(1, largo)
+
+    def __repr__(self):
+        return f"Diagnostico({self.tipo}, {self.linea}:{self.columna}, {self.mensaje!r})"
+
 if __name__ == '__main__':
     try:
         raise PseudoLexerError("Caracter inválido '$'", line=5, column=10)
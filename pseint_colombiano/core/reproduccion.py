@@ -0,0 +1,448 @@
+# pseint_colombiano/core/reproduccion.py
+"""
+Reproducción determinista e instantáneas del estado de ejecución.
+
+Registro de reproducción: las entradas que consumió cada LEA (con el paso en
+que se leyeron), el total de pasos y un hash de la salida. Volver a ejecutar
+el programa con ese registro debe dar exactamente los mismos pasos y la
+misma salida; reproducir() lo verifica.
+
+Instantánea: tabla de símbolos, contador de programa (id_nodo de la próxima
+sentencia), pasos, entradas consumidas y líneas de salida ya emitidas, en un
+archivo binario compacto. restaurar() continúa desde ahí sin volver a
+ejecutar lo anterior. El lenguaje no tiene ciclos ni funciones, así que la
+próxima sentencia determina por sí sola la posición en el programa.
+
+Pasos = sentencias iniciadas (las de los cuerpos de SI incluidas).
+"""
+import hashlib
+import json
+import os
+import struct
+import zlib
+
+from .ast_nodes import ASTNode, SiNode
+from .ejecutor import analizar, resultado_de_analisis, resultado_de_error
+from .interpreter import Interpreter
+from .lexer import Token
+from .pseudo_error import PseudoRuntimeError
+from .texto import TextoAcumulado, es_texto
+
+# Versión de la semántica del intérprete. Subirla cuando un cambio altere salidas o
+# resultados: invalida los resultados guardados (servicio/cache_resultados.py).
+VERSION_MOTOR = "1"
+
+# Funciones cuyo resultado no depende solo del programa y sus entradas. El lenguaje
+# todavía no las implementa; un programa que las nombre no se reproduce ni se cachea.
+FUNCIONES_NO_DETERMINISTAS = frozenset(("AZAR", "ALEATORIO", "FECHAACTUAL", "HORAACTUAL"))
+
+FORMATO_REGISTRO = "pseudocol-reproduccion/1"
+MAGIA_INSTANTANEA = b"PSCOLINS"
+VERSION_INSTANTANEA = 1
+
+# Encabezado: magia, versión, huella del programa (sha256), longitud del cuerpo comprimido
+_ENCABEZADO = struct.Struct("<8sB32sI")
+# Cuerpo: id de la próxima sentencia, pasos, entradas consumidas, líneas de salida, cantidad de variables
+_ESTADO = struct.Struct("<IQIQI")
+
+# Atributos que no cambian el significado del programa (posiciones, numeración, la huella misma)
+_ATRIBUTOS_IGNORADOS = frozenset(("linea", "columna", "id_nodo", "cantidad_sentencias", "huella"))
+
+# Visitantes de sentencias que cuentan un paso (SI y LEA se cuentan en _elegir_rama y _verificar_lea)
+_TIPOS_CONTADOS = ("DefinicionVariableNode", "MuestreNode", "AsignacionNode")
+
+
+def huella_ast(ast):
+    """
+    sha256 (hex) del AST sin posiciones: igual para el mismo programa con otro
+    formato o comentarios. Recorrerlo cuesta casi lo mismo que ejecutarlo, así
+    que se calcula una vez y queda en ast.huella.
+    """
+    if ast.huella is not None:
+        return ast.huella
+    campos = {} # tipo de nodo -> atributos que se incluyen, en orden fijo
+    partes = []
+    agregar = partes.append
+    pendientes = [ast] # Recorrido iterativo en preorden (sin límite de recursión)
+    sacar, extender = pendientes.pop, pendientes.extend
+    while pendientes:
+        valor = sacar()
+        tipo = type(valor)
+        if tipo is Token:
+            agregar(valor.type)
+            agregar(valor.value)
+        elif tipo is list:
+            agregar(f"[{len(valor)}")
+            extender(reversed(valor))
+        elif isinstance(valor, ASTNode):
+            nombres = campos.get(tipo)
+            if nombres is None:
+                nombres = campos[tipo] = tuple(sorted(n for n in vars(valor) if n not in _ATRIBUTOS_IGNORADOS))
+            agregar(tipo.__name__)
+            atributos = valor.__dict__
+            extender([atributos[nombre] for nombre in reversed(nombres)])
+        else:
+            agregar(repr(valor))
+    ast.huella = hashlib.sha256("\x1f".join(partes).encode("utf-8")).hexdigest()
+    return ast.huella
+
+
+def es_determinista(ast):
+    """False si el programa usa (o nombra) alguna de FUNCIONES_NO_DETERMINISTAS."""
+    pendientes = [ast]
+    while pendientes:
+        valor = pendientes.pop()
+        if type(valor) is Token:
+            if valor.type == "ID" and valor.value.upper() in FUNCIONES_NO_DETERMINISTAS:
+                return False
+        elif type(valor) is list:
+            pendientes.extend(valor)
+        elif isinstance(valor, ASTNode):
+            pendientes.extend(vars(valor).values())
+    return True
+
+
+def continuacion(ast, id_sentencia):
+    """
+    [(sentencias, indice)] para reanudar en la sentencia `id_sentencia`, de la
+    lista más interna a la más externa (ver Interpreter.interpret).
+    """
+    def buscar(sentencias):
+        for indice, sentencia in enumerate(sentencias):
+            if sentencia.id_nodo == id_sentencia:
+                return [(sentencias, indice)]
+            if isinstance(sentencia, SiNode):
+                for cuerpo in (sentencia.cuerpo_si, sentencia.cuerpo_sino):
+                    ruta = buscar(cuerpo or ())
+                    if ruta is not None:
+                        return ruta + [(sentencias, indice + 1)] # Al terminar el SI sigue la siguiente
+        return None
+
+    ruta = buscar(ast.cuerpo)
+    if ruta is None:
+        raise ValueError(f"El programa no tiene una sentencia con id {id_sentencia}.")
+    return ruta
+
+
+class RegistroReproduccion:
+    """Lo necesario para repetir una ejecución: entradas de LEA, pasos y hash de la salida."""
+    def __init__(self, programa, entradas=None, pasos=0, lineas_salida=0, salida_sha256=None):
+        self.programa = programa # huella_ast del programa
+        self.entradas = entradas if entradas is not None else [] # [(paso, texto leído)]
+        self.pasos = pasos
+        self.lineas_salida = lineas_salida
+        self.salida_sha256 = salida_sha256
+
+    def a_json(self):
+        return json.dumps({"formato": FORMATO_REGISTRO, "programa": self.programa,
+                           "entradas": [list(entrada) for entrada in self.entradas], "pasos": self.pasos,
+                           "lineas_salida": self.lineas_salida, "salida_sha256": self.salida_sha256},
+                          ensure_ascii=False)
+
+    @classmethod
+    def desde_json(cls, texto):
+        datos = json.loads(texto)
+        if datos.get("formato") != FORMATO_REGISTRO:
+            raise ValueError(f"Formato de registro desconocido: {datos.get('formato')!r}")
+        return cls(datos["programa"], [tuple(entrada) for entrada in datos["entradas"]], datos["pasos"],
+                   datos["lineas_salida"], datos["salida_sha256"])
+
+    def guardar(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(self.a_json())
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, "r", encoding="utf-8") as f:
+            return cls.desde_json(f.read())
+
+    def __repr__(self):
+        return f"RegistroReproduccion(entradas={len(self.entradas)}, pasos={self.pasos}, lineas_salida={self.lineas_salida})"
+
+
+def _codificar_valor(valor):
+    # bool antes que int: en Python True es un int
+    if isinstance(valor, bool):
+        return b"b" + bytes((valor,))
+    if isinstance(valor, int):
+        datos = valor.to_bytes(valor.bit_length() // 8 + 1, "little", signed=True)
+        return b"i" + struct.pack("<I", len(datos)) + datos
+    if isinstance(valor, float):
+        return b"f" + struct.pack("<d", valor) # Exacto bit a bit
+    if es_texto(valor):
+        datos = str(valor).encode("utf-8")
+        return b"t" + struct.pack("<I", len(datos)) + datos
+    raise ValueError(f"No se puede guardar un valor de tipo {type(valor).__name__} en una instantánea.")
+
+
+def _codificar_cadena(texto):
+    datos = texto.encode("utf-8")
+    return struct.pack("<H", len(datos)) + datos
+
+
+class _Lector:
+    def __init__(self, datos):
+        self.datos = datos
+        self.pos = 0
+
+    def leer(self, n):
+        parte = self.datos[self.pos:self.pos + n]
+        if len(parte) != n:
+            raise ValueError("Instantánea truncada.")
+        self.pos += n
+        return parte
+
+    def leer_struct(self, formato):
+        return formato.unpack(self.leer(formato.size))
+
+    def leer_cadena(self):
+        (n,) = struct.unpack("<H", self.leer(2))
+        return self.leer(n).decode("utf-8")
+
+    def leer_valor(self):
+        etiqueta = self.leer(1)
+        if etiqueta == b"b":
+            return self.leer(1) != b"\x00"
+        if etiqueta == b"f":
+            return struct.unpack("<d", self.leer(8))[0]
+        (n,) = struct.unpack("<I", self.leer(4))
+        if etiqueta == b"i":
+            return int.from_bytes(self.leer(n), "little", signed=True)
+        if etiqueta == b"t":
+            return TextoAcumulado(self.leer(n).decode("utf-8"))
+        raise ValueError(f"Valor desconocido en la instantánea: {etiqueta!r}")
+
+
+class Instantanea:
+    """Estado de una ejecución detenida justo antes de la sentencia `id_sentencia`."""
+    def __init__(self, programa, id_sentencia, pasos, entradas, lineas_salida, variables):
+        self.programa = programa # huella_ast
+        self.id_sentencia = id_sentencia
+        self.pasos = pasos # Sentencias ya iniciadas
+        self.entradas = entradas # LEA ya leídos (posición en la cinta de entrada)
+        self.lineas_salida = lineas_salida # Líneas de MUESTRE ya emitidas
+        self.variables = variables # [(nombre, tipo, valor)]
+
+    def a_bytes(self):
+        cuerpo = [_ESTADO.pack(self.id_sentencia, self.pasos, self.entradas, self.lineas_salida, len(self.variables))]
+        for nombre, tipo, valor in self.variables:
+            cuerpo += [_codificar_cadena(nombre), _codificar_cadena(tipo or ""), _codificar_valor(valor)]
+        comprimido = zlib.compress(b"".join(cuerpo))
+        return _ENCABEZADO.pack(MAGIA_INSTANTANEA, VERSION_INSTANTANEA, bytes.fromhex(self.programa),
+                                len(comprimido)) + comprimido
+
+    @classmethod
+    def desde_bytes(cls, datos):
+        lector = _Lector(datos)
+        magia, version, programa, longitud = lector.leer_struct(_ENCABEZADO)
+        if magia != MAGIA_INSTANTANEA or version != VERSION_INSTANTANEA:
+            raise ValueError("El archivo no es una instantánea de PseudoCol compatible.")
+        lector = _Lector(zlib.decompress(lector.leer(longitud)))
+        id_sentencia, pasos, entradas, lineas_salida, cantidad = lector.leer_struct(_ESTADO)
+        variables = [(lector.leer_cadena(), lector.leer_cadena() or None, lector.leer_valor())
+                     for _ in range(cantidad)]
+        return cls(programa.hex(), id_sentencia, pasos, entradas, lineas_salida, variables)
+
+    def guardar(self, ruta):
+        """Escritura atómica: un punto de control a medio escribir no reemplaza al anterior."""
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(self.a_bytes())
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, "rb") as f:
+            return cls.desde_bytes(f.read())
+
+    def __repr__(self):
+        return (f"Instantanea(id_sentencia={self.id_sentencia}, pasos={self.pasos}, entradas={self.entradas}, "
+                f"lineas_salida={self.lineas_salida}, variables={len(self.variables)})")
+
+
+class Grabador:
+    """
+    Registra una ejecución reemplazando, solo en la instancia, los métodos que
+    inician sentencias, leen entradas y escriben salida.
+
+    Con `cada` y `al_capturar`, toma una instantánea cada `cada` pasos (antes de
+    la sentencia) y se la pasa a al_capturar(instantanea), ej. Instantanea.guardar.
+    `inicio` (una Instantanea) continúa la cuenta de pasos, entradas y salida.
+    """
+    def __init__(self, interprete, ast, cada=None, al_capturar=None, inicio=None):
+        self.interprete = interprete
+        self.registro = RegistroReproduccion(huella_ast(ast))
+        self.pasos = inicio.pasos if inicio is not None else 0
+        self.entradas = inicio.entradas if inicio is not None else 0
+        self.lineas_salida = inicio.lineas_salida if inicio is not None else 0
+        self._hash_salida = hashlib.sha256()
+        self.cada = cada
+        self.al_capturar = al_capturar
+        self._proxima_captura = (self.pasos // cada + 1) * cada if cada else None
+        self._instalar()
+
+    def _instalar(self):
+        interprete = self.interprete
+        for tipo in _TIPOS_CONTADOS:
+            nombre = f"_visit_{tipo}"
+            setattr(interprete, nombre, self._envolver_sentencia(getattr(interprete, nombre)))
+        interprete._elegir_rama = self._envolver_sentencia(interprete._elegir_rama)
+        interprete._verificar_lea = self._envolver_sentencia(interprete._verificar_lea)
+        convertir = interprete._convertir_entrada
+        def convertir_grabado(nombre, texto):
+            self.registro.entradas.append((self.pasos, texto))
+            self.entradas += 1
+            return convertir(nombre, texto)
+        interprete._convertir_entrada = convertir_grabado
+        escribir, actualizar = interprete._escribir, self._hash_salida.update
+        def escribir_grabado(texto):
+            self.lineas_salida += 1
+            actualizar(texto.encode("utf-8") + b"\n")
+            escribir(texto)
+        interprete._escribir = escribir_grabado
+
+    def _envolver_sentencia(self, original):
+        def sentencia_grabada(node):
+            if self._proxima_captura is not None and self.pasos >= self._proxima_captura:
+                self._proxima_captura += self.cada
+                self.al_capturar(self.capturar(node))
+            self.pasos += 1
+            return original(node)
+        return sentencia_grabada
+
+    def capturar(self, siguiente):
+        """Instantánea del estado actual; `siguiente` es la sentencia que aún no se inició."""
+        simbolos = self.interprete.symbol_table.symbols
+        variables = [(nombre, simbolo["type"], simbolo["value"]) for nombre, simbolo in simbolos.items()]
+        return Instantanea(self.registro.programa, siguiente.id_nodo, self.pasos, self.entradas,
+                           self.lineas_salida, variables)
+
+    def terminar(self):
+        """Completa el registro con los totales. Llamar después de interpret()."""
+        self.registro.pasos = self.pasos
+        self.registro.lineas_salida = self.lineas_salida
+        self.registro.salida_sha256 = self._hash_salida.hexdigest()
+        return self.registro
+
+
+def restaurar(interprete, ast, instantanea):
+    """Carga el estado de `instantanea` en `interprete` y ejecuta el resto del programa."""
+    if instantanea.programa != huella_ast(ast):
+        raise ValueError("La instantánea es de otro programa.")
+    ruta = continuacion(ast, instantanea.id_sentencia)
+    for nombre, tipo, valor in instantanea.variables:
+        interprete.symbol_table.define(nombre, valor, tipo)
+    return interprete.interpret(ast, continuacion=ruta)
+
+
+def reproducir(ast, registro, salida=None, limites=None):
+    """
+    Vuelve a ejecutar con las entradas del registro y compara pasos y salida.
+    Devuelve (ResultadoEjecucion, [diferencias]); sin diferencias la reproducción es exacta.
+    """
+    entradas = iter(registro.entradas)
+    diferencias = []
+
+    def leer():
+        try:
+            paso, texto = next(entradas)
+        except StopIteration:
+            raise PseudoRuntimeError("El registro no tiene más entradas para LEA.")
+        if paso != grabador.pasos:
+            diferencias.append(f"LEA en el paso {grabador.pasos}, el registro lo tiene en el paso {paso}")
+        return texto
+
+    interprete = Interpreter(console_input_func=leer, salida=salida, reportar_errores=False, limites=limites)
+    grabador = Grabador(interprete, ast)
+    if grabador.registro.programa != registro.programa:
+        diferencias.append("El registro es de otro programa.")
+    interprete.interpret(ast)
+    obtenido = grabador.terminar()
+    for campo in ("pasos", "lineas_salida", "salida_sha256"):
+        if getattr(obtenido, campo) != getattr(registro, campo):
+            diferencias.append(f"{campo}: registro {getattr(registro, campo)}, reproducción {getattr(obtenido, campo)}")
+    if len(obtenido.entradas) != len(registro.entradas):
+        diferencias.append(f"entradas leídas: registro {len(registro.entradas)}, reproducción {len(obtenido.entradas)}")
+    return resultado_de_error(interprete.error_ejecucion), diferencias
+
+
+def ejecutar_grabando(codigo, console_input_func=None, salida=None, limites=None,
+                      cada=None, al_capturar=None, desde=None):
+    """
+    Como ejecutor.ejecutar_codigo, pero grabando: resultado.registro queda con el
+    RegistroReproduccion. Con `desde` (una Instantanea) continúa esa ejecución; las
+    entradas que ya había consumido se saltan de console_input_func, que debe ser
+    la misma cinta de entrada de la ejecución original.
+    """
+    ast, errores_lexicos, errores_sintacticos = analizar(codigo)
+    resultado = resultado_de_analisis(ast, errores_lexicos, errores_sintacticos)
+    if resultado is not None:
+        return resultado
+    interprete = Interpreter(console_input_func=console_input_func, salida=salida,
+                             reportar_errores=False, limites=limites)
+    grabador = Grabador(interprete, ast, cada=cada, al_capturar=al_capturar, inicio=desde)
+    if desde is None:
+        interprete.interpret(ast)
+    else:
+        try:
+            for _ in range(desde.entradas):
+                interprete.console_input()
+        except PseudoRuntimeError as e:
+            return resultado_de_error(e)
+        restaurar(interprete, ast, desde)
+    resultado = resultado_de_error(interprete.error_ejecucion)
+    resultado.registro = grabador.terminar()
+    return resultado
+
+
+if __name__ == '__main__':
+    # 1) Grabar y reproducir una ejecución con LEA. 2) Reanudar desde una instantánea a mitad
+    # de un programa largo frente a volver a ejecutarlo desde el principio.
+    import tempfile
+    import time
+    from .salida import SalidaBuffer, DestinoMemoria
+
+    codigo = ('ALGORITMO Registro\n    DEFINA n COMO ENTERO\n    DEFINA r COMO REAL\n    DEFINA s COMO TEXTO\n'
+              '    LEA n\n    LEA s\n    r = n / 3\n    SI n > 5 ENTONCES\n        MUESTRE "grande ", s, " ", r\n'
+              '    FINSI\nFINALGORITMO\n')
+    ast, _, _ = analizar(codigo)
+    entradas = iter(["7", "Ana"])
+    destino = DestinoMemoria()
+    interprete = Interpreter(console_input_func=lambda: next(entradas), salida=SalidaBuffer(destino))
+    grabador = Grabador(interprete, ast)
+    interprete.interpret(ast)
+    registro = RegistroReproduccion.desde_json(grabador.terminar().a_json())
+    print(f"Grabado: {registro.a_json()}")
+    destino_reproduccion = DestinoMemoria()
+    resultado, diferencias = reproducir(ast, registro, SalidaBuffer(destino_reproduccion))
+    print(f"Reproducción: {resultado}, diferencias={diferencias}, "
+          f"salida idéntica={destino_reproduccion.lineas == destino.lineas}")
+    registro.entradas[0] = (registro.entradas[0][0], "2")
+    print(f"Con otra entrada: {reproducir(ast, registro, SalidaBuffer(DestinoMemoria()))[1]}")
+
+    # Cálculo largo: cada sentencia opera con enteros de miles de dígitos
+    lineas = ["ALGORITMO Largo", "    DEFINA x, m COMO ENTERO", "    m = " + "9" * 4000 + "7", "    x = 7"]
+    lineas += [f"    x = (x * x + {i}) % m" for i in range(2000)]
+    lineas += ["    MUESTRE x % 1000000007", "FINALGORITMO"]
+    largo, _, _ = analizar("\n".join(lineas))
+    total_pasos = largo.cantidad_sentencias
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "punto_control.bin")
+        destino = DestinoMemoria()
+        interprete = Interpreter(salida=SalidaBuffer(destino))
+        Grabador(interprete, largo, cada=int(total_pasos * 0.9), al_capturar=lambda i: i.guardar(ruta))
+        inicio = time.perf_counter()
+        interprete.interpret(largo)
+        completo = time.perf_counter() - inicio
+
+        largo.huella = None # Como en un proceso nuevo: restaurar vuelve a calcular la huella
+        inicio = time.perf_counter()
+        instantanea = Instantanea.cargar(ruta)
+        destino_restaurado = DestinoMemoria()
+        restaurar(Interpreter(salida=SalidaBuffer(destino_restaurado)), largo, instantanea)
+        restaurado = time.perf_counter() - inicio
+        print(f"\n{instantanea}, {os.path.getsize(ruta)} bytes")
+        print(f"Ejecución completa ({total_pasos} pasos, con grabador): {completo:.3f} s")
+        print(f"Restaurar al 90% y terminar: {restaurado * 1000:.1f} ms (x{completo / restaurado:.1f} más rápido); "
+              f"misma salida final: {destino_restaurado.lineas == destino.lineas}")
@@ -0,0 +1,210 @@
+# pseint_colombiano/core/salida.py
+"""
+Subsistema de salida del intérprete (MUESTRE).
+Acumula las líneas en un búfer y las entrega a un destino intercambiable
+(GUI, stdout, archivo, memoria) en lotes, según una política explícita de vaciado.
+"""
+import math
+import sys
+import threading
+import time
+
+# --- Destinos ---
+# Un destino solo necesita implementar escribir_lineas(lineas) y, opcionalmente, cerrar().
+
+class DestinoFuncion:
+    """Entrega cada lote a una función que recibe un texto (ej. ConsoleFrame.write_output o print)."""
+    def __init__(self, funcion):
+        self.funcion = funcion
+
+    def escribir_lineas(self, lineas):
+        # Un solo llamado por lote; la función añade el salto de línea final, como print.
+        self.funcion("\n".join(lineas))
+
+    def cerrar(self):
+        pass
+
+
+class DestinoEstandar:
+    """Escribe en un flujo de texto (por defecto sys.stdout)."""
+    def __init__(self, flujo=None):
+        self.flujo = flujo
+
+    def escribir_lineas(self, lineas):
+        flujo = self.flujo or sys.stdout # Resolver tarde por si sys.stdout fue reemplazado
+        flujo.write("\n".join(lineas) + "\n")
+        flujo.flush()
+
+    def cerrar(self):
+        pass
+
+
+class DestinoArchivo:
+    """Escribe en un archivo de texto (UTF-8)."""
+    def __init__(self, ruta, modo="w"):
+        self.archivo = open(ruta, modo, encoding="utf-8")
+
+    def escribir_lineas(self, lineas):
+        self.archivo.write("\n".join(lineas) + "\n")
+
+    def cerrar(self):
+        if not self.archivo.closed:
+            self.archivo.close()
+
+
+class DestinoMemoria:
+    """Guarda las líneas en una lista (útil para calificación automática y pruebas)."""
+    def __init__(self):
+        self.lineas = []
+
+    def escribir_lineas(self, lineas):
+        self.lineas.extend(lineas)
+
+    def texto(self):
+        return "\n".join(self.lineas)
+
+    def cerrar(self):
+        pass
+
+
+class DestinoComparador:
+    """
+    Compara la salida, a medida que llega, contra un archivo de salida esperada.
+    No guarda la transcripción: solo la primera diferencia y los contadores.
+    """
+    def __init__(self, ruta_esperada):
+        self.esperado = open(ruta_esperada, "r", encoding="utf-8")
+        self.lineas_comparadas = 0
+        self.primera_diferencia = None # dict con linea, esperado y obtenido
+
+    def escribir_lineas(self, lineas):
+        if self.primera_diferencia is not None:
+            return # Ya se sabe que la salida es incorrecta; no seguir leyendo
+        # Un MUESTRE con saltos internos ocupa varias líneas del archivo esperado
+        for linea in "\n".join(lineas).split("\n"):
+            esperada = self.esperado.readline()
+            self.lineas_comparadas += 1
+            if not esperada or esperada.rstrip("\r\n") != linea:
+                self._registrar_diferencia(esperada.rstrip("\r\n") if esperada else None, linea)
+                return
+
+    def _registrar_diferencia(self, esperada, obtenida):
+        self.primera_diferencia = {
+            "linea": self.lineas_comparadas,
+            "esperado": esperada,
+            "obtenido": obtenida[:200] if obtenida is not None else None,
+        }
+
+    @property
+    def coincide(self):
+        return self.primera_diferencia is None
+
+    def cerrar(self):
+        """Verifica que no falten líneas esperadas y libera el archivo."""
+        if self.esperado.closed:
+            return
+        if self.primera_diferencia is None:
+            restante = self.esperado.readline()
+            if restante:
+                self.lineas_comparadas += 1
+                self._registrar_diferencia(restante.rstrip("\r\n"), None)
+        self.esperado.close()
+
+
+class SalidaBuffer:
+    """
+    Búfer de salida con política de vaciado explícita:
+      - por tamaño: cuando se acumulan `max_caracteres` caracteres,
+      - por tiempo: cuando pasaron `intervalo` segundos desde el último vaciado,
+      - a pedido: vaciar() (el intérprete lo llama antes de cada LEA y al terminar).
+
+    El tiempo se revisa en cada escribir(), pero si el programa deja de escribir
+    (un cálculo largo después de un MUESTRE) nadie volvería a revisarlo. Para eso
+    el intérprete asigna `solicitar_vaciado`: un temporizador lo llama `intervalo`
+    segundos después de la primera línea pendiente, y el intérprete vacía en la
+    próxima frontera de sentencia, en su propio hilo.
+    """
+    def __init__(self, destino, max_caracteres=64 * 1024, intervalo=0.05):
+        self.destino = destino
+        self.max_caracteres = max_caracteres
+        self.intervalo = intervalo
+        self.solicitar_vaciado = None # Función sin argumentos, segura de llamar desde otro hilo
+        self._pendientes = []
+        self._caracteres = 0
+        self._ultimo_vaciado = time.monotonic()
+        self._temporizador = None
+
+    def escribir(self, linea):
+        """Agrega una línea (sin salto final) al búfer."""
+        pendientes = self._pendientes
+        pendientes.append(linea)
+        self._caracteres += len(linea) + 1
+        if self._caracteres >= self.max_caracteres or \
+           time.monotonic() - self._ultimo_vaciado >= self.intervalo:
+            self.vaciar()
+        elif len(pendientes) == 1 and self._temporizador is None and self.solicitar_vaciado is not None:
+            self._armar_temporizador()
+
+    def _armar_temporizador(self):
+        if not math.isfinite(self.intervalo): # Sin vaciado por tiempo (ej. interprete_async)
+            return
+        self._temporizador = threading.Timer(self.intervalo, self._vencio_temporizador)
+        self._temporizador.daemon = True
+        self._temporizador.start()
+
+    def _vencio_temporizador(self):
+        self._temporizador = None
+        solicitar = self.solicitar_vaciado
+        if solicitar is not None and self._pendientes:
+            solicitar()
+
+    def vaciar(self):
+        """Entrega al destino todo lo pendiente."""
+        if self._pendientes:
+            lineas = self._pendientes
+            self._pendientes = []
+            self._caracteres = 0
+            self.destino.escribir_lineas(lineas)
+        self._ultimo_vaciado = time.monotonic()
+
+    def cerrar(self):
+        temporizador = self._temporizador
+        if temporizador is not None:
+            temporizador.cancel()
+        self.vaciar()
+        self.destino.cerrar()
+
+
+if __name__ == '__main__':
+    # Benchmark: 10^6 MUESTRE hacia un destino con costo fijo por llamado
+    # (simula ConsoleFrame.write_output: configure + insert + configure + see).
+    from .lexer import Token
+    from .ast_nodes import ProgramaNode, MuestreNode, LiteralNode
+    from .interpreter import Interpreter
+
+    N = 1_000_000
+    literal = LiteralNode(Token("CADENA", '"linea de salida"', 1, 1))
+    programa = ProgramaNode(Token("ID", "Benchmark", 1, 1), [MuestreNode([literal]) for _ in range(N)])
+
+    class DestinoLento:
+        """Cada llamado cuesta ~20 µs, como un widget de texto."""
+        def __init__(self):
+            self.llamados = 0
+            self.lineas = 0
+        def escribir_lineas(self, lineas):
+            self.llamados += 1
+            self.lineas += len(lineas)
+            limite = time.perf_counter() + 20e-6
+            while time.perf_counter() < limite:
+                pass
+        def cerrar(self):
+            pass
+
+    for nombre, buffer_kwargs in (("sin búfer (1 línea por lote)", {"max_caracteres": 1}),
+                                  ("con búfer (64 KB / 50 ms)", {})):
+        destino = DestinoLento()
+        interprete = Interpreter(salida=SalidaBuffer(destino, **buffer_kwargs))
+        inicio = time.perf_counter()
+        interprete.interpret(programa)
+        duracion = time.perf_counter() - inicio
+        print(f"{nombre}: {destino.lineas} líneas, {destino.llamados} llamados al destino, {duracion:.2f} s")
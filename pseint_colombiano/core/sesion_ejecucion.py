@@ -0,0 +1,233 @@
+# pseint_colombiano/core/sesion_ejecucion.py
+"""
+Sesión de ejecución: el ciclo de vida explícito de una ejecución completa
+(análisis léxico, sintáctico e interpretación) en un hilo propio.
+
+Cada cambio de estado se publica como un EventoSesion. Por defecto los
+eventos van a una queue.SimpleQueue (sesion.eventos) que otro hilo consume;
+con `publicar` se entregan a cualquier función segura entre hilos (la GUI usa
+ConsoleFrame.en_hilo_gui, así el evento final llega después de toda la salida
+del programa). Quien consume se entera del fin en cuanto ocurre, sin
+preguntar periódicamente si el hilo sigue vivo ni mirar la consola.
+
+La sesión también mide cuánto duró cada fase.
+"""
+import itertools
+import queue
+import threading
+import time
+
+from .lexer import Lexer
+from .parser import Parser
+from .pseudo_error import PseudoEjecucionCanceladaError
+
+# Estados de una sesión
+ESTADO_EN_COLA = "en_cola"
+ESTADO_LEXICO = "analisis_lexico"
+ESTADO_SINTACTICO = "analisis_sintactico"
+ESTADO_EJECUTANDO = "ejecutando"
+ESTADO_ESPERANDO_ENTRADA = "esperando_entrada"
+ESTADO_FINALIZADA = "finalizada"
+ESTADO_FALLIDA = "fallida"
+ESTADO_CANCELADA = "cancelada"
+
+ESTADOS_FINALES = frozenset((ESTADO_FINALIZADA, ESTADO_FALLIDA, ESTADO_CANCELADA))
+
+_ids = itertools.count(1)
+
+
+class EventoSesion:
+    """Transición de `anterior` a `estado`; `instante` es time.perf_counter()."""
+    __slots__ = ("sesion", "anterior", "estado", "instante", "detalle")
+
+    def __init__(self, sesion, anterior, estado, instante, detalle=None):
+        self.sesion = sesion
+        self.anterior = anterior
+        self.estado = estado
+        self.instante = instante
+        self.detalle = detalle # Lista de errores en ESTADO_FALLIDA
+
+    @property
+    def final(self):
+        return self.estado in ESTADOS_FINALES
+
+    def __repr__(self):
+        return f"EventoSesion({self.sesion.id}: {self.anterior} -> {self.estado})"
+
+
+class SesionEjecucion:
+    """
+    Ejecuta `codigo` con `interprete` (ya creado, para que se pueda cancelar
+    desde el primer instante). Los errores de análisis quedan en
+    errores_lexicos / errores_sintacticos; los de ejecución, en
+    interprete.error_ejecucion. `preparar(ast)` se llama en el hilo de la
+    sesión entre el análisis y la interpretación (ej. instalar la cobertura).
+    Con `analisis` (un ResultadoAnalisis de este mismo código, ver
+    core/analisis_fondo.py) se saltan las fases de análisis.
+    """
+    def __init__(self, codigo, interprete, publicar=None, preparar=None, analisis=None):
+        self.id = next(_ids)
+        self.codigo = codigo
+        self.interprete = interprete
+        self.preparar = preparar
+        self.analisis = analisis
+        self.eventos = queue.SimpleQueue()
+        self.publicar = publicar or self.eventos.put
+        self.estado = ESTADO_EN_COLA
+        self.tiempos = {} # {estado: segundos acumulados en ese estado}
+        self.ast = None
+        self.errores_lexicos = []
+        self.errores_sintacticos = []
+        self.hilo = None
+        self._creada = self._desde = time.perf_counter()
+
+    @property
+    def terminada(self):
+        return self.estado in ESTADOS_FINALES
+
+    @property
+    def duracion(self):
+        """Segundos desde que se creó la sesión (hasta el estado final, si ya terminó)."""
+        return sum(self.tiempos.values()) + (0.0 if self.terminada else time.perf_counter() - self._desde)
+
+    def iniciar(self):
+        """Ejecuta la sesión en un hilo nuevo (daemon) y lo devuelve."""
+        self.hilo = threading.Thread(target=self.ejecutar, daemon=True)
+        self.hilo.start()
+        return self.hilo
+
+    def cancelar(self):
+        """Se puede llamar desde cualquier hilo; la sesión termina en ESTADO_CANCELADA."""
+        self.interprete.cancelar()
+
+    def _cambiar(self, estado, detalle=None):
+        ahora = time.perf_counter()
+        anterior = self.estado
+        self.tiempos[anterior] = self.tiempos.get(anterior, 0.0) + ahora - self._desde
+        self._desde = ahora
+        self.estado = estado
+        self.publicar(EventoSesion(self, anterior, estado, ahora, detalle))
+
+    def _cancelada(self):
+        return self.interprete.control.cancelado
+
+    def ejecutar(self):
+        """Recorre todas las fases en el hilo actual. Siempre termina con un evento final."""
+        try:
+            estado, detalle = self._ejecutar_fases()
+        except Exception as e: # Error interno del análisis o de `preparar`
+            estado, detalle = ESTADO_FALLIDA, [f"Error interno: {e}"]
+        self._cambiar(estado, detalle)
+
+    def _analizar(self):
+        """Fases léxica y sintáctica: deja ast y errores_sintacticos, o devuelve (estado, detalle) final."""
+        analisis = self.analisis
+        if analisis is not None: # Ya analizado en segundo plano
+            self.ast = analisis.ast
+            self.errores_lexicos, self.errores_sintacticos = analisis.errores_lexicos, analisis.errores_sintacticos
+            return (ESTADO_FALLIDA, self.errores_lexicos) if self.errores_lexicos else None
+        self._cambiar(ESTADO_LEXICO)
+        tokens, self.errores_lexicos = Lexer(self.codigo).tokenize()
+        if self.errores_lexicos:
+            return ESTADO_FALLIDA, self.errores_lexicos
+        if self._cancelada():
+            return ESTADO_CANCELADA, None
+        self._cambiar(ESTADO_SINTACTICO)
+        self.ast, self.errores_sintacticos = Parser(tokens).parse()
+        return None
+
+    def _ejecutar_fases(self):
+        if self._cancelada():
+            return ESTADO_CANCELADA, None
+        final = self._analizar()
+        if final is not None:
+            return final
+        if self.errores_sintacticos:
+            return ESTADO_FALLIDA, self.errores_sintacticos
+        if self.ast is None:
+            return ESTADO_FALLIDA, ["Error: No se pudo construir el árbol de sintaxis (AST)."]
+        if self.preparar is not None:
+            self.preparar(self.ast)
+        if self._cancelada():
+            return ESTADO_CANCELADA, None
+
+        interprete = self.interprete
+        leer = interprete.console_input
+        def leer_con_estado():
+            self._cambiar(ESTADO_ESPERANDO_ENTRADA)
+            try:
+                return leer()
+            finally:
+                self._cambiar(ESTADO_EJECUTANDO)
+        interprete.console_input = leer_con_estado
+        self._cambiar(ESTADO_EJECUTANDO)
+        try:
+            interprete.interpret(self.ast)
+        finally:
+            interprete.console_input = leer
+        error = interprete.error_ejecucion
+        if isinstance(error, PseudoEjecucionCanceladaError) or (error is None and self._cancelada()):
+            return ESTADO_CANCELADA, None
+        if error is not None:
+            return ESTADO_FALLIDA, [str(error)]
+        return ESTADO_FINALIZADA, None
+
+    def resumen_tiempos(self):
+        """Texto corto con la duración de cada fase, ej. 'léxico 0.40 ms, sintáctico 1.10 ms, ejecución 12.00 ms'."""
+        nombres = ((ESTADO_LEXICO, "léxico"), (ESTADO_SINTACTICO, "sintáctico"),
+                   (ESTADO_EJECUTANDO, "ejecución"), (ESTADO_ESPERANDO_ENTRADA, "esperando entrada"))
+        return ", ".join(f"{nombre} {self.tiempos[estado] * 1000:.2f} ms"
+                         for estado, nombre in nombres if estado in self.tiempos)
+
+
+if __name__ == '__main__':
+    # Transiciones de un programa con LEA, uno con error léxico y uno cancelado, y la demora
+    # entre el fin real y su aviso frente a revisar is_alive() cada 100 ms.
+    from .interpreter import Interpreter
+    from .salida import SalidaBuffer, DestinoMemoria
+
+    def nuevo_interprete(entradas=()):
+        datos = iter(entradas)
+        return Interpreter(console_input_func=lambda: next(datos),
+                           salida=SalidaBuffer(DestinoMemoria()), reportar_errores=False)
+
+    def consumir(sesion):
+        eventos = []
+        while not eventos or not eventos[-1].final:
+            eventos.append(sesion.eventos.get())
+        return eventos
+
+    codigo = ("ALGORITMO Saludo\n    DEFINA nombre COMO TEXTO\n    MUESTRE \"Nombre:\"\n"
+              "    LEA nombre\n    MUESTRE \"Hola, \", nombre\nFINALGORITMO\n")
+    sesion = SesionEjecucion(codigo, nuevo_interprete(["Ana"]))
+    sesion.iniciar()
+    eventos = consumir(sesion)
+    print(" -> ".join([eventos[0].anterior] + [e.estado for e in eventos]))
+    print(f"Salida: {sesion.interprete.salida.destino.lineas}; {sesion.resumen_tiempos()}")
+
+    sesion = SesionEjecucion("ALGORITMO Malo\n    MUESTRE \"sin cerrar\nFINALGORITMO\n", nuevo_interprete())
+    sesion.iniciar()
+    final = consumir(sesion)[-1]
+    print(f"Error léxico: {final.estado} {final.detalle}")
+
+    largo = "ALGORITMO Largo\n    DEFINA i COMO ENTERO\n    i <- 0\n" + "    i <- i + 1\n" * 50_000 + "FINALGORITMO\n"
+    sesion = SesionEjecucion(largo, nuevo_interprete())
+    sesion.iniciar()
+    evento = sesion.eventos.get()
+    while evento.estado != ESTADO_EJECUTANDO and not evento.final:
+        evento = sesion.eventos.get()
+    time.sleep(0.05)
+    sesion.cancelar()
+    final = consumir(sesion)[-1]
+    print(f"Cancelada: {final.estado} ({sesion.resumen_tiempos()})")
+
+    # Demora entre el evento final y quien lo espera, contra la espera media de un sondeo de 100 ms
+    demoras = []
+    for _ in range(50):
+        sesion = SesionEjecucion("ALGORITMO Vacio\nFINALGORITMO\n", nuevo_interprete())
+        sesion.iniciar()
+        final = consumir(sesion)[-1]
+        demoras.append(time.perf_counter() - final.instante)
+    demoras.sort()
+    print(f"Aviso de fin: mediana {demoras[len(demoras) // 2] * 1000:.3f} ms con eventos; "
+          f"~50 ms en promedio (hasta 100 ms) con sondeo cada 100 ms")
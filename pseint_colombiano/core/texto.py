@@ -0,0 +1,137 @@
+# pseint_colombiano/core/texto.py
+"""
+Representación interna de los valores TEXTO.
+Permite acumular cadenas (s <- s + x) en tiempo amortizado O(1) por
+concatenación, aplanando el contenido solo cuando el programa lo observa.
+"""
+
+class TextoAcumulado:
+    """
+    Valor de texto inmutable construido a partir de fragmentos.
+
+    Varias instancias pueden compartir la misma lista de fragmentos: cada una
+    solo "ve" sus primeros `_cantidad` elementos. Si una instancia es la dueña
+    del final de la lista, concatenar le agrega el fragmento en el sitio
+    (O(1) amortizado); si no (ej. t <- s + "a" después de s <- s + "b"),
+    se copia su prefijo antes de agregar, así que la semántica de valor se
+    conserva.
+    """
+    __slots__ = ('_fragmentos', '_cantidad', '_longitud', '_plano')
+
+    def __init__(self, texto="", _fragmentos=None, _cantidad=0, _longitud=0):
+        if _fragmentos is None:
+            texto = str(texto)
+            self._fragmentos = [texto] if texto else []
+            self._cantidad = len(self._fragmentos)
+            self._longitud = len(texto)
+            self._plano = texto
+        else:
+            self._fragmentos = _fragmentos
+            self._cantidad = _cantidad
+            self._longitud = _longitud
+            self._plano = None
+
+    def concatenar(self, otro):
+        """Devuelve un nuevo TextoAcumulado con `otro` agregado al final."""
+        fragmento = str(otro)
+        if not fragmento:
+            return self
+        fragmentos = self._fragmentos
+        if len(fragmentos) != self._cantidad:
+            # Otra instancia ya extendió la lista compartida: copiar nuestro prefijo.
+            fragmentos = fragmentos[:self._cantidad]
+        fragmentos.append(fragmento)
+        return TextoAcumulado(_fragmentos=fragmentos, _cantidad=self._cantidad + 1,
+                              _longitud=self._longitud + len(fragmento))
+
+    def aplanar(self):
+        """Devuelve el contenido como str de Python (se calcula una sola vez)."""
+        if self._plano is None:
+            self._plano = "".join(self._fragmentos[:self._cantidad])
+        return self._plano
+
+    def __str__(self):
+        return self.aplanar()
+
+    def __repr__(self):
+        return f"TextoAcumulado({self.aplanar()!r})"
+
+    def __len__(self):
+        return self._longitud
+
+    def __bool__(self):
+        return self._longitud > 0
+
+    def __hash__(self):
+        return hash(self.aplanar())
+
+    # --- Conversiones y operaciones que str ya soportaba ---
+    def __int__(self):
+        return int(self.aplanar())
+
+    def __float__(self):
+        return float(self.aplanar())
+
+    def __mul__(self, veces):
+        return self.aplanar() * veces
+
+    __rmul__ = __mul__
+
+    # --- Comparaciones: se comportan igual que las de str ---
+    def __eq__(self, otro):
+        if isinstance(otro, TextoAcumulado):
+            return self._longitud == otro._longitud and self.aplanar() == otro.aplanar()
+        if isinstance(otro, str):
+            return self._longitud == len(otro) and self.aplanar() == otro
+        return NotImplemented
+
+    def __ne__(self, otro):
+        resultado = self.__eq__(otro)
+        return resultado if resultado is NotImplemented else not resultado
+
+    def __lt__(self, otro):
+        return self.aplanar() < _como_str(otro)
+
+    def __le__(self, otro):
+        return self.aplanar() <= _como_str(otro)
+
+    def __gt__(self, otro):
+        return self.aplanar() > _como_str(otro)
+
+    def __ge__(self, otro):
+        return self.aplanar() >= _como_str(otro)
+
+
+def _como_str(valor):
+    """Aplana un TextoAcumulado; deja cualquier otro valor igual (para que str lance TypeError)."""
+    return valor.aplanar() if isinstance(valor, TextoAcumulado) else valor
+
+
+def es_texto(valor):
+    """True si el valor es texto del pseudocódigo (str o TextoAcumulado)."""
+    return isinstance(valor, (str, TextoAcumulado))
+
+
+def nombre_tipo(valor):
+    """Nombre del tipo para mensajes de error: un TextoAcumulado se muestra como str, igual que antes."""
+    return "str" if isinstance(valor, TextoAcumulado) else type(valor).__name__
+
+
+if __name__ == '__main__':
+    import time
+
+    s = TextoAcumulado()
+    s = s.concatenar("Hola").concatenar(", ")
+    t = s.concatenar("mundo")
+    u = s.concatenar("amigo") # s ya no es dueña del final: se copia su prefijo
+    print(f"s={s!r} t={t!r} u={u!r}")
+    print(f"t == 'Hola, mundo': {t == 'Hola, mundo'}, len(u) = {len(u)}, s < t: {s < t}")
+
+    # Acumulación repetida: debe crecer linealmente con n
+    for n in (100_000, 1_000_000):
+        inicio = time.perf_counter()
+        acumulado = TextoAcumulado()
+        for _ in range(n):
+            acumulado = acumulado.concatenar("0123456789")
+        largo = len(acumulado.aplanar())
+        print(f"TextoAcumulado: {n} concatenaciones ({largo / 1e6:.0f} MB) en {time.perf_counter() - inicio:.3f} s")
@@ -0,0 +1,198 @@
+# pseint_colombiano/core/trazas.py
+"""
+Eventos de ejecución para herramientas externas (cobertura, visualizadores,
+calificadores). Un suscriptor recibe lotes de eventos; los ganchos se instalan
+reemplazando, solo en la instancia y solo para los eventos pedidos, los
+métodos del intérprete que los producen. Sin suscriptores no se instala nada
+y el camino de ejecución es exactamente el mismo.
+
+Cada evento es una tupla cuyo primer elemento es el tipo:
+  (EVENTO_ENTRADA_SENTENCIA, nodo)          antes de ejecutar una sentencia
+  (EVENTO_SALIDA_SENTENCIA, nodo)           después (no se emite si la sentencia falla)
+  (EVENTO_ASIGNACION, nombre, anterior, nuevo)
+  (EVENTO_LEA, nombre, texto_leido)
+  (EVENTO_MUESTRE, texto)
+La posición de una sentencia está en nodo.linea / nodo.columna.
+En ejecutar_por_pasos() el SI y el LEA se ejecutan dentro del generador, sin
+pasar por su visitante: el generador emite su entrada/salida con emitir(), en
+el mismo orden que interpret().
+"""
+
+EVENTO_ENTRADA_SENTENCIA = "entrada_sentencia"
+EVENTO_SALIDA_SENTENCIA = "salida_sentencia"
+EVENTO_ASIGNACION = "asignacion"
+EVENTO_LEA = "lea"
+EVENTO_MUESTRE = "muestre"
+TODOS_LOS_EVENTOS = frozenset((EVENTO_ENTRADA_SENTENCIA, EVENTO_SALIDA_SENTENCIA, EVENTO_ASIGNACION,
+                               EVENTO_LEA, EVENTO_MUESTRE))
+
+# Nodos que son sentencias (sus visitantes emiten entrada/salida)
+TIPOS_SENTENCIA = ("DefinicionVariableNode", "MuestreNode", "LeaNode", "AsignacionNode", "SiNode")
+
+# Eventos acumulados antes de entregar un lote
+TAMANO_LOTE = 1024
+
+
+class Trazador:
+    """Acumula los eventos de un intérprete y los entrega por lotes a sus suscriptores."""
+    def __init__(self, interprete, tamano_lote=TAMANO_LOTE):
+        self.interprete = interprete
+        self.tamano_lote = tamano_lote
+        self.suscriptores = [] # [(funcion, eventos)]
+        self.emitidos = set() # Tipos de evento que producen los ganchos instalados
+        self._lote = []
+
+    def suscribir(self, funcion, eventos=None):
+        """funcion(lote) recibe listas de eventos; `eventos` filtra los tipos (por defecto, todos)."""
+        eventos = frozenset(eventos) if eventos is not None else TODOS_LOS_EVENTOS
+        desconocidos = eventos - TODOS_LOS_EVENTOS
+        if desconocidos:
+            raise ValueError(f"Eventos desconocidos: {', '.join(sorted(desconocidos))}")
+        self.suscriptores.append((funcion, eventos))
+        for evento in eventos:
+            if evento not in self.emitidos: # _instalar puede agregar más de un tipo
+                self._instalar(evento)
+
+    def vaciar(self):
+        """Entrega los eventos pendientes. El intérprete lo llama al terminar cada ejecución."""
+        if not self._lote:
+            return
+        lote = self._lote[:]
+        self._lote.clear() # Se vacía en el lugar: los ganchos guardan una referencia a la lista
+        for funcion, eventos in self.suscriptores:
+            funcion(lote if eventos >= self.emitidos else [e for e in lote if e[0] in eventos])
+
+    def emitir(self, evento):
+        """Agrega un evento producido fuera de los ganchos (ver Interpreter._pasos_bloque)."""
+        self._lote.append(evento)
+        if len(self._lote) >= self.tamano_lote:
+            self.vaciar()
+
+    def _instalar(self, evento):
+        if evento in (EVENTO_ENTRADA_SENTENCIA, EVENTO_SALIDA_SENTENCIA):
+            # Los visitantes envueltos emiten ambos eventos; se filtran al entregar
+            self.emitidos.update((EVENTO_ENTRADA_SENTENCIA, EVENTO_SALIDA_SENTENCIA))
+            for tipo in TIPOS_SENTENCIA:
+                nombre = f"_visit_{tipo}"
+                setattr(self.interprete, nombre, self._envolver_sentencia(getattr(self.interprete, nombre)))
+            return
+        self.emitidos.add(evento)
+        if evento == EVENTO_ASIGNACION:
+            self.interprete._asignar = self._envolver_asignacion(self.interprete._asignar)
+        elif evento == EVENTO_LEA:
+            self.interprete._convertir_entrada = self._envolver_lea(self.interprete._convertir_entrada)
+        elif evento == EVENTO_MUESTRE:
+            self.interprete._escribir = self._envolver_muestre(self.interprete._escribir)
+
+    # Cada envoltura guarda en variables locales lo que usa en cada llamado
+    def _envolver_sentencia(self, visitar):
+        lote, agregar, tamano, vaciar = self._lote, self._lote.append, self.tamano_lote, self.vaciar
+
+        def visitar_trazado(node):
+            agregar((EVENTO_ENTRADA_SENTENCIA, node))
+            resultado = visitar(node)
+            agregar((EVENTO_SALIDA_SENTENCIA, node))
+            if len(lote) >= tamano:
+                vaciar()
+            return resultado
+        return visitar_trazado
+
+    def _envolver_asignacion(self, asignar):
+        lote, agregar, tamano, vaciar = self._lote, self._lote.append, self.tamano_lote, self.vaciar
+        obtener = self.interprete.symbol_table.get
+
+        def asignar_trazado(nombre, valor):
+            anterior = obtener(nombre)
+            asignar(nombre, valor)
+            agregar((EVENTO_ASIGNACION, nombre, anterior, valor))
+            if len(lote) >= tamano:
+                vaciar()
+        return asignar_trazado
+
+    def _envolver_lea(self, convertir):
+        agregar = self._lote.append
+
+        def convertir_trazado(nombre, texto):
+            agregar((EVENTO_LEA, nombre, texto))
+            return convertir(nombre, texto)
+        return convertir_trazado
+
+    def _envolver_muestre(self, escribir):
+        lote, agregar, tamano, vaciar = self._lote, self._lote.append, self.tamano_lote, self.vaciar
+
+        def escribir_trazado(texto):
+            agregar((EVENTO_MUESTRE, texto))
+            escribir(texto)
+            if len(lote) >= tamano:
+                vaciar()
+        return escribir_trazado
+
+
+if __name__ == '__main__':
+    # Eventos de un programa pequeño y costo de los ganchos: sin suscriptores,
+    # con un suscriptor por lotes y con entrega evento por evento (lote de 1).
+    import time
+    from .ejecutor import analizar
+    from .interpreter import Interpreter
+    from .salida import SalidaBuffer, DestinoMemoria
+
+    codigo = ('ALGORITMO Trazas\n    DEFINA n COMO ENTERO\n    LEA n\n    SI n > 5 ENTONCES\n'
+              '        MUESTRE "grande"\n    FINSI\n    n = n * 2\nFINALGORITMO\n')
+    ast, _, _ = analizar(codigo)
+    interprete = Interpreter(console_input_func=lambda: "7", salida=SalidaBuffer(DestinoMemoria()))
+
+    def mostrar(lote):
+        for evento in lote:
+            if evento[0] in (EVENTO_ENTRADA_SENTENCIA, EVENTO_SALIDA_SENTENCIA):
+                print(f"  {evento[0]:<18} línea {evento[1].linea} {type(evento[1]).__name__}")
+            else:
+                print(f"  {evento[0]:<18} {evento[1:]}")
+    interprete.suscribir(mostrar)
+    interprete.interpret(ast)
+
+    # "¿Usó un SI?": un calificador solo necesita la entrada de sentencias
+    usados = set()
+    interprete = Interpreter(console_input_func=lambda: "1", salida=SalidaBuffer(DestinoMemoria()))
+    interprete.suscribir(lambda lote: usados.update(type(e[1]).__name__ for e in lote),
+                         eventos=[EVENTO_ENTRADA_SENTENCIA])
+    interprete.interpret(ast)
+    print(f"Sentencias usadas: {sorted(usados)}")
+
+    lineas = ["ALGORITMO Carga", "    DEFINA a, c COMO ENTERO", "    DEFINA s COMO TEXTO", "    a = 7"]
+    for i in range(600):
+        lineas += [f"    c = (a * {i} + 3) % 97", "    s = s + c",
+                   "    SI c > 48 ENTONCES", "        MUESTRE c", "    FINSI"]
+    lineas.append("FINALGORITMO")
+    ast, _, _ = analizar("\n".join(lineas))
+
+    def medir(configurar, repeticiones=7):
+        mejor, eventos = float("inf"), 0
+        for _ in range(repeticiones):
+            contador = [0]
+            interprete = Interpreter(salida=SalidaBuffer(DestinoMemoria()))
+            configurar(interprete, contador)
+            inicio = time.perf_counter()
+            interprete.interpret(ast)
+            mejor = min(mejor, time.perf_counter() - inicio)
+            eventos = contador[0]
+        return mejor, eventos
+
+    def contar(contador):
+        def recibir(lote):
+            contador[0] += len(lote)
+        return recibir
+
+    def por_evento(interprete, contador):
+        interprete.trazador = Trazador(interprete, tamano_lote=1)
+        interprete.trazador.suscribir(contar(contador))
+
+    base, _ = medir(lambda interprete, contador: None)
+    print(f"Sin suscriptores:         {base * 1000:.2f} ms "
+          f"(métodos reemplazados en la instancia: {[n for n in vars(Interpreter()) if n.startswith('_visit')]})")
+    for nombre, configurar in (
+            ("Solo entrada de sentencias", lambda i, c: i.suscribir(contar(c), eventos=[EVENTO_ENTRADA_SENTENCIA])),
+            ("Todos, por lotes", lambda i, c: i.suscribir(contar(c))),
+            ("Todos, evento por evento", por_evento)):
+        tiempo, eventos = medir(configurar)
+        print(f"{nombre + ':':<26}{tiempo * 1000:.2f} ms (x{tiempo / base:.2f}, {eventos} eventos, "
+              f"{(tiempo - base) / eventos * 1e9:.0f} ns por evento)")
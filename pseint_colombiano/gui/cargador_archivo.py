@@ -0,0 +1,141 @@
+# pseint_colombiano/gui/cargador_archivo.py
+"""
+Carga de un archivo en el editor sin bloquear la interfaz.
+
+Un hilo lee el archivo por partes (utils.file_handler.leer_por_partes) y las
+deja en una cola; el hilo de Tk las entrega con after(), a lo sumo
+PRESUPUESTO_POR_TICK segundos de inserción por callback, para que entre una
+tanda y otra Tk atienda eventos y repinte. La primera parte se entrega sola,
+así la primera pantalla aparece (y se puede desplazar o editar) mientras el
+resto del archivo sigue llegando.
+"""
+import threading
+import time
+from collections import deque
+
+from utils.file_handler import leer_por_partes, CARACTERES_POR_PARTE
+
+# Tiempo máximo de inserción por callback de Tk
+PRESUPUESTO_POR_TICK = 0.012
+
+
+class CargadorArchivo:
+    """
+    Llama en el hilo de Tk a al_recibir(texto, progreso) por cada parte, y al
+    final a al_terminar(cargador) o a al_fallar(error). Métricas (segundos
+    desde iniciar()): primera_interaccion, cuando la primera parte ya está
+    pintada y Tk vuelve a atender eventos; duracion, cuando terminó la carga.
+    """
+    def __init__(self, widget, ruta, al_recibir, al_terminar=None, al_fallar=None,
+                 caracteres_por_parte=CARACTERES_POR_PARTE):
+        self.widget = widget # Solo se usan after, after_idle y after_cancel
+        self.ruta = ruta
+        self.al_recibir = al_recibir
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.caracteres_por_parte = caracteres_por_parte
+        self._partes = deque() # (texto, progreso); las agrega el hilo lector
+        self._lectura_terminada = False
+        self._id_after = None
+        self.error = None
+        self.cancelado = False
+        self.terminado = False
+        self.partes_insertadas = 0
+        self.progreso = 0.0
+        self.inicio = None
+        self.primera_interaccion = None
+        self.duracion = None
+
+    def iniciar(self):
+        self.inicio = time.perf_counter()
+        threading.Thread(target=self._leer, name="carga_archivo", daemon=True).start()
+        self._id_after = self.widget.after(1, self._entregar)
+        return self
+
+    def cancelar(self):
+        """Deja de entregar partes (lo ya insertado queda). No llama a al_terminar ni a al_fallar."""
+        self.cancelado = True
+        if self._id_after is not None:
+            self.widget.after_cancel(self._id_after)
+            self._id_after = None
+
+    def _leer(self):
+        try:
+            for parte in leer_por_partes(self.ruta, self.caracteres_por_parte):
+                if self.cancelado:
+                    return
+                self._partes.append(parte)
+        except Exception as e: # Archivo inexistente, sin permisos, no es UTF-8...
+            self.error = e
+        finally:
+            self._lectura_terminada = True
+
+    def _entregar(self):
+        self._id_after = None
+        if self.cancelado:
+            return
+        limite = time.perf_counter() + PRESUPUESTO_POR_TICK
+        partes = self._partes
+        while partes and not self.error:
+            texto, self.progreso = partes.popleft()
+            self.al_recibir(texto, self.progreso)
+            self.partes_insertadas += 1
+            if self.partes_insertadas == 1: # Sola, para que se pinte cuanto antes
+                self.widget.after_idle(self._marcar_primera_interaccion)
+                break
+            if time.perf_counter() >= limite:
+                break
+        if self._lectura_terminada and (not partes or self.error):
+            self._finalizar()
+        else:
+            self._id_after = self.widget.after(1, self._entregar)
+
+    def _marcar_primera_interaccion(self):
+        # Tk repinta en callbacks ociosos programados antes que este: al correr, la parte ya se ve
+        self.primera_interaccion = time.perf_counter() - self.inicio
+
+    def _finalizar(self):
+        self.terminado = True
+        self.duracion = time.perf_counter() - self.inicio
+        if self.error is not None:
+            if self.al_fallar is not None:
+                self.al_fallar(self.error)
+        elif self.al_terminar is not None:
+            self.al_terminar(self)
+
+
+if __name__ == '__main__':
+    # Tiempo hasta la primera interacción con un archivo de 50 MB: cargarlo todo de una vez
+    # (leer + insertar, como antes) frente a cargarlo por partes. Necesita pantalla.
+    # Ejecutar desde pseint_colombiano/ (python -m gui.cargador_archivo).
+    import os
+    import tempfile
+    import tkinter as tk
+
+    linea = "    MUESTRE \"Esta es una línea de relleno para el archivo grande\", x\n"
+    ruta = os.path.join(tempfile.mkdtemp(), "grande.pseudocol")
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("ALGORITMO Grande\n" + linea * (50 * 1024 * 1024 // len(linea.encode("utf-8"))) + "FINALGORITMO\n")
+    print(f"Archivo de {os.path.getsize(ruta) / 1024 / 1024:.1f} MB")
+
+    raiz = tk.Tk()
+    texto = tk.Text(raiz, undo=False)
+    texto.pack(fill="both", expand=True)
+    raiz.update()
+
+    inicio = time.perf_counter()
+    with open(ruta, "r", encoding="utf-8") as f:
+        texto.insert("1.0", f.read())
+    raiz.update()
+    print(f"De una vez: primera interacción a los {time.perf_counter() - inicio:.2f} s")
+    texto.delete("1.0", "end")
+    raiz.update()
+
+    def terminar(cargador):
+        print(f"Por partes: primera interacción a los {cargador.primera_interaccion * 1000:.1f} ms, "
+              f"archivo completo a los {cargador.duracion:.2f} s ({cargador.partes_insertadas} partes)")
+        raiz.after(500, raiz.destroy)
+
+    CargadorArchivo(raiz, ruta, lambda parte, progreso: texto.insert("end-1c", parte), terminar).iniciar()
+    raiz.mainloop()
+    os.remove(ruta)
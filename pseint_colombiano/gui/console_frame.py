@@ -1,12 +1,35 @@
 # pseint_colombiano/gui/console_frame.py
 """
 Frame que contiene la consola de salida y (opcionalmente) entrada.
+
+write_output() se puede llamar desde cualquier hilo: solo agrega el texto a
+una cola (deque.append es atómico, sin candados). El hilo de Tk la vacía con
+after() a lo sumo CUADROS_POR_SEGUNDO veces por segundo, con una sola
+inserción y un solo see("end") por cuadro. La consola conserva las últimas
+max_lineas líneas: al pasarse se borran las más viejas, y si un cuadro trae
+más que eso, lo que no cabe se descarta sin llegar a Tk.
 """
 import customtkinter as ctk
 import queue # Para comunicación thread-safe si la entrada es bloqueante
+import sys
+from collections import deque
+
+# Valor que se pone en input_queue para despertar un LEA pendiente al detener la ejecución
+_ENTRADA_CANCELADA = object()
+
+# Veces por segundo que se vuelca la salida pendiente en la consola
+CUADROS_POR_SEGUNDO = 30
+# Líneas que conserva la consola por defecto (las más viejas se descartan)
+MAX_LINEAS_CONSOLA = 10_000
+
+
+def ultimas_lineas(texto, cantidad):
+    """Las últimas `cantidad` líneas de un texto que termina en salto de línea."""
+    partes = texto.rsplit("\n", cantidad + 1)
+    return texto if len(partes) <= cantidad + 1 else "\n".join(partes[1:])
 
 class ConsoleFrame(ctk.CTkFrame):
-    def __init__(self, master, **kwargs):
+    def __init__(self, master, max_lineas=MAX_LINEAS_CONSOLA, **kwargs):
         super().__init__(master, **kwargs)
         self.grid_rowconfigure(0, weight=1) # Output area
         self.grid_rowconfigure(1, weight=0) # Input area (if used)
@@ -23,18 +46,88 @@ class ConsoleFrame(ctk.CTkFrame):
         
         self.input_queue = queue.Queue() # Para pasar la entrada del usuario al intérprete
         self.waiting_for_input = False
+        self._al_recibir_entrada = None # Callback de solicitar_entrada (modo paso a paso, sin hilo)
+
+        # Salida pendiente: textos, o (funcion, args) a ejecutar en el hilo de Tk en ese orden
+        self._cola = deque()
+        self.max_lineas = max_lineas
+        self.lineas_escritas = 0 # Líneas volcadas desde el último clear_output (incluye las descartadas)
+        self._intervalo_ms = 1000 // CUADROS_POR_SEGUNDO
+        self.after(self._intervalo_ms, self._volcar)
 
     def write_output(self, message):
-        """Añade un mensaje a la consola de salida."""
-        self.output_text.configure(state="normal")
+        """Añade un mensaje a la consola de salida. Se puede llamar desde cualquier hilo."""
         if not message.endswith("\n"):
             message += "\n" # PSeInt generalmente añade newline por MUESTRE
-        self.output_text.insert("end", message)
+        self._cola.append(message)
+
+    def en_hilo_gui(self, funcion, *args):
+        """Ejecuta funcion(*args) en el hilo de Tk, después de la salida ya encolada."""
+        self._cola.append((funcion, args))
+
+    def configurar_max_lineas(self, max_lineas):
+        self.max_lineas = max_lineas
+        self.en_hilo_gui(self._recortar)
+
+    def _volcar(self):
+        """Un cuadro: vuelca lo encolado hasta ahora (lo que llegue mientras tanto, en el próximo).
+
+        Un callback que falla se reporta como cualquier error de Tk y no detiene
+        el ciclo: si no, la salida dejaría de verse y los controles quedarían
+        deshabilitados para siempre.
+        """
+        try:
+            cola = self._cola
+            partes = []
+            for _ in range(len(cola)):
+                elemento = cola.popleft()
+                if type(elemento) is str:
+                    partes.append(elemento)
+                    continue
+                self._insertar(partes)
+                partes = []
+                funcion, args = elemento
+                try:
+                    funcion(*args)
+                except Exception:
+                    self._root().report_callback_exception(*sys.exc_info())
+            self._insertar(partes)
+        finally:
+            self.after(self._intervalo_ms, self._volcar)
+
+    def _insertar(self, partes):
+        if not partes:
+            return
+        texto = "".join(partes)
+        nuevas = texto.count("\n")
+        self.lineas_escritas += nuevas
+        self.output_text.configure(state="normal")
+        if nuevas >= self.max_lineas: # Solo se ve el final: lo demás no pasa por Tk
+            self.output_text.delete("1.0", "end")
+            texto = ultimas_lineas(texto, self.max_lineas)
+        self.output_text.insert("end", texto)
+        self._recortar()
         self.output_text.configure(state="disabled")
         self.output_text.see("end") # Auto-scroll
 
+    def _recortar(self):
+        """Borra las líneas más viejas que exceden max_lineas."""
+        # El texto termina en salto de línea: la última línea de Tk está vacía
+        lineas = int(self.output_text.index("end-1c").split(".")[0]) - 1
+        if lineas > self.max_lineas:
+            estado = self.output_text.cget("state")
+            self.output_text.configure(state="normal")
+            self.output_text.delete("1.0", f"{lineas - self.max_lineas + 1}.0")
+            self.output_text.configure(state=estado)
+
     def clear_output(self):
-        """Limpia la consola de salida."""
+        """Limpia la consola de salida y descarta la salida pendiente (no las funciones encoladas)."""
+        cola = self._cola
+        for _ in range(len(cola)):
+            elemento = cola.popleft()
+            if type(elemento) is not str: # p. ej. mostrar el campo de un LEA en curso
+                cola.append(elemento)
+        self.lineas_escritas = 0
         self.output_text.configure(state="normal")
         self.output_text.delete("1.0", "end")
         self.output_text.configure(state="disabled")
@@ -42,19 +135,16 @@ class ConsoleFrame(ctk.CTkFrame):
     def request_input(self):
         """
         Prepara la GUI para recibir una entrada del usuario.
-        Este método será llamado por el intérprete.
+        Este método será llamado por el intérprete, desde su hilo (no desde el de Tk).
         Devuelve el valor ingresado (bloqueante en espíritu, pero no bloquea el hilo GUI).
         """
-        if self.input_entry_visible: # Ya hay una petición de input activa
+        if self.input_entry_visible or self.waiting_for_input: # Ya hay una petición de input activa
             self.write_output("[Error Interno Consola: Intento de múltiples LEA simultáneos]\n")
             return None 
 
-        self.input_entry.grid(row=1, column=0, sticky="ew", padx=5, pady=5)
-        self.input_entry.configure(state="normal")
-        self.input_entry.delete(0, "end")
-        self.input_entry.focus_set()
-        self.input_entry_visible = True
+        # El campo se muestra en el hilo de Tk, después de la salida anterior al LEA
         self.waiting_for_input = True
+        self.en_hilo_gui(self._mostrar_entrada)
         
         # Bucle de espera no bloqueante para la GUI
         # El intérprete debe esperar a que input_queue tenga un valor
@@ -70,17 +160,27 @@ class ConsoleFrame(ctk.CTkFrame):
             # En una app real, esto se manejaría mejor con hilos y eventos.
             user_input = self.input_queue.get(timeout=300) # Espera 5 minutos máximo
             self.waiting_for_input = False # Ya no esperamos
+            if user_input is _ENTRADA_CANCELADA:
+                return None # El intérprete verá la cancelación al volver del LEA
             return user_input
         except queue.Empty:
             self.write_output("\n[Tiempo de espera para entrada agotado]\n")
-            self.hide_input_entry() # Ocultar si se agota el tiempo
+            self.en_hilo_gui(self.hide_input_entry) # Ocultar si se agota el tiempo
             self.waiting_for_input = False
             return None # O "" o un error específico
         finally:
             # Asegurarse de que el input entry se oculte si no lo hizo _on_input_submit
             if self.input_entry_visible and not self.waiting_for_input:
-                 self.hide_input_entry()
+                 self.en_hilo_gui(self.hide_input_entry)
 
+    def _mostrar_entrada(self):
+        if not self.waiting_for_input: # Se canceló antes de llegar a mostrarse
+            return
+        self.input_entry.grid(row=1, column=0, sticky="ew", padx=5, pady=5)
+        self.input_entry.configure(state="normal")
+        self.input_entry.delete(0, "end")
+        self.input_entry.focus_set()
+        self.input_entry_visible = True
 
     def _on_input_submit(self, event=None):
         """Cuando el usuario presiona Enter en el campo de entrada."""
@@ -88,8 +188,35 @@ class ConsoleFrame(ctk.CTkFrame):
 
         user_text = self.input_entry.get()
         self.write_output(f"{user_text}") # Simular eco de la entrada PSeInt
-        self.input_queue.put(user_text) # Poner el texto en la cola para el intérprete
         self.hide_input_entry()
+        if self._al_recibir_entrada is not None:
+            al_recibir, self._al_recibir_entrada = self._al_recibir_entrada, None
+            self.waiting_for_input = False
+            al_recibir(user_text)
+            return
+        self.input_queue.put(user_text) # Poner el texto en la cola para el intérprete
+
+    def solicitar_entrada(self, al_recibir):
+        """
+        Versión no bloqueante de request_input para llamar desde el hilo de la GUI:
+        muestra el campo de entrada y llama a al_recibir(texto) cuando el usuario presiona Enter.
+        """
+        self._al_recibir_entrada = al_recibir
+        self.input_entry.grid(row=1, column=0, sticky="ew", padx=5, pady=5)
+        self.input_entry.configure(state="normal")
+        self.input_entry.delete(0, "end")
+        self.input_entry.focus_set()
+        self.input_entry_visible = True
+        self.waiting_for_input = True
+
+    def cancelar_entrada(self):
+        """Despierta inmediatamente un request_input bloqueado (al detener la ejecución)."""
+        if self._al_recibir_entrada is not None: # Entrada pedida con solicitar_entrada
+            self._al_recibir_entrada = None
+            self.waiting_for_input = False
+            self.hide_input_entry()
+        elif self.waiting_for_input:
+            self.input_queue.put(_ENTRADA_CANCELADA)
 
     def hide_input_entry(self):
         self.input_entry.delete(0, "end")
@@ -105,38 +232,61 @@ class ConsoleFrame(ctk.CTkFrame):
 
 
 if __name__ == '__main__':
+    # Líneas por segundo: un hilo imprime 200 000 líneas en lotes de 64 (como DestinoFuncion)
+    # contra la consola, y la misma salida insertada línea por línea con see("end") como
+    # antes. Después queda la ventana para probar LEA desde un hilo. Necesita pantalla.
+    import threading
+    import time
+
     app = ctk.CTk()
     app.title("Console Frame Test")
     app.geometry("600x400")
 
     console = ConsoleFrame(app)
     console.pack(expand=True, fill="both", padx=10, pady=10)
+    app.update()
+
+    LINEAS, LOTE = 200_000, 64
+
+    def producir():
+        for inicio in range(0, LINEAS, LOTE):
+            console.write_output("\n".join(f"Línea {i}" for i in range(inicio, min(inicio + LOTE, LINEAS))))
+
+    inicio = time.perf_counter()
+    hilo = threading.Thread(target=producir, daemon=True)
+    hilo.start()
+    while hilo.is_alive() or console._cola:
+        app.update()
+    duracion = time.perf_counter() - inicio
+    print(f"Consola por cuadros: {LINEAS / duracion:,.0f} líneas/s "
+          f"({console.lineas_escritas} escritas, {int(console.output_text.index('end-1c').split('.')[0]) - 1} conservadas)")
 
+    directa, muestra = console.output_text, 5_000 # Como antes: una inserción y un see("end") por línea
+    inicio = time.perf_counter()
+    for i in range(muestra):
+        directa.configure(state="normal")
+        directa.insert("end", f"Línea {i}\n")
+        directa.configure(state="disabled")
+        directa.see("end")
+        app.update_idletasks()
+    duracion = time.perf_counter() - inicio
+    print(f"Inserción por línea ({muestra} líneas): {muestra / duracion:,.0f} líneas/s")
+
+    console.clear_output()
     console.write_output("Este es un mensaje de prueba.")
     console.write_output("Otro mensaje en la consola.")
 
-    def test_input():
-        console.write_output("Por favor, ingrese algo:")
-        # En una aplicación real, el intérprete correría en otro hilo.
-        # Aquí, para probar, lo hacemos de forma simple.
-        # Esta llamada bloqueará hasta que se ingrese algo o haya timeout.
-        # Lo ideal es no llamar request_input directamente desde el hilo de la GUI
-        # de esta forma si el intérprete está en el mismo hilo.
-        # Aquí lo hacemos para demostrar la funcionalidad del widget.
-        
-        # Para evitar bloqueo en test simple, usamos after para simular:
-        app.after(100, _perform_request_input)
-
     def _perform_request_input():
-        # Esta función se llamaría desde el hilo del intérprete
+        # Como el intérprete: desde su propio hilo
+        console.write_output("Por favor, ingrese algo:")
         user_data = console.request_input()
         if user_data is not None:
             console.write_output(f"Usted ingresó: {user_data}")
         else:
             console.write_output("No se recibió entrada o hubo timeout.")
 
-
-    test_button = ctk.CTkButton(app, text="Probar Entrada (LEA)", command=test_input)
+    test_button = ctk.CTkButton(app, text="Probar Entrada (LEA)",
+                                command=lambda: threading.Thread(target=_perform_request_input, daemon=True).start())
     test_button.pack(pady=10)
 
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
@@ -0,0 +1,100 @@
+# pseint_colombiano/gui/depurador.py
+"""
+Sesión de ejecución paso a paso dentro del bucle de eventos de Tk.
+No usa hilos: el intérprete es un generador (core/pasos.py) que se avanza
+con after(), en tramos cortos cuando se continúa hasta un punto de
+interrupción, así la ventana sigue respondiendo.
+"""
+from core.pasos import ControladorPasos
+
+# Sentencias por tramo al continuar; entre tramos Tk procesa sus eventos
+SENTENCIAS_POR_TRAMO = 2000
+
+
+class DepuradorPasoAPaso:
+    """
+    Controla una ejecución paso a paso: resalta la línea actual en el editor,
+    pide las entradas de LEA en la consola y avisa con al_terminar() al acabar.
+    """
+    def __init__(self, ventana, editor_frame, console_frame, interprete, ast, al_terminar):
+        self.ventana = ventana
+        self.editor_frame = editor_frame
+        self.console_frame = console_frame
+        self.interprete = interprete
+        self.al_terminar = al_terminar
+        # Los puntos de interrupción son el mismo conjunto del editor: se pueden cambiar en plena ejecución
+        self.controlador = ControladorPasos(interprete.ejecutar_por_pasos(ast),
+                                            editor_frame.puntos_interrupcion)
+        self._tarea = None # id de after() del próximo tramo mientras se continúa
+        self._linea_destino = None
+        self._continuando = False # Modo en que se retoma tras una entrada de LEA
+
+    @property
+    def corriendo(self):
+        """True mientras avanza solo (continuar o hasta el cursor), False si está detenido."""
+        return self._tarea is not None
+
+    def paso(self):
+        """Ejecuta la sentencia resaltada y se detiene en la siguiente."""
+        if self.corriendo or self.controlador.esperando_entrada:
+            return
+        self._continuando = False
+        self.controlador.paso()
+        self._detenerse()
+
+    def continuar(self, linea_destino=None):
+        """Avanza hasta un punto de interrupción, hasta linea_destino, un LEA o el final."""
+        if self.corriendo or self.controlador.esperando_entrada:
+            return
+        self._linea_destino = linea_destino
+        self._continuando = True
+        self.editor_frame.limpiar_linea_actual()
+        self._tarea = self.ventana.after(1, self._tramo)
+
+    def ejecutar_hasta_cursor(self):
+        self.continuar(linea_destino=self.editor_frame.linea_cursor())
+
+    def pausar(self):
+        """Detiene un continuar en curso en la sentencia actual."""
+        if self.corriendo:
+            self.ventana.after_cancel(self._tarea)
+            self._tarea = None
+            self._continuando = False
+            self._detenerse()
+
+    def detener(self):
+        if self._tarea is not None:
+            self.ventana.after_cancel(self._tarea)
+            self._tarea = None
+        self.console_frame.cancelar_entrada()
+        self.controlador.detener()
+        self._detenerse()
+
+    def _tramo(self):
+        self._tarea = None
+        if self.controlador.continuar(SENTENCIAS_POR_TRAMO, self._linea_destino):
+            self._detenerse()
+        else:
+            self.interprete.salida.vaciar() # Mostrar el avance entre tramos
+            self._tarea = self.ventana.after(1, self._tramo)
+
+    def _detenerse(self):
+        """Refleja en la interfaz dónde quedó la ejecución."""
+        self.interprete.salida.vaciar()
+        controlador = self.controlador
+        if controlador.terminado:
+            self.editor_frame.limpiar_linea_actual()
+            self.al_terminar()
+        elif controlador.esperando_entrada:
+            self.editor_frame.resaltar_linea_actual(controlador.actual.linea)
+            self.console_frame.solicitar_entrada(self._recibir_entrada)
+        else:
+            self.editor_frame.resaltar_linea_actual(controlador.actual.linea)
+
+    def _recibir_entrada(self, valor):
+        """Completa el LEA y sigue en el mismo modo en que se pidió la entrada."""
+        self.controlador.entregar_entrada(valor)
+        if self._continuando:
+            self.continuar(self._linea_destino)
+        else:
+            self.paso()
@@ -1,12 +1,32 @@
 # pseint_colombiano/gui/editor_frame.py
 """
 Frame que contiene el editor de pseudocódigo y el número de líneas.
+
+Para que la ventana aparezca cuanto antes, el resaltador, el autocompletado,
+el análisis en segundo plano y el autoguardado se crean al primer uso (o en
+precargar(), después del primer cuadro), y el panel de problemas, el popup y
+la barra de carga la primera vez que se muestran.
 """
 import customtkinter as ctk
 import tkinter as tk # Para ctk.INSERT y otros tk constantes si es necesario
 import re # Para tooltips y autocompletado
-from utils.syntax_highlighter import SyntaxHighlighter # Ajusta la ruta si es necesario
-from core.keywords_col import AUTOCOMPLETE_SUGGESTIONS, COMMAND_TOOLTIPS # Ajusta la ruta
+import time
+from collections import deque
+from functools import cached_property
+from core.cobertura import LINEA_CUBIERTA, LINEA_PARCIAL, LINEA_NO_CUBIERTA
+from .planificador_editor import PlanificadorEditor
+from .margen_lineas import MargenLineas
+
+# Fondo de las líneas perfiladas, de la menos a la más costosa
+COLORES_CALOR = ("#FFF5E6", "#FFE0B3", "#FFC680", "#FF9E4D", "#FF6B3D")
+# Fondo de las líneas según su cobertura (ver MapaCobertura.estado_lineas)
+COLORES_COBERTURA = {LINEA_CUBIERTA: "#DDF4DA", LINEA_PARCIAL: "#FFF0B8", LINEA_NO_CUBIERTA: "#F9D4D4"}
+# Espera sin ediciones antes de actualizar cada parte (ms; 0 = en el próximo tick ocioso)
+ESPERAS_MS = {"numeros_linea": 0, "resaltado": 0, "cambios": 0, "autocompletado": 50, "analisis": 300,
+              "autoguardado": 1000}
+# Cada cuánto se revisa si llegó el resultado del análisis en segundo plano (solo mientras hay uno en curso)
+INTERVALO_ANALISIS_MS = 30
+COLOR_DIAGNOSTICO = "#E51400"
 
 class EditorFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -14,46 +34,81 @@ class EditorFrame(ctk.CTkFrame):
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
 
-        # Número de líneas
-        self.line_numbers = ctk.CTkTextbox(self, width=40, font=("Consolas", 12),
-                                           state="disabled", activate_scrollbars=False,
-                                           text_color=("gray50", "gray50"))
-        self.line_numbers.grid(row=0, column=0, sticky="ns", pady=(0,0), padx=(0,0))
-
         # Editor de texto
         self.editor = ctk.CTkTextbox(self, font=("Consolas", 12), wrap="none", undo=True)
         self.editor.grid(row=0, column=1, sticky="nsew", pady=(0,0), padx=(0,0))
 
-        # --- SINCRONIZACIÓN DE SCROLL CORREGIDA ---
-        # Cuando el editor se desplaza, su comando yscrollcommand se activa.
-        # Este comando (nuestro método) moverá los números de línea.
+        # Margen con números de línea y marcas; solo dibuja las líneas visibles
+        self.puntos_interrupcion = set() # Depuración paso a paso: números de línea
+        self._marcas_interrupcion = {} # Línea -> marca de Tk que sigue a esa línea al editar arriba
+        self._proxima_marca = 0
+        self.margen = MargenLineas(self, self.editor, self.puntos_interrupcion,
+                                   tema=ctk.get_appearance_mode().lower(),
+                                   al_hacer_clic=self.alternar_punto_interrupcion)
+        self.margen.grid(row=0, column=0, sticky="ns", pady=(0,0), padx=(0,0))
+        # Cuando el editor se desplaza, su comando yscrollcommand se activa y redibuja el margen
         self.editor.configure(yscrollcommand=self._on_editor_scroll)
 
-        # No necesitamos configurar yscrollcommand para line_numbers si su scrollbar está desactivada
-        # y solo sigue al editor. Si line_numbers pudiera ser scrolleado independientemente
-        # (ej. con activate_scrollbars=True y el usuario interactuando con su scrollbar),
-        # entonces sí necesitaríamos un self.line_numbers.configure(yscrollcommand=self._on_line_numbers_scroll)
-        # para que mueva al editor, pero esto podría crear bucles si no se tiene cuidado.
-        # Dado que activate_scrollbars=False, el scroll de line_numbers solo se controla programáticamente.
-
-        # Resaltado de sintaxis
-        self.highlighter = SyntaxHighlighter(self.editor)
+        # Las teclas solo anotan las líneas editadas; cada actualización corre una vez por tick
+        self.planificador = PlanificadorEditor(self.editor)
+        self.planificador.registrar("numeros_linea", self._actualizar_numeros, ESPERAS_MS["numeros_linea"])
+        self.planificador.registrar("resaltado", self._actualizar_resaltado, ESPERAS_MS["resaltado"])
+        self.planificador.registrar("cambios", self._on_contenido_cambiado, ESPERAS_MS["cambios"])
+        self.planificador.registrar("autocompletado", self._actualizar_autocompletado, ESPERAS_MS["autocompletado"])
+        self._linea_tecla = None # Línea del cursor al presionar la tecla que aún no se soltó
+        self.editor.bind("<KeyPress>", self._on_key_press)
         self.editor.bind("<KeyRelease>", self._on_key_release)
         self.editor.bind("<Return>", self._on_enter_key)
         # Eventos de Rueda del Ratón para scroll
         self.editor.bind("<MouseWheel>", self._on_mouse_wheel) # Windows y macOS
         self.editor.bind("<Button-4>", self._on_mouse_wheel)    # Linux (scroll up)
         self.editor.bind("<Button-5>", self._on_mouse_wheel)    # Linux (scroll down)
-        # Para line_numbers, si también queremos que responda al scroll del mouse (aunque no tenga barra visible)
-        self.line_numbers.bind("<MouseWheel>", self._on_mouse_wheel)
-        self.line_numbers.bind("<Button-4>", self._on_mouse_wheel)
-        self.line_numbers.bind("<Button-5>", self._on_mouse_wheel)
-
-        # Autocompletado (básico)
-        self.autocomplete_listbox = None
-        self.editor.bind("<KeyRelease>", self._handle_autocomplete, add="+")
+        # El margen también responde a la rueda, moviendo el editor
+        self.margen.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.margen.bind("<Button-4>", self._on_mouse_wheel)
+        self.margen.bind("<Button-5>", self._on_mouse_wheel)
+
+        # Autocompletado (ver la propiedad autocompletado) con un popup que se reutiliza
+        self._programa_cambiado = True # Los identificadores se recalculan al pedir sugerencias
+        self.popup_autocompletado = None # Se crea la primera vez que hay sugerencias
         self.editor.bind("<FocusOut>", self._hide_autocomplete_on_focus_out)
-        self.editor.bind("<Button-1>", self._hide_autocomplete_on_click, add="+") # Ocultar al hacer click en editor
+        self.editor.bind("<Button-1>", self._hide_autocomplete, add="+") # Ocultar al hacer click en editor
+
+        # Análisis en segundo plano: errores en vivo (subrayado, margen y panel de problemas)
+        self._resultados_analisis = deque() # Los agrega el hilo del análisis; se leen en el hilo de Tk
+        self._revisando_analisis = False
+        self.diagnosticos = []
+        self.planificador.registrar("analisis", self._solicitar_analisis, ESPERAS_MS["analisis"])
+        self.panel_problemas = None # Se crea con el primer problema; solo se ve cuando hay problemas
+
+        # Autoguardado: las ediciones van a un diario de recuperación desde otro hilo (ver utils/autoguardado.py)
+        self.planificador.registrar("autoguardado", self._autoguardar, ESPERAS_MS["autoguardado"])
+
+        # Carga de archivos por partes (ver cargar_archivo); la barra solo se ve mientras llega el archivo
+        self.cargador = None
+        self._editado_en_carga = False
+        self.barra_carga = None # Se crea con la primera carga
+        try:
+            self.editor.tag_config("diagnostico", underline=True, underlinefg=COLOR_DIAGNOSTICO)
+        except tk.TclError: # Tk anterior a 8.6.11: subrayado del color del texto
+            self.editor.tag_config("diagnostico", underline=True)
+
+        # Depuración paso a paso: línea actual y puntos de interrupción
+        self.editor.tag_config("punto_interrupcion", background="#F4C7C3")
+        self.editor.tag_config("linea_actual", background="#FFF2A8")
+        self.editor.tag_raise("linea_actual", "punto_interrupcion")
+
+        # Perfil: sombreado de las líneas según su tiempo de ejecución (de frío a caliente)
+        self._calor_visible = False
+        for nivel, color in enumerate(COLORES_CALOR):
+            self.editor.tag_config(f"calor_{nivel}", background=color)
+            self.editor.tag_lower(f"calor_{nivel}", "punto_interrupcion")
+
+        # Cobertura: líneas ejecutadas, con una sola rama de SI tomada o nunca ejecutadas
+        self._cobertura_visible = False
+        for estado, color in COLORES_COBERTURA.items():
+            self.editor.tag_config(f"cobertura_{estado}", background=color)
+            self.editor.tag_lower(f"cobertura_{estado}", "punto_interrupcion")
 
         # Tooltips
         self.tooltip_label = None
@@ -61,26 +116,161 @@ class EditorFrame(ctk.CTkFrame):
 
         self._update_line_numbers()
 
+    # --- Partes que se crean al primer uso ---
+    @cached_property
+    def highlighter(self):
+        from utils.syntax_highlighter import SyntaxHighlighter # Compila el patrón del lexer
+        return SyntaxHighlighter(self.editor)
+
+    @cached_property
+    def autocompletado(self):
+        """Trie de palabras clave e identificadores declarados."""
+        from utils.autocompletado import IndiceAutocompletado
+        return IndiceAutocompletado()
+
+    @cached_property
+    def analisis(self):
+        from core.analisis_fondo import ServicioAnalisis
+        return ServicioAnalisis(publicar=self._resultados_analisis.append)
+
+    @cached_property
+    def autoguardado(self):
+        from utils.autoguardado import Autoguardado
+        return Autoguardado()
+
+    def precargar(self):
+        """Crea ya lo que se crearía con la primera tecla (la ventana llama a esto después del primer cuadro)."""
+        self.highlighter
+        self.autocompletado
+        self.analisis
+        self.autoguardado
+        from . import popup_autocompletado, panel_problemas # Solo el import: sus ventanas siguen sin crearse
+
     def _on_editor_scroll(self, first_str, last_str):
         """
         Llamado cuando el CTkTextbox del editor se desplaza.
-        Actualiza la vista vertical del CTkTextbox de los números de línea.
         first_str y last_str son strings que representan floats (ej: "0.0", "0.231...")
         """
-        self.line_numbers.yview_moveto(first_str)
-        # Es importante que _update_line_numbers no se llame aquí en cada pixel de scroll
-        # ya que es una operación costosa. Se llama en _on_key_release o cuando el contenido cambia.
+        self.margen.redibujar() # Solo las líneas visibles, una vez por tick
+
+    def _on_key_press(self, event=None):
+        popup = self.popup_autocompletado
+        if event is not None and popup is not None and popup.visible: # Navegación del popup, sin mover el foco
+            if event.keysym in ("Down", "Up"):
+                popup.mover(1 if event.keysym == "Down" else -1)
+                return "break"
+            if event.keysym == "Tab" and popup.elegir():
+                return "break"
+            if event.keysym == "Escape":
+                self._hide_autocomplete()
+                return "break"
+        self.planificador.marcar_tecla(event)
+        if self._linea_tecla is None:
+            self._linea_tecla = self.linea_cursor()
 
     def _on_key_release(self, event=None):
-        # Verificar si la tecla presionada podría afectar el número de líneas (Enter, Backspace, Delete)
-        # o si es una tecla de movimiento que podría requerir re-sincronización si el contenido es muy dinámico.
-        # Por simplicidad, actualizamos en la mayoría de las liberaciones de teclas, pero se podría optimizar.
+        linea = self.linea_cursor()
+        anterior = self._linea_tecla or linea
+        self._linea_tecla = None
+        region = (min(anterior, linea), max(anterior, linea))
+        # Las teclas de movimiento o modificadoras (sin carácter) no editan: solo le importan al autocompletado
+        if event is None or event.char or event.keysym in ("BackSpace", "Delete"):
+            self.planificador.notificar(region, evento=event)
+        else:
+            self.planificador.notificar(region, evento=event, solo=("autocompletado",))
+
+    # --- Consumidores del planificador: reciben (region, evento) ---
+    def _actualizar_numeros(self, region, evento):
         self._update_line_numbers()
-        self.highlighter.highlight(event)
+
+    def _actualizar_resaltado(self, region, evento):
+        self.highlighter.highlight() # Compara por su cuenta qué líneas cambiaron
+
+    def _on_contenido_cambiado(self, region, evento):
+        self._programa_cambiado = True
+        if self._marcas_interrupcion:
+            self._seguir_puntos_interrupcion()
+        if self.cargando:
+            self._editado_en_carga = True
+        if self._calor_visible: # El perfil deja de corresponder al código editado
+            self.limpiar_calor()
+        if self._cobertura_visible:
+            self.limpiar_cobertura()
         if hasattr(self.master, 'set_unsaved_changes'):
              self.master.set_unsaved_changes(True)
 
+    def _actualizar_autocompletado(self, region, evento):
+        if evento is not None:
+            self._handle_autocomplete(evento)
+
+    def _solicitar_analisis(self, region, evento):
+        if self.cargando: # El programa aún está incompleto; _terminar_carga lo pide de nuevo
+            return
+        self.analisis.solicitar(self.get_content()) # No espera: el resultado llega a _recibir_analisis
+        if not self._revisando_analisis:
+            self._revisando_analisis = True
+            self.after(INTERVALO_ANALISIS_MS, self._recibir_analisis)
+
+    def _autoguardar(self, region, evento):
+        if self.cargando: # _terminar_carga lo anota si hubo ediciones durante la carga
+            return
+        self.autoguardado.anotar(self.get_content()) # No espera a disco
+
+    def _recibir_analisis(self):
+        resultado = None
+        while self._resultados_analisis: # Solo importa el más reciente
+            resultado = self._resultados_analisis.popleft()
+        if resultado is not None:
+            self.mostrar_diagnosticos(resultado.diagnosticos)
+        if self.analisis.ocupado or self._resultados_analisis:
+            self.after(INTERVALO_ANALISIS_MS, self._recibir_analisis)
+        else:
+            self._revisando_analisis = False
+
+    def mostrar_diagnosticos(self, diagnosticos):
+        """Subraya los errores, marca sus líneas en el margen y los lista en el panel de problemas."""
+        self.diagnosticos = diagnosticos
+        texto = getattr(self.editor, "_textbox", self.editor) # tag_add con varios rangos a la vez
+        texto.tag_remove("diagnostico", "1.0", "end")
+        indices = []
+        for diagnostico in diagnosticos:
+            inicio = f"{max(1, diagnostico.linea)}.{max(0, diagnostico.columna - 1)}"
+            indices += [inicio, f"{inicio}+{diagnostico.largo}c"]
+        if indices:
+            texto.tag_add("diagnostico", *indices)
+        self.marcar_errores({diagnostico.linea for diagnostico in diagnosticos})
+        if diagnosticos:
+            if self.panel_problemas is None:
+                from .panel_problemas import PanelProblemas
+                self.panel_problemas = PanelProblemas(self, al_seleccionar=self.ir_a_diagnostico)
+            self.panel_problemas.mostrar(diagnosticos)
+            self.panel_problemas.grid(row=1, column=0, columnspan=2, sticky="ew")
+        elif self.panel_problemas is not None:
+            self.panel_problemas.grid_remove()
+
+    def ir_a_diagnostico(self, diagnostico):
+        indice = f"{max(1, diagnostico.linea)}.{max(0, diagnostico.columna - 1)}"
+        self.editor.mark_set(tk.INSERT, indice)
+        self.editor.see(indice)
+        self.editor.focus_set()
+
+    def analisis_vigente(self, codigo):
+        """ResultadoAnalisis en segundo plano de exactamente `codigo`, o None si aún no está."""
+        return self.analisis.resultado_para(codigo)
+
+    def latencia_teclas(self):
+        """
+        Latencia de tecla a pintado (p50/p99 en ms), ejecuciones de cada actualización y,
+        en "autocompletado", la latencia de las sugerencias por tecla.
+        """
+        estadisticas = self.planificador.estadisticas()
+        estadisticas["autocompletado"] = self.autocompletado.estadisticas()
+        return estadisticas
+
     def _on_enter_key(self, event=None):
+        if self.popup_autocompletado is not None and self.popup_autocompletado.elegir():
+            return "break"
+        self._on_key_press(event) # <Return> tapa a <KeyPress>; el <KeyRelease> anota la edición
         current_line_index = self.editor.index(tk.INSERT).split('.')[0]
         current_line_text = self.editor.get(f"{current_line_index}.0", f"{current_line_index}.end")
         indentation = ""
@@ -92,31 +282,15 @@ class EditorFrame(ctk.CTkFrame):
         if any(keyword.lower() in current_line_text.lower() for keyword in trigger_keywords):
             indentation += "  "
         self.editor.insert(tk.INSERT, f"\n{indentation}")
-        self._update_line_numbers() # Actualizar después de insertar nueva línea
         return "break"
 
     def _update_line_numbers(self, event=None):
-        self.line_numbers.configure(state="normal")
-        self.line_numbers.delete("1.0", "end")
         try:
-            # El índice "end-1c" puede fallar si el textbox está vacío.
-            # Contar líneas basándose en el contenido real.
-            content = self.editor.get("1.0", "end-1c")
-            if not content: # Si está vacío
-                num_editor_lines = 1
-            else:
-                num_editor_lines = content.count('\n') + 1
-
+            # La línea de "end-1c" es la cantidad de líneas, sin copiar el contenido
+            num_editor_lines = int(self.editor.index("end-1c").split(".")[0])
         except tk.TclError: # Esto puede pasar si el widget está en un estado extraño o vacío
             num_editor_lines = 1
-
-        line_numbers_string = "\n".join(str(i) for i in range(1, int(num_editor_lines) + 1))
-        self.line_numbers.insert("1.0", line_numbers_string)
-        self.line_numbers.configure(state="disabled")
-        # Sincronizar el scroll después de actualizar el contenido de los números de línea.
-        # Esto asegura que si se añaden/quitan muchas líneas, la vista se mantenga consistente.
-        current_editor_scroll_pos = self.editor.yview()[0]
-        self.line_numbers.yview_moveto(current_editor_scroll_pos)
+        self.margen.actualizar_cantidad(num_editor_lines)
 
 
     def _on_mouse_wheel(self, event):
@@ -134,7 +308,7 @@ class EditorFrame(ctk.CTkFrame):
 
         # Aplicar el scroll al editor principal.
         # Esto activará el self.editor.configure(yscrollcommand=self._on_editor_scroll)
-        # que a su vez sincronizará self.line_numbers.
+        # que a su vez redibujará el margen.
         self.editor.yview_scroll(scroll_units, "units")
 
         return "break" # Evitar que el evento se propague más y cause doble scroll.
@@ -144,138 +318,239 @@ class EditorFrame(ctk.CTkFrame):
         return self.editor.get("1.0", "end-1c")
 
     def set_content(self, content):
+        self.cancelar_carga()
+        self.quitar_puntos_interrupcion() # Eran líneas del contenido anterior
         self.editor.delete("1.0", "end")
         self.editor.insert("1.0", content)
-        self._update_line_numbers() # Importante llamar DESPUÉS de insertar contenido
-        self.highlighter.highlight()
+        self.planificador.cancelar() # Lo pendiente era del contenido anterior
+        # Importante actualizar DESPUÉS de insertar contenido
+        self.planificador.notificar(None, solo=("numeros_linea", "resaltado", "analisis"))
+        self.planificador.vaciar()
+        self._programa_cambiado = True
+        self._hide_autocomplete()
         if hasattr(self.master, 'set_unsaved_changes'):
              self.master.set_unsaved_changes(False)
 
     def clear_content(self):
         self.set_content("")
 
-    def _handle_autocomplete(self, event=None):
-        # Ignorar teclas que no sean alfanuméricas o de modificación que no queremos que activen/modifiquen el popup
-        if event and event.keysym and not (event.keysym.isalnum() or event.keysym in ("BackSpace", "Delete", "Escape", "Down", "Up", "Return", "Tab")):
-            return
-
-        if event and event.keysym.isalnum() and len(event.keysym) == 1:
-            current_pos = self.editor.index(tk.INSERT)
-            line, char_pos = map(int, current_pos.split('.'))
-            word_start_index = self.editor.search(r"\s", f"{line}.{char_pos}", backwards=True, regexp=True)
-            if not word_start_index:
-                word_start_index = f"{line}.0"
-            else:
-                 word_start_index = self.editor.index(f"{word_start_index}+1c")
-            current_word = self.editor.get(word_start_index, f"{line}.{char_pos}").strip().upper()
+    # --- Carga de archivos por partes ---
+    @property
+    def cargando(self):
+        return self.cargador is not None
 
-            if not current_word or len(current_word) < 1: # Umbral mínimo para mostrar
-                self._hide_autocomplete()
-                return
+    def cargar_archivo(self, ruta, al_terminar=None, al_fallar=None):
+        """
+        Reemplaza el contenido por el archivo `ruta` sin bloquear la interfaz: se
+        inserta por partes y la primera pantalla se resalta y se puede usar antes
+        de que termine. Al final llama a al_terminar(cargador) o a al_fallar(error)
+        (el editor queda vacío). Deshacer no registra la carga.
+        """
+        self.cancelar_carga()
+        self.planificador.cancelar() # Lo pendiente era del contenido anterior
+        self._hide_autocomplete()
+        texto = getattr(self.editor, "_textbox", self.editor)
+        texto.configure(undo=False) # Sin una entrada de deshacer por parte
+        self.quitar_puntos_interrupcion()
+        self.editor.delete("1.0", "end")
+        self.highlighter.suspender() # Hasta terminar, solo lo visible
+        self._editado_en_carga = False
+        if self.barra_carga is None:
+            self.barra_carga = ctk.CTkProgressBar(self, height=6)
+        self.barra_carga.set(0)
+        self.barra_carga.grid(row=2, column=0, columnspan=2, sticky="ew")
+        from .cargador_archivo import CargadorArchivo
+        self.cargador = CargadorArchivo(self, ruta, self._agregar_parte,
+                                        lambda cargador: self._terminar_carga(cargador, al_terminar),
+                                        lambda error: self._fallar_carga(error, al_fallar))
+        self.cargador.iniciar()
+
+    def cancelar_carga(self):
+        """Detiene la carga en curso, si hay una; lo ya insertado queda en el editor."""
+        if self.cargador is not None:
+            self.cargador.cancelar()
+            self._fin_carga()
+
+    def _agregar_parte(self, texto, progreso):
+        self.editor.insert("end-1c", texto)
+        self.barra_carga.set(progreso)
+        self._update_line_numbers()
+        if self.cargador.partes_insertadas == 0: # Primera pantalla: resaltarla antes de que Tk repinte
+            self.highlighter.highlight()
+
+    def _fin_carga(self):
+        self.cargador = None
+        texto = getattr(self.editor, "_textbox", self.editor)
+        texto.edit_reset()
+        texto.configure(undo=True)
+        self.barra_carga.grid_remove()
+        self.highlighter.reanudar() # El resto del archivo, por tramos en segundo plano
+
+    def _terminar_carga(self, cargador, al_terminar):
+        self._fin_carga()
+        solo = ("numeros_linea", "analisis", "autoguardado") if self._editado_en_carga else ("numeros_linea", "analisis")
+        self.planificador.notificar(None, solo=solo)
+        self.planificador.vaciar()
+        self._programa_cambiado = True
+        if hasattr(self.master, 'set_unsaved_changes'):
+             self.master.set_unsaved_changes(self._editado_en_carga)
+        if al_terminar is not None:
+            al_terminar(cargador)
 
-            suggestions = [s for s in AUTOCOMPLETE_SUGGESTIONS if s.startswith(current_word)]
-            if suggestions:
-                self._show_autocomplete(suggestions, current_pos)
+    def _fallar_carga(self, error, al_fallar):
+        self._fin_carga()
+        self.set_content("")
+        if al_fallar is not None:
+            al_fallar(error)
+
+    # --- Depuración paso a paso ---
+    def linea_cursor(self):
+        return int(self.editor.index(tk.INSERT).split('.')[0])
+
+    def resaltar_linea_actual(self, linea):
+        """Marca la línea de la sentencia en la que está detenida la ejecución y la hace visible."""
+        self.editor.tag_remove("linea_actual", "1.0", "end")
+        if linea is not None:
+            self.editor.tag_add("linea_actual", f"{linea}.0", f"{linea}.0+1l")
+            self.editor.see(f"{linea}.0")
+
+    def limpiar_linea_actual(self):
+        self.editor.tag_remove("linea_actual", "1.0", "end")
+
+    def sombrear_calor(self, calor):
+        """Sombrea cada línea según `calor` ({linea: fracción 0..1}, ver Perfilador.calor_por_linea)."""
+        self.limpiar_calor()
+        niveles = len(COLORES_CALOR)
+        for linea, fraccion in calor.items():
+            nivel = min(niveles - 1, int(fraccion * niveles))
+            self.editor.tag_add(f"calor_{nivel}", f"{linea}.0", f"{linea}.0+1l")
+        self._calor_visible = bool(calor)
+
+    def limpiar_calor(self):
+        for nivel in range(len(COLORES_CALOR)):
+            self.editor.tag_remove(f"calor_{nivel}", "1.0", "end")
+        self._calor_visible = False
+
+    def mostrar_cobertura(self, estados):
+        """Colorea cada línea según `estados` ({linea: estado}, ver MapaCobertura.estado_lineas)."""
+        self.limpiar_cobertura()
+        for linea, estado in estados.items():
+            self.editor.tag_add(f"cobertura_{estado}", f"{linea}.0", f"{linea}.0+1l")
+        self.margen.cobertura = {linea: COLORES_COBERTURA[estado] for linea, estado in estados.items()}
+        self.margen.redibujar()
+        self._cobertura_visible = bool(estados)
+
+    def limpiar_cobertura(self):
+        for estado in COLORES_COBERTURA:
+            self.editor.tag_remove(f"cobertura_{estado}", "1.0", "end")
+        self.margen.cobertura = {}
+        self.margen.redibujar()
+        self._cobertura_visible = False
+
+    def marcar_errores(self, lineas):
+        """Marca en el margen las líneas con errores léxicos o sintácticos."""
+        self.margen.errores = set(lineas)
+        self.margen.redibujar()
+
+    def limpiar_errores(self):
+        self.marcar_errores(())
+
+    def alternar_punto_interrupcion(self, linea=None):
+        """Agrega o quita un punto de interrupción en `linea` (por defecto, la del cursor)."""
+        linea = linea or self.linea_cursor()
+        if linea in self.puntos_interrupcion:
+            self.puntos_interrupcion.discard(linea)
+            self.editor.mark_unset(self._marcas_interrupcion.pop(linea))
+            self.editor.tag_remove("punto_interrupcion", f"{linea}.0", f"{linea}.0+1l")
+        else:
+            self.puntos_interrupcion.add(linea)
+            marca = f"punto_interrupcion_{self._proxima_marca}"
+            self._proxima_marca += 1
+            self.editor.mark_set(marca, f"{linea}.0")
+            self.editor.mark_gravity(marca, "left") # Escribir al inicio de la línea no la mueve
+            self._marcas_interrupcion[linea] = marca
+            self.editor.tag_add("punto_interrupcion", f"{linea}.0", f"{linea}.0+1l")
+        self.margen.redibujar()
+
+    def _seguir_puntos_interrupcion(self):
+        """
+        Pasa los puntos de interrupción a la línea donde quedó su marca después de
+        una edición. El conjunto se cambia en su lugar: lo comparten el margen y el
+        ControladorPasos de una depuración en curso. Si se borró la línea, el punto
+        queda en la que la reemplazó; dos en la misma línea se vuelven uno.
+        """
+        marcas = {}
+        for marca in self._marcas_interrupcion.values():
+            linea = int(self.editor.index(marca).split(".")[0])
+            if linea in marcas:
+                self.editor.mark_unset(marca)
             else:
-                self._hide_autocomplete()
-        elif event and event.keysym == "BackSpace":
-            # Reevaluar autocompletado después de borrar. Podría ser más complejo para no reabrir inmediatamente.
-            # Por ahora, simplemente llamamos de nuevo para que se ajuste o cierre.
-             self.editor.after(10, lambda: self._trigger_autocomplete_from_key(event)) # Pequeño delay
-        elif event and event.keysym == "Escape":
-            self._hide_autocomplete()
-        elif self.autocomplete_listbox and self.autocomplete_listbox.winfo_exists():
-            # Manejo de Teclas de Navegación/Selección para el popup (simplificado)
-            if event.keysym == "Down":
-                # Intentar dar foco al primer botón del popup
-                try:
-                    first_button = self.autocomplete_listbox.winfo_children()[0]
-                    first_button.focus_set()
-                except IndexError:
-                    pass # No hay botones
-                return "break"
-            elif event.keysym == "Return" or event.keysym == "Tab":
-                 # Si el foco está en un botón del popup, su comando se activará.
-                 # Si el foco está en el editor, necesitamos una forma de seleccionar la primera sugerencia
-                 # o la sugerencia actualmente "resaltada" (no implementado).
-                 # Por simplicidad, si se presiona Enter/Tab en el editor y hay sugerencias,
-                 # se podría tomar la primera.
-                if self.editor.focus_get() == self.editor and self.autocomplete_listbox.winfo_children():
-                    first_suggestion = self.autocomplete_listbox.winfo_children()[0].cget("text")
-                    self._select_autocomplete_item(first_suggestion)
-                return "break" # Evitar que Enter/Tab hagan su acción por defecto en el editor
-
-    def _trigger_autocomplete_from_key(self, event):
-        """Función auxiliar para llamar a _handle_autocomplete, usualmente con un delay."""
-        # Simula un evento de liberación de tecla "alnum" para reutilizar la lógica.
-        # Esto es un poco un hack, idealmente _handle_autocomplete se reestructuraría.
-        class MockEvent:
-            def __init__(self):
-                # Obtener el último carácter alfanumérico antes del cursor para simular
-                current_pos_str = self.editor.index(tk.INSERT)
-                line, char_idx = map(int, current_pos_str.split('.'))
-                if char_idx > 0:
-                    # Obtener el carácter justo antes del cursor.
-                    # Necesitamos el inicio de la palabra para el 'current_word' en _handle_autocomplete
-                    self.keysym = self.editor.get(f"{line}.{char_idx-1}")
-                    if not self.keysym.isalnum(): self.keysym = "a" # Fallback
-                else:
-                    self.keysym = "a" # Fallback si está al inicio de la línea
-
-        mock_event = MockEvent()
-        self._handle_autocomplete(mock_event)
+                marcas[linea] = marca
+        # El resaltado se rehace aunque no cambien las líneas: un Enter a mitad de la línea lo estira a dos
+        self.editor.tag_remove("punto_interrupcion", "1.0", "end")
+        for linea in marcas:
+            self.editor.tag_add("punto_interrupcion", f"{linea}.0", f"{linea}.0+1l")
+        if marcas.keys() != self._marcas_interrupcion.keys():
+            self._marcas_interrupcion = marcas
+            self.puntos_interrupcion.clear()
+            self.puntos_interrupcion.update(marcas)
+            self.margen.redibujar()
+
+    def quitar_puntos_interrupcion(self):
+        for marca in self._marcas_interrupcion.values():
+            self.editor.mark_unset(marca)
+        self._marcas_interrupcion = {}
+        self.puntos_interrupcion.clear()
+        self.editor.tag_remove("punto_interrupcion", "1.0", "end")
+        self.margen.redibujar()
+
+    def _palabra_en_cursor(self):
+        """(índice de inicio, texto) de la palabra que termina en el cursor."""
+        linea, columna = map(int, self.editor.index(tk.INSERT).split("."))
+        antes = self.editor.get(f"{linea}.0", f"{linea}.{columna}")
+        palabra = re.search(r"\w*$", antes).group()
+        return f"{linea}.{columna - len(palabra)}", palabra
 
+    def _handle_autocomplete(self, event=None):
+        """Consumidor con espera del planificador: actualiza el popup con las sugerencias de la palabra actual."""
+        if event is not None and event.keysym in ("Down", "Up", "Tab", "Escape", "Return"): # Ya atendidas
+            return
+        escribe = event is not None and ((event.char and (event.char.isalnum() or event.char == "_"))
+                                         or event.keysym == "BackSpace")
+        if not escribe:
+            self._hide_autocomplete()
+            return
+        inicio = time.perf_counter()
+        _, palabra = self._palabra_en_cursor()
+        if not palabra or palabra[0].isdigit():
+            self._hide_autocomplete()
+            return
+        if self._programa_cambiado: # Identificadores y frecuencias del programa actual
+            self._programa_cambiado = False
+            tokens, _ = self.highlighter.tokens() # Solo tokeniza las líneas que falten
+            self.autocompletado.actualizar_programa(tokens)
+        sugerencias = self.autocompletado.sugerencias(palabra)
+        if sugerencias:
+            self._show_autocomplete(sugerencias, self.editor.index(tk.INSERT))
+        else:
+            self._hide_autocomplete()
+        self.autocompletado.registrar_latencia(time.perf_counter() - inicio)
 
     def _show_autocomplete(self, suggestions, cursor_pos_str):
-        if self.autocomplete_listbox and self.autocomplete_listbox.winfo_exists():
-            self.autocomplete_listbox.destroy()
-
-        x, y, _, height = self.editor.bbox(cursor_pos_str)
-        editor_x = self.editor.winfo_rootx()
-        editor_y = self.editor.winfo_rooty()
-        popup_x = editor_x + x
-        popup_y = editor_y + y + height + 2
-
-        self.autocomplete_listbox = ctk.CTkToplevel(self.editor)
-        self.autocomplete_listbox.overrideredirect(True)
-        # Ajustar el tamaño máximo y el tamaño por item
-        max_items_visible = 5
-        item_height = 28 # Altura aproximada de un CTkButton
-        popup_height = min(len(suggestions) * item_height, max_items_visible * item_height) + 4 # padding
-        popup_width = 180 # Ancho fijo o calculado
-
-        self.autocomplete_listbox.geometry(f"{popup_width}x{popup_height}+{popup_x}+{popup_y}")
-        self.autocomplete_listbox.attributes("-topmost", True)
-        self.autocomplete_listbox.lift()
-
-        # Frame interno para scroll si hay muchas sugerencias (no implementado aquí por simplicidad)
-        # Si son pocas, solo se apilan botones.
-
-        for i, item_text in enumerate(suggestions):
-            btn = ctk.CTkButton(self.autocomplete_listbox, text=item_text,
-                                command=lambda i_t=item_text: self._select_autocomplete_item(i_t),
-                                anchor="w", fg_color="transparent",
-                                hover_color=("#cccccc", "#333333"), # Light, Dark hover
-                                height=item_height - 4, corner_radius=3)
-            btn.pack(fill="x", padx=2, pady=1)
-            # Permitir navegación con Tab entre los botones del popup
-            if i == 0: btn.focus() # Dar foco al primer botón
-
-    def _hide_autocomplete_on_click(self, event=None):
-        # Oculta si el click NO es sobre el popup de autocompletado
-        if self.autocomplete_listbox and self.autocomplete_listbox.winfo_exists():
-            # Verificar si el click fue fuera del popup.
-            # Esto es un poco complicado porque el popup es un Toplevel.
-            # Una forma simple es ocultarlo y si el click fue en un botón del popup,
-            # el comando del botón ya se habrá disparado.
-            # self.editor.after(50, self._hide_autocomplete) # Pequeño delay
-            pass # Dejar que _hide_autocomplete_on_focus_out lo maneje
-
+        caja = self.editor.bbox(cursor_pos_str)
+        if caja is None: # El cursor no está a la vista
+            self._hide_autocomplete()
+            return
+        x, y, _, height = caja
+        if self.popup_autocompletado is None:
+            from .popup_autocompletado import PopupAutocompletado
+            self.popup_autocompletado = PopupAutocompletado(self.editor, self._select_autocomplete_item)
+        self.popup_autocompletado.mostrar(suggestions, self.editor.winfo_rootx() + x,
+                                          self.editor.winfo_rooty() + y + height + 2)
 
     def _hide_autocomplete(self, event=None):
-        if self.autocomplete_listbox and self.autocomplete_listbox.winfo_exists():
-            self.autocomplete_listbox.destroy()
-        self.autocomplete_listbox = None
+        if self.popup_autocompletado is not None:
+            self.popup_autocompletado.ocultar()
 
     def _hide_autocomplete_on_focus_out(self, event=None):
         # Si el foco sale del editor, y no va hacia el popup de autocompletado, ocultar.
@@ -283,31 +558,24 @@ class EditorFrame(ctk.CTkFrame):
         self.editor.after(100, self._check_and_hide_autocomplete_after_delay)
 
     def _check_and_hide_autocomplete_after_delay(self):
-        if not self.autocomplete_listbox or not self.autocomplete_listbox.winfo_exists():
+        popup = self.popup_autocompletado
+        if popup is None or not popup.visible:
             return
-
         focused_widget = self.winfo_toplevel().focus_get()
-
         # Si el foco se ha ido a algún widget que no es el editor ni parte del popup de autocompletado
-        if focused_widget != self.editor and \
-           (not hasattr(focused_widget, 'winfo_toplevel') or focused_widget.winfo_toplevel() != self.autocomplete_listbox):
+        if focused_widget is not self.editor and not str(focused_widget).startswith(str(self.editor)) \
+           and not popup.contiene(focused_widget):
             self._hide_autocomplete()
 
-
     def _select_autocomplete_item(self, item_text):
-        current_pos_str = self.editor.index(tk.INSERT)
-        line, char_pos = map(int, current_pos_str.split('.'))
-        word_start_index_str = self.editor.search(r"\s", f"{line}.{char_pos}", backwards=True, regexp=True)
-        if not word_start_index_str:
-            word_start_index_str = f"{line}.0"
-        else:
-            word_start_index_str = self.editor.index(f"{word_start_index_str}+1c")
-
-        self.editor.delete(word_start_index_str, current_pos_str) # Borrar hasta el cursor
-        self.editor.insert(word_start_index_str, item_text + " ")
+        inicio, _ = self._palabra_en_cursor()
+        line = int(inicio.split(".")[0])
+        self.editor.delete(inicio, tk.INSERT) # Borrar hasta el cursor
+        self.editor.insert(inicio, item_text + " ")
+        self.autocompletado.registrar_eleccion(item_text)
         self._hide_autocomplete()
         self.editor.focus_set()
-        self.highlighter.highlight()
+        self.planificador.notificar((line, line), solo=("resaltado", "cambios", "autoguardado"))
 
 
     def _show_command_tooltip(self, event):
@@ -319,6 +587,7 @@ class EditorFrame(ctk.CTkFrame):
         line, char_pos = map(int, index.split('.'))
         line_text = self.editor.get(f"{line}.0", f"{line}.end")
         found_keyword_tooltip = None
+        from core.keywords_col import COMMAND_TOOLTIPS
 
         for keyword, tooltip_text in COMMAND_TOOLTIPS.items():
             try:
@@ -6,6 +6,8 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, PanedWindow
 import os
+import re
+import time
 
 import tkinter as tk
 
@@ -14,19 +16,28 @@ from .console_frame import ConsoleFrame
 from .menu_bar import AppMenuBar
 from .theme_manager import ThemeManager
 from utils import file_handler # Ajusta la ruta si es necesario
-from core.lexer import Lexer # Ajusta la ruta
-from core.parser import Parser # Ajusta la ruta
-from core.interpreter import Interpreter # Ajusta la ruta
-import threading # Para ejecutar el intérprete en un hilo separado
+# El intérprete, el análisis, la cobertura, el depurador y el autoguardado se importan al primer uso:
+# nada de eso hace falta para mostrar la ventana
 
 APP_NAME = "PseudoCol Uni"
 APP_VERSION = "0.1.0"
+ALTO_VENTANA = 700
+PROPORCION_EDITOR = 0.7 # Del alto inicial, para el editor; el resto para la consola
 
 class MainWindow(ctk.CTk):
-    def __init__(self):
+    def __init__(self, inicio=None, recuperar=True):
+        """
+        inicio: time.perf_counter() del arranque del proceso (ver main.py). Con él,
+        tiempos_inicio guarda los segundos hasta "ventana" (constructor terminado),
+        "primer_cuadro" (la ventana ya se pintó) y "listo" (terminó lo diferido).
+        recuperar: ofrecer los documentos sin guardar de una sesión que no cerró bien.
+        """
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self.recuperar = recuperar
+        self.tiempos_inicio = {}
         super().__init__()
         self.title(f"{APP_NAME}")
-        self.geometry("900x700")
+        self.geometry(f"900x{ALTO_VENTANA}")
         self.protocol("WM_DELETE_WINDOW", self._on_closing) # Manejar cierre de ventana
 
         self.current_filepath = None
@@ -39,8 +50,29 @@ class MainWindow(ctk.CTk):
         self._setup_menu()
         
         # Estado para la ejecución
+        self.sesion = None # SesionEjecucion en curso (core/sesion_ejecucion.py)
         self.interpreter_thread = None
+        self.interpreter = None
         self.is_running = False
+        self.depurador = None # Sesión paso a paso en curso (gui/depurador.py)
+        self.cobertura_ejecucion = None # (MapaCobertura, Cobertura) de la ejecución con cobertura en curso
+
+        # Lo que no hace falta para el primer cuadro se hace cuando la ventana ya se pintó
+        self._id_primer_cuadro = self.bind("<Expose>", self._on_primer_cuadro, add="+")
+        self.tiempos_inicio["ventana"] = time.perf_counter() - self.inicio
+
+    def _on_primer_cuadro(self, event=None):
+        self.unbind("<Expose>", self._id_primer_cuadro)
+        # Tk redibuja en callbacks ociosos programados por el Expose: al correr este, ya se ve
+        self.after_idle(self._completar_inicio)
+
+    def _completar_inicio(self):
+        self.tiempos_inicio["primer_cuadro"] = time.perf_counter() - self.inicio
+        self.update_idletasks()
+        self.editor_frame.precargar() # Resaltador, autocompletado y análisis, antes de la primera tecla
+        self.tiempos_inicio["listo"] = time.perf_counter() - self.inicio
+        if self.recuperar: # Documentos que quedaron sin guardar en una sesión que no cerró bien
+            self._ofrecer_recuperacion()
 
 
     def _setup_ui(self):
@@ -53,16 +85,14 @@ class MainWindow(ctk.CTk):
 
         self.editor_frame = EditorFrame(self.paned_window)
         # self.editor_frame.pack(expand=True, fill="both") # No pack, añadir a paned_window
-        self.paned_window.add(self.editor_frame, minsize=200) # minsize para evitar que se colapse
+        # Alto inicial en proporción a la ventana (sin mover el divisor después de mostrarla)
+        self.paned_window.add(self.editor_frame, minsize=200, # minsize para evitar que se colapse
+                              height=int(ALTO_VENTANA * PROPORCION_EDITOR))
 
         self.console_frame = ConsoleFrame(self.paned_window)
         # self.console_frame.pack(expand=True, fill="both", pady=(5,0)) # No pack
         self.paned_window.add(self.console_frame, minsize=100)
 
-        # Ajustar la proporción inicial (ej. 70% editor, 30% consola)
-        self.paned_window.sash_place(0, 0, int(self.winfo_height() * 0.7)) # Esto es un poco tentativo al inicio
-        self.after(100, lambda: self.paned_window.sash_place(0, 0, int(self.winfo_height() * 0.7)))
-
 
     def _setup_menu(self):
         """Configura la barra de menú."""
@@ -79,8 +109,14 @@ class MainWindow(ctk.CTk):
             'pegar': self.cmd_pegar,
             'seleccionar_todo': self.cmd_seleccionar_todo,
             'ejecutar_algoritmo': self.cmd_ejecutar_algoritmo,
-            'ejecutar_paso_a_paso': self.cmd_ejecutar_paso_a_paso, # Placeholder
+            'ejecutar_paso_a_paso': self.cmd_ejecutar_paso_a_paso,
+            'ejecutar_hasta_cursor': self.cmd_ejecutar_hasta_cursor,
+            'alternar_punto_interrupcion': self.cmd_alternar_punto_interrupcion,
+            'perfilar_algoritmo': self.cmd_perfilar_algoritmo,
+            'ejecutar_con_cobertura': self.cmd_ejecutar_con_cobertura,
             'limpiar_consola': self.cmd_limpiar_consola,
+            'pausar_reanudar': self.cmd_pausar_reanudar,
+            'detener_ejecucion': self.cmd_detener_ejecucion,
             'set_theme': self.cmd_set_theme,
             'get_current_theme_mode': lambda: self.theme_manager.get_current_theme_mode(),
             'mostrar_acerca_de': self.cmd_mostrar_acerca_de,
@@ -98,6 +134,35 @@ class MainWindow(ctk.CTk):
             self.unsaved_changes = 狀態
             self._update_title()
 
+    def _documento_limpio(self, filepath):
+        """El editor coincide con `filepath` (o con un documento nuevo): ya no hay nada que recuperar."""
+        self.current_filepath = filepath
+        self.set_unsaved_changes(False)
+        self.editor_frame.autoguardado.ruta = filepath
+        self.editor_frame.autoguardado.descartar()
+
+    def _ofrecer_recuperacion(self):
+        from utils.autoguardado import buffers_recuperables, descartar_buffer
+        try:
+            recuperables = buffers_recuperables()
+        except OSError:
+            return
+        if not recuperables:
+            return
+        buffer = recuperables[0] # Un solo editor: el más reciente; los demás se ofrecen al próximo inicio
+        nombre = os.path.basename(buffer.ruta) if buffer.ruta else "Sin Título"
+        cuando = time.strftime("%d/%m/%Y %H:%M", time.localtime(buffer.instante))
+        if not messagebox.askyesno("Recuperar cambios",
+                                   f"La aplicación no se cerró bien y quedaron cambios sin guardar en "
+                                   f"\"{nombre}\" ({cuando}). ¿Desea recuperarlos?", parent=self):
+            descartar_buffer(buffer.identificador)
+            return
+        self.editor_frame.set_content(buffer.texto)
+        self.current_filepath = buffer.ruta
+        self.editor_frame.autoguardado.adoptar(buffer) # Sigue en el diario hasta que se guarde
+        self.set_unsaved_changes(True)
+        self._update_title()
+
     # --- Comandos de Menú ---
     def cmd_nuevo_archivo(self):
         if self.unsaved_changes:
@@ -114,8 +179,7 @@ class MainWindow(ctk.CTk):
         
         self.editor_frame.clear_content()
         self.console_frame.clear_output()
-        self.current_filepath = None
-        self.set_unsaved_changes(False)
+        self._documento_limpio(None)
 
 
     def cmd_abrir_archivo(self):
@@ -128,22 +192,34 @@ class MainWindow(ctk.CTk):
                 if not self.cmd_guardar_archivo():
                     return
         
-        contenido, filepath = file_handler.abrir_archivo()
-        if contenido is not None and filepath:
-            self.editor_frame.set_content(contenido)
-            self.current_filepath = filepath
-            self.set_unsaved_changes(False)
+        filepath = file_handler.elegir_archivo_para_abrir(self)
+        if filepath:
+            # Por partes: el editor se puede usar desde la primera pantalla, aunque el archivo sea enorme
+            self._documento_limpio(filepath)
             self.console_frame.clear_output()
+            self.editor_frame.cargar_archivo(filepath, al_fallar=self._on_error_carga)
+
+    def _on_error_carga(self, error):
+        self._documento_limpio(None)
+        messagebox.showerror("Error al abrir", f"No se pudo abrir el archivo:\n{error}", parent=self)
+
+    def _carga_en_curso(self):
+        """Avisa y devuelve True si el archivo abierto aún no terminó de cargarse."""
+        if self.editor_frame.cargando:
+            messagebox.showinfo("Cargando", "Espere a que el archivo termine de cargarse.", parent=self)
+            return True
+        return False
 
     def cmd_guardar_archivo(self):
+        if self._carga_en_curso(): # Guardaría el archivo a medias
+            return False
         if not self.current_filepath:
             return self.cmd_guardar_archivo_como()
         else:
             contenido = self.editor_frame.get_content()
             filepath = file_handler.guardar_archivo(self.current_filepath, contenido, self)
             if filepath:
-                self.current_filepath = filepath
-                self.set_unsaved_changes(False)
+                self._documento_limpio(filepath)
                 # messagebox.showinfo("Guardado", "Archivo guardado exitosamente.", parent=self)
                 return True
             else:
@@ -151,21 +227,25 @@ class MainWindow(ctk.CTk):
                 return False
 
     def cmd_guardar_archivo_como(self):
+        if self._carga_en_curso():
+            return False
         contenido = self.editor_frame.get_content()
         filepath = file_handler.guardar_archivo_como(contenido, self)
         if filepath:
-            self.current_filepath = filepath
-            self.set_unsaved_changes(False)
+            self._documento_limpio(filepath)
             # messagebox.showinfo("Guardado", f"Archivo guardado como {os.path.basename(filepath)}", parent=self)
             return True
         return False # Usuario canceló o hubo error
 
     def _on_closing(self):
         if self.is_running:
-            messagebox.showwarning("Ejecución en Progreso", 
-                                   "Un algoritmo se está ejecutando. Por favor, espere a que termine o deténgalo.", 
-                                   parent=self)
-            return
+            if not messagebox.askyesno("Ejecución en Progreso",
+                                       "Un algoritmo se está ejecutando. ¿Desea detenerlo y salir?",
+                                       parent=self):
+                return
+            self.cmd_detener_ejecucion()
+            if self.interpreter_thread and self.interpreter_thread.is_alive():
+                self.interpreter_thread.join(timeout=1.0) # La cancelación es cooperativa y rápida
 
         if self.unsaved_changes:
             respuesta = messagebox.askyesnocancel("Salir", 
@@ -176,6 +256,8 @@ class MainWindow(ctk.CTk):
                     return # No salir si el guardado falla o se cancela
             elif respuesta is None: # Cancelar
                 return
+        self.editor_frame.analisis.cerrar()
+        self.editor_frame.autoguardado.cerrar(descartar=True) # Se guardó o se eligió descartar los cambios
         self.destroy()
 
     # Comandos de Edición (básicos, usan eventos de widget de texto)
@@ -223,7 +305,10 @@ class MainWindow(ctk.CTk):
             widget.select_range(0, 'end')
 
 
-    def cmd_ejecutar_algoritmo(self):
+    def cmd_ejecutar_algoritmo(self, perfilar=False, cobertura=False):
+        if self.depurador is not None: # En paso a paso, F5 continúa hasta el próximo punto de interrupción
+            self.depurador.continuar()
+            return
         if self.is_running:
             messagebox.showwarning("En ejecución", "Ya hay un algoritmo en ejecución.", parent=self)
             return
@@ -231,6 +316,8 @@ class MainWindow(ctk.CTk):
         if self.console_frame.is_waiting_for_input():
             messagebox.showwarning("Entrada pendiente", "La consola está esperando una entrada. Finalice la ejecución actual.", parent=self)
             return
+        if self._carga_en_curso():
+            return
 
         codigo = self.editor_frame.get_content()
         if not codigo.strip():
@@ -239,96 +326,112 @@ class MainWindow(ctk.CTk):
 
         self.console_frame.clear_output()
         self.console_frame.write_output(">>> Iniciando ejecución...\n")
+        self.editor_frame.limpiar_calor()
+        self.editor_frame.limpiar_cobertura()
         self.is_running = True
 
+        from core.interpreter import Interpreter
+        from core.sesion_ejecucion import SesionEjecucion
+        # El intérprete se crea aquí (hilo de la GUI) para que Detener funcione desde el primer instante
+        self.interpreter = Interpreter(
+            console_input_func=self.console_frame.request_input,
+            console_output_func=self.console_frame.write_output,
+            perfilar=perfilar
+        )
+        # Los eventos de la sesión pasan por la cola de la consola: se atienden en el hilo de Tk,
+        # después de la salida que el programa escribió antes de cada cambio de estado
+        self.sesion = SesionEjecucion(codigo, self.interpreter,
+                                      publicar=lambda evento: self.console_frame.en_hilo_gui(self._on_evento_sesion, evento),
+                                      preparar=self._preparar_cobertura if cobertura else None,
+                                      analisis=self.editor_frame.analisis_vigente(codigo)) # Sin volver a analizar
         # Ejecutar en un hilo separado para no bloquear la GUI
-        self.interpreter_thread = threading.Thread(target=self._run_code_thread, args=(codigo,), daemon=True)
-        self.interpreter_thread.start()
+        self.interpreter_thread = self.sesion.iniciar()
         
         # Deshabilitar controles sensibles durante la ejecución
         self._toggle_execution_controls(enabled=False)
 
-        # Programar una verificación periódica para ver si el hilo ha terminado
-        self.after(100, self._check_interpreter_thread)
-
-
-    def _run_code_thread(self, codigo):
-        """Función que se ejecuta en el hilo del intérprete."""
-        lexer = Lexer(codigo)
-        tokens, errors_lex = lexer.tokenize()
-
+    def _preparar_cobertura(self, ast_node):
+        """En el hilo de la sesión, entre el análisis y la ejecución. Se muestra al terminar."""
+        from core.cobertura import Cobertura, MapaCobertura
+        cobertura = Cobertura.para(ast_node)
+        cobertura.instalar(self.interpreter)
+        self.cobertura_ejecucion = (MapaCobertura(ast_node), cobertura)
+
+
+    def _reportar_errores_analisis(self, ast_node, errors_lex, errors_par):
+        """
+        Escribe en la consola los errores léxicos o sintácticos y marca sus líneas
+        en el margen del editor. Devuelve True si los hubo.
+        """
+        lineas = {int(n) for error in errors_lex + errors_par for n in re.findall(r"línea (\d+)", error)}
+        if lineas:
+            self.editor_frame.marcar_errores(lineas)
         if errors_lex:
             for error in errors_lex:
                 self.console_frame.write_output(f"Error Léxico: {error}")
-            # self.console_frame.write_output("\n<<< Ejecución fallida (errores léxicos).")
-            # self.is_running = False # Se establecerá en _check_interpreter_thread
-            return # Terminar el hilo
-
-        # Imprimir tokens (opcional, para depuración)
-        # self.console_frame.write_output("Tokens:\n")
-        # for token in tokens: self.console_frame.write_output(str(token))
-        # self.console_frame.write_output("\n")
-
-        parser = Parser(tokens)
-        ast_node, errors_par = parser.parse()
+            return True
 
         if errors_par:
             for error in errors_par:
                 self.console_frame.write_output(f"Error Sintáctico: {error}")
-            # self.console_frame.write_output("\n<<< Ejecución fallida (errores sintácticos).")
-            # self.is_running = False
-            return
+            return True
 
         if ast_node is None: # Si el AST es None pero no hubo errores explícitos (raro)
             self.console_frame.write_output("Error: No se pudo construir el árbol de sintaxis (AST).")
-            # self.console_frame.write_output("\n<<< Ejecución fallida.")
-            # self.is_running = False
-            return
-
-        # Imprimir AST (opcional, para depuración)
-        # self.console_frame.write_output("AST:\n")
-        # self.console_frame.write_output(str(ast_node)) # Puede ser muy largo
-        # self.console_frame.write_output("\n")
+            return True
+        return False
 
-        interpreter = Interpreter(
-            console_input_func=self.console_frame.request_input,
-            console_output_func=self.console_frame.write_output
-        )
-        try:
-            interpreter.interpret(ast_node)
-            # self.console_frame.write_output("\n<<< Ejecución completada.")
-        except Exception as e: # Captura errores de runtime del intérprete o errores inesperados
-            self.console_frame.write_output(f"Error en ejecución: {e}")
-            # self.console_frame.write_output("\n<<< Ejecución fallida (error de runtime).")
-        finally:
-            # self.is_running = False # El hilo principal de la GUI lo gestionará
-            pass # No modificar is_running aquí, se hace en el hilo principal
-
-
-    def _check_interpreter_thread(self):
-        """Verifica si el hilo del intérprete ha terminado."""
-        if self.interpreter_thread and self.interpreter_thread.is_alive():
-            self.after(100, self._check_interpreter_thread) # Volver a verificar
-        else:
-            # El hilo ha terminado
-            self.is_running = False
-            if self.console_frame.is_waiting_for_input():
-                # Si el hilo terminó pero la consola aún espera input (ej. por timeout en LEA)
-                self.console_frame.hide_input_entry() # Asegurar que se oculte
-                self.console_frame.waiting_for_input = False # Resetear estado
-
-            # Añadir mensaje de fin de ejecución si no lo hubo ya por error
-            # Esto es un poco heurístico, la salida final puede variar.
-            # Se podría mejorar con un estado más explícito del intérprete.
-            final_output = self.console_frame.output_text.get("end-2l linestart", "end-1c") # Última línea
-            if "<<<" not in final_output: # Si no hay un mensaje de fin de ejecución explícito
-                 self.console_frame.write_output("\n<<< Ejecución finalizada.")
-            
-            self._toggle_execution_controls(enabled=True) # Reactivar controles
-            self.interpreter_thread = None # Limpiar referencia al hilo
-
-
-    def _toggle_execution_controls(self, enabled: bool):
+    def _on_evento_sesion(self, evento):
+        """Cambio de estado de la sesión de ejecución (en el hilo de Tk)."""
+        from core.sesion_ejecucion import ESTADO_FINALIZADA, ESTADO_FALLIDA, ESTADO_CANCELADA
+        sesion = evento.sesion
+        if sesion is not self.sesion or not evento.final: # De una sesión anterior, o aún no termina
+            return
+        # La sesión terminó: reactivar los controles ya, sin esperar a que el hilo acabe de salir
+        self.is_running = False
+        self.sesion = None
+        if self.console_frame.is_waiting_for_input():
+            # Si la sesión terminó pero la consola aún espera input (ej. por timeout en LEA)
+            self.console_frame.hide_input_entry() # Asegurar que se oculte
+            self.console_frame.waiting_for_input = False # Resetear estado
+
+        if evento.estado == ESTADO_FALLIDA and (sesion.errores_lexicos or sesion.errores_sintacticos):
+            self._reportar_errores_analisis(sesion.ast, sesion.errores_lexicos, sesion.errores_sintacticos)
+        elif evento.estado == ESTADO_FALLIDA and sesion.interprete.error_ejecucion is None:
+            for error in evento.detalle: # Error interno, no reportado por el intérprete
+                self.console_frame.write_output(error)
+        mensajes = {ESTADO_FINALIZADA: "Ejecución finalizada", ESTADO_FALLIDA: "Ejecución fallida",
+                    ESTADO_CANCELADA: "Ejecución detenida"}
+        self.console_frame.write_output(f"\n<<< {mensajes[evento.estado]}. ({sesion.resumen_tiempos()})")
+        if self.interpreter is not None and self.interpreter.perfilador is not None:
+            self._mostrar_perfil(self.interpreter.perfilador)
+        if self.cobertura_ejecucion is not None:
+            self._mostrar_cobertura(*self.cobertura_ejecucion)
+            self.cobertura_ejecucion = None
+
+        self._toggle_execution_controls(enabled=True) # Reactivar controles
+        self.interpreter_thread = None # Limpiar referencia al hilo
+        self.interpreter = None
+
+
+    def _mostrar_perfil(self, perfilador):
+        """Sombrea las líneas del editor por costo y escribe los puntos calientes en la consola."""
+        if not perfilador.por_linea: # No llegó a ejecutarse (ej. error de análisis)
+            return
+        self.editor_frame.sombrear_calor(perfilador.calor_por_linea())
+        self.console_frame.write_output("\n" + perfilador.reporte(self.editor_frame.get_content(), n=10))
+
+    def _mostrar_cobertura(self, mapa, cobertura):
+        """Colorea las líneas del editor por cobertura y escribe el resumen en la consola."""
+        self.editor_frame.mostrar_cobertura(mapa.estado_lineas(cobertura))
+        reporte = mapa.reporte(cobertura)
+        ramas = ", ".join(f"línea {si['linea']}: {'V' if si['verdadero'] else '-'}{'F' if si['falso'] else '-'}"
+                          for si in reporte["si"])
+        self.console_frame.write_output(
+            f"\nCobertura: líneas {reporte['lineas']['porcentaje']}%, ramas {reporte['ramas']['porcentaje']}%"
+            + (f" ({ramas})" if ramas else ""))
+
+    def _toggle_execution_controls(self, enabled: bool, paso_a_paso=False):
         """Habilita o deshabilita controles durante la ejecución."""
         state = "normal" if enabled else "disabled"
         
@@ -339,9 +442,8 @@ class MainWindow(ctk.CTk):
         # self.menu.menu_archivo.entryconfig("Abrir...", state=state)
         # ... excepto Salir, quizás
 
-        # Menú Ejecutar
-        # self.menu.menu_ejecutar.entryconfig("Ejecutar Algoritmo", state=state)
-        self.menu.menubar.entryconfig("Ejecutar", state=state) # Todo el menú ejecutar
+        # Menú Ejecutar: Ejecutar se deshabilita, Pausar/Detener se habilitan durante la ejecución
+        self.menu.set_estado_ejecucion(en_ejecucion=not enabled, paso_a_paso=paso_a_paso)
 
         # Editor (hacerlo de solo lectura)
         editor_state = "normal" if enabled else "disabled"
@@ -350,8 +452,84 @@ class MainWindow(ctk.CTk):
         # Podrías interceptar eventos de teclado si quieres permitir lectura pero no edición.
         # Por ahora, lo más simple es deshabilitarlo.
 
+    def cmd_detener_ejecucion(self):
+        """Cancela la ejecución en curso (también si está en pausa o esperando un LEA)."""
+        if self.depurador is not None:
+            self.depurador.detener()
+            return
+        if not self.is_running or self.sesion is None:
+            return
+        self.sesion.cancelar()
+        self.console_frame.cancelar_entrada()
+
+    def cmd_pausar_reanudar(self):
+        if self.depurador is not None: # En paso a paso, Pausar detiene un Continuar en curso
+            self.depurador.pausar()
+            return
+        if not self.is_running or self.interpreter is None:
+            return
+        if self.interpreter.control.pausado:
+            self.interpreter.reanudar()
+            self.menu.set_estado_ejecucion(en_ejecucion=True, pausado=False)
+        else:
+            self.interpreter.pausar()
+            self.menu.set_estado_ejecucion(en_ejecucion=True, pausado=True)
+
     def cmd_ejecutar_paso_a_paso(self):
-        messagebox.showinfo("Próximamente", "La ejecución paso a paso aún no está implementada.", parent=self)
+        """Inicia una sesión paso a paso o, si ya hay una, ejecuta la sentencia resaltada."""
+        if self.depurador is not None:
+            self.depurador.paso()
+            return
+        if self.is_running:
+            messagebox.showwarning("En ejecución", "Ya hay un algoritmo en ejecución.", parent=self)
+            return
+        if self._carga_en_curso():
+            return
+
+        codigo = self.editor_frame.get_content()
+        if not codigo.strip():
+            messagebox.showinfo("Vacío", "No hay código para ejecutar.", parent=self)
+            return
+
+        self.console_frame.clear_output()
+        self.console_frame.write_output(">>> Iniciando ejecución paso a paso...\n")
+        from core.ejecutor import analizar
+        from core.interpreter import Interpreter
+        from .depurador import DepuradorPasoAPaso
+        ast_node, errors_lex, errors_par = analizar(codigo)
+        if self._reportar_errores_analisis(ast_node, errors_lex, errors_par):
+            self.console_frame.write_output("\n<<< Ejecución finalizada.")
+            return
+
+        # Todo ocurre en el hilo de la GUI: la salida puede ir directo a la consola
+        self.interpreter = Interpreter(console_output_func=self.console_frame.write_output)
+        self.depurador = DepuradorPasoAPaso(self, self.editor_frame, self.console_frame,
+                                            self.interpreter, ast_node, self._on_fin_paso_a_paso)
+        self.is_running = True
+        self._toggle_execution_controls(enabled=False, paso_a_paso=True)
+        self.depurador.paso() # Detenerse en la primera sentencia, sin ejecutarla
+
+    def cmd_ejecutar_hasta_cursor(self):
+        if self.depurador is None:
+            self.cmd_ejecutar_paso_a_paso()
+        if self.depurador is not None:
+            self.depurador.ejecutar_hasta_cursor()
+
+    def cmd_perfilar_algoritmo(self):
+        self.cmd_ejecutar_algoritmo(perfilar=True)
+
+    def cmd_ejecutar_con_cobertura(self):
+        self.cmd_ejecutar_algoritmo(cobertura=True)
+
+    def cmd_alternar_punto_interrupcion(self):
+        self.editor_frame.alternar_punto_interrupcion()
+
+    def _on_fin_paso_a_paso(self):
+        self.console_frame.write_output("\n<<< Ejecución finalizada.")
+        self.depurador = None
+        self.interpreter = None
+        self.is_running = False
+        self._toggle_execution_controls(enabled=True)
 
     def cmd_limpiar_consola(self):
         self.console_frame.clear_output()
@@ -0,0 +1,146 @@
+# pseint_colombiano/gui/margen_lineas.py
+"""
+Margen del editor con los números de línea y marcas (puntos de interrupción,
+errores y cobertura), dibujado en un Canvas.
+
+Solo se dibujan las líneas visibles: se recorren desde "@0,0" con dlineinfo()
+hasta la primera que ya no se ve, así el costo depende del alto de la ventana
+y no del largo del archivo. Se redibuja, una vez por tick ocioso, al
+desplazarse, al cambiar de tamaño, al cambiar la cantidad de líneas o las
+marcas.
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+
+# Colores del margen por tema
+COLORES_MARGEN = {
+    "light": {"fondo": "#F3F3F3", "numero": "#8A8A8A"},
+    "dark": {"fondo": "#202020", "numero": "#6E6E6E"},
+}
+COLOR_PUNTO_INTERRUPCION = "#E51400"
+COLOR_ERROR = "#F0A30A"
+
+# Ancho (px) de las columnas de marcas: punto de interrupción a la izquierda, cobertura a la derecha
+ANCHO_PUNTO = 14
+ANCHO_COBERTURA = 4
+RELLENO = 6
+
+
+class MargenLineas(tk.Canvas):
+    """
+    Números de línea de `editor` (un CTkTextbox o tk.Text). Las marcas son
+    referencias que el editor actualiza y luego llama a redibujar():
+      puntos_interrupcion  conjunto de líneas
+      errores              conjunto de líneas con errores
+      cobertura            {linea: color}
+    Un clic en el margen llama a al_hacer_clic(linea).
+    """
+    def __init__(self, master, editor, puntos_interrupcion, fuente=("Consolas", 12), tema="light",
+                 al_hacer_clic=None):
+        super().__init__(master, highlightthickness=0, borderwidth=0)
+        self._texto = getattr(editor, "_textbox", editor) # dlineinfo() es del tk.Text
+        self.puntos_interrupcion = puntos_interrupcion
+        self.errores = set()
+        self.cobertura = {}
+        self.al_hacer_clic = al_hacer_clic
+        self.fuente = tkfont.Font(family=fuente[0], size=fuente[1])
+        self._cantidad = 1
+        self._digitos = 0
+        self._programado = None
+        self.configurar_tema(tema)
+        self._ajustar_ancho(1)
+        self.bind("<Button-1>", self._on_click)
+        self._texto.bind("<Configure>", lambda event: self.redibujar(), add="+")
+
+    def configurar_tema(self, tema):
+        self.colores = COLORES_MARGEN.get(tema, COLORES_MARGEN["light"])
+        self.configure(background=self.colores["fondo"])
+        self.redibujar()
+
+    def actualizar_cantidad(self, cantidad):
+        """Cantidad de líneas del editor: ajusta el ancho si cambian los dígitos y redibuja."""
+        if cantidad != self._cantidad:
+            self._cantidad = cantidad
+            self._ajustar_ancho(cantidad)
+            self.redibujar()
+
+    def _ajustar_ancho(self, cantidad):
+        digitos = max(2, len(str(cantidad)))
+        if digitos != self._digitos:
+            self._digitos = digitos
+            self._ancho_numeros = self.fuente.measure("0" * digitos)
+            self.configure(width=ANCHO_PUNTO + self._ancho_numeros + RELLENO + ANCHO_COBERTURA)
+
+    def redibujar(self):
+        """Programa un redibujado para el próximo tick ocioso (varios pedidos se juntan en uno)."""
+        if self._programado is None:
+            self._programado = self.after_idle(self._dibujar)
+
+    def _dibujar(self):
+        self._programado = None
+        self.delete("all")
+        texto = self._texto
+        linea = int(texto.index("@0,0").split(".")[0])
+        x_numero = ANCHO_PUNTO + self._ancho_numeros
+        x_cobertura = x_numero + RELLENO
+        color_numero, fuente = self.colores["numero"], self.fuente
+        while linea <= self._cantidad:
+            info = texto.dlineinfo(f"{linea}.0")
+            if info is None: # Debajo de la parte visible
+                break
+            _, y, _, alto, _ = info
+            if linea in self.puntos_interrupcion:
+                centro, radio = y + alto / 2, min(5, alto / 2 - 1)
+                self.create_oval(ANCHO_PUNTO / 2 - radio, centro - radio, ANCHO_PUNTO / 2 + radio, centro + radio,
+                                 fill=COLOR_PUNTO_INTERRUPCION, outline="")
+            if linea in self.errores:
+                self.create_rectangle(0, y, 3, y + alto, fill=COLOR_ERROR, outline="")
+            color = self.cobertura.get(linea)
+            if color is not None:
+                self.create_rectangle(x_cobertura, y, x_cobertura + ANCHO_COBERTURA, y + alto, fill=color, outline="")
+            self.create_text(x_numero, y, anchor="ne", text=str(linea), font=fuente, fill=color_numero)
+            linea += 1
+
+    def linea_en(self, y):
+        """Número de línea del editor a la altura y (en píxeles del margen)."""
+        return int(self._texto.index(f"@0,{y}").split(".")[0])
+
+    def _on_click(self, event):
+        if self.al_hacer_clic is not None:
+            self.al_hacer_clic(self.linea_en(event.y))
+
+
+if __name__ == '__main__':
+    # Costo de dibujar el margen y de desplazarse en un archivo de 100 000 líneas
+    # frente a uno de 100. Necesita pantalla.
+    import time
+
+    raiz = tk.Tk()
+    raiz.geometry("800x600")
+    raiz.grid_columnconfigure(1, weight=1)
+    raiz.grid_rowconfigure(0, weight=1)
+    editor = tk.Text(raiz, font=("Consolas", 12), wrap="none")
+    puntos = {3, 50_000}
+    margen = MargenLineas(raiz, editor, puntos, al_hacer_clic=lambda linea: print(f"Clic en la línea {linea}"))
+    margen.grid(row=0, column=0, sticky="ns")
+    editor.grid(row=0, column=1, sticky="nsew")
+    editor.configure(yscrollcommand=lambda *args: margen.redibujar())
+
+    for lineas in (100, 100_000):
+        editor.delete("1.0", "end")
+        editor.insert("1.0", "\n".join(f"    MUESTRE {i}" for i in range(lineas)))
+        margen.errores = {10}
+        margen.cobertura = {i: "#DDF4DA" for i in range(1, lineas, 2)}
+        margen.actualizar_cantidad(lineas)
+        raiz.update()
+        tiempos = []
+        for destino in range(0, lineas, max(1, lineas // 200)):
+            editor.yview(f"{destino + 1}.0")
+            raiz.update_idletasks()
+            inicio = time.perf_counter()
+            margen._dibujar()
+            tiempos.append(time.perf_counter() - inicio)
+        tiempos.sort()
+        print(f"{lineas:>7} líneas: redibujo mediana {tiempos[len(tiempos) // 2] * 1000:.2f} ms, "
+              f"máximo {tiempos[-1] * 1000:.2f} ms ({len(margen.find_all())} elementos en el canvas)")
+    raiz.mainloop()
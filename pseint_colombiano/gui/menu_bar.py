@@ -5,8 +5,6 @@ Tkinter no tiene un widget CTkMenuBar, así que usamos el Menú estándar de Tk.
 """
 import tkinter as tk
 from tkinter import Menu, messagebox
-from utils import file_handler # Ajusta la ruta si es necesario
-from core.keywords_col import COMMAND_TOOLTIPS # Para la ayuda de comandos
 
 class AppMenuBar:
     def __init__(self, root_window, app_commands):
@@ -61,13 +59,43 @@ class AppMenuBar:
     def _crear_menu_ejecutar(self):
         menu_ejecutar = Menu(self.menubar, tearoff=0)
         menu_ejecutar.add_command(label="Ejecutar Algoritmo", command=self.commands.get('ejecutar_algoritmo'), accelerator="F5")
-        menu_ejecutar.add_command(label="Ejecutar Paso a Paso", command=self.commands.get('ejecutar_paso_a_paso'), accelerator="F8", state="disabled") # TODO
+        menu_ejecutar.add_command(label="Ejecutar Paso a Paso", command=self.commands.get('ejecutar_paso_a_paso'), accelerator="F8")
+        menu_ejecutar.add_command(label="Ejecutar hasta el Cursor", command=self.commands.get('ejecutar_hasta_cursor'), accelerator="Ctrl+F8")
+        menu_ejecutar.add_command(label="Alternar Punto de Interrupción", command=self.commands.get('alternar_punto_interrupcion'), accelerator="F9")
+        menu_ejecutar.add_command(label="Perfilar Algoritmo", command=self.commands.get('perfilar_algoritmo'))
+        menu_ejecutar.add_command(label="Ejecutar con Cobertura", command=self.commands.get('ejecutar_con_cobertura'))
+        menu_ejecutar.add_separator()
+        menu_ejecutar.add_command(label="Pausar", command=self.commands.get('pausar_reanudar'), accelerator="F6", state="disabled")
+        menu_ejecutar.add_command(label="Detener", command=self.commands.get('detener_ejecucion'), accelerator="Shift+F5", state="disabled")
         menu_ejecutar.add_separator()
         menu_ejecutar.add_command(label="Limpiar Consola", command=self.commands.get('limpiar_consola'))
         self.menubar.add_cascade(label="Ejecutar", menu=menu_ejecutar)
+        self.menu_ejecutar = menu_ejecutar
 
         self.root.bind_all("<F5>", lambda e: self.commands.get('ejecutar_algoritmo')())
-        # self.root.bind_all("<F8>", lambda e: self.commands.get('ejecutar_paso_a_paso')())
+        self.root.bind_all("<Shift-F5>", lambda e: self.commands.get('detener_ejecucion')())
+        self.root.bind_all("<F6>", lambda e: self.commands.get('pausar_reanudar')())
+        self.root.bind_all("<F8>", lambda e: self.commands.get('ejecutar_paso_a_paso')())
+        self.root.bind_all("<Control-F8>", lambda e: self.commands.get('ejecutar_hasta_cursor')())
+        self.root.bind_all("<F9>", lambda e: self.commands.get('alternar_punto_interrupcion')())
+
+    def set_estado_ejecucion(self, en_ejecucion, pausado=False, paso_a_paso=False):
+        """
+        Habilita Detener/Pausar durante una ejecución y Ejecutar cuando no la hay.
+        En paso a paso, Ejecutar pasa a ser Continuar y F8 avanza una sentencia.
+        """
+        estado_ejecutar = "disabled" if en_ejecucion and not paso_a_paso else "normal"
+        estado_control = "normal" if en_ejecucion else "disabled"
+        self.menu_ejecutar.entryconfig(0, state=estado_ejecutar, # Ejecutar Algoritmo / Continuar
+                                       label="Continuar" if paso_a_paso else "Ejecutar Algoritmo")
+        self.menu_ejecutar.entryconfig(1, state=estado_ejecutar, # Paso a Paso / Siguiente Paso
+                                       label="Siguiente Paso" if paso_a_paso else "Ejecutar Paso a Paso")
+        self.menu_ejecutar.entryconfig(2, state=estado_ejecutar) # Ejecutar hasta el Cursor
+        self.menu_ejecutar.entryconfig(4, state="disabled" if en_ejecucion else "normal") # Perfilar Algoritmo
+        self.menu_ejecutar.entryconfig(5, state="disabled" if en_ejecucion else "normal") # Ejecutar con Cobertura
+        self.menu_ejecutar.entryconfig(7, state=estado_control,  # Pausar / Reanudar
+                                       label="Reanudar" if pausado else "Pausar")
+        self.menu_ejecutar.entryconfig(8, state=estado_control)  # Detener
 
 
     def _crear_menu_apariencia(self):
@@ -90,20 +118,23 @@ class AppMenuBar:
     def _crear_menu_ayuda(self):
         menu_ayuda = Menu(self.menubar, tearoff=0)
         
-        # Submenú para ayuda de comandos
-        ayuda_comandos_menu = Menu(menu_ayuda, tearoff=0)
-        # Ordenar comandos para el menú
-        sorted_commands = sorted(COMMAND_TOOLTIPS.keys())
-        for cmd in sorted_commands:
-            tooltip = COMMAND_TOOLTIPS[cmd]
-            # Limitar longitud del tooltip en el menú o usar un diálogo
-            ayuda_comandos_menu.add_command(label=cmd, command=lambda c=cmd, t=tooltip: self._mostrar_ayuda_comando(c, t))
-        
-        menu_ayuda.add_cascade(label="Ayuda de Comandos", menu=ayuda_comandos_menu)
+        # Submenú para ayuda de comandos: se llena la primera vez que se abre, no al iniciar
+        self.ayuda_comandos_menu = Menu(menu_ayuda, tearoff=0, postcommand=self._llenar_ayuda_comandos)
+        menu_ayuda.add_cascade(label="Ayuda de Comandos", menu=self.ayuda_comandos_menu)
         menu_ayuda.add_separator()
         menu_ayuda.add_command(label="Acerca de PseudoCol...", command=self.commands.get('mostrar_acerca_de'))
         self.menubar.add_cascade(label="Ayuda", menu=menu_ayuda)
 
+    def _llenar_ayuda_comandos(self):
+        if self.ayuda_comandos_menu.index("end") is not None: # Ya tiene sus entradas
+            return
+        from core.keywords_col import COMMAND_TOOLTIPS
+        # Ordenar comandos para el menú
+        for cmd in sorted(COMMAND_TOOLTIPS.keys()):
+            tooltip = COMMAND_TOOLTIPS[cmd]
+            # Limitar longitud del tooltip en el menú o usar un diálogo
+            self.ayuda_comandos_menu.add_command(label=cmd, command=lambda c=cmd, t=tooltip: self._mostrar_ayuda_comando(c, t))
+
     def _mostrar_ayuda_comando(self, comando, descripcion):
         """Muestra un messagebox con la ayuda del comando."""
         messagebox.showinfo(f"Ayuda: {comando}", f"Comando: {comando}\n\nDescripción:\n{descripcion}", parent=self.root)
@@ -131,7 +162,13 @@ if __name__ == '__main__':
     def mock_seleccionar_todo(): print("Comando: Seleccionar Todo")
     def mock_ejecutar(): print("Comando: Ejecutar Algoritmo")
     def mock_paso_a_paso(): print("Comando: Ejecutar Paso a Paso")
+    def mock_hasta_cursor(): print("Comando: Ejecutar hasta el Cursor")
+    def mock_punto_interrupcion(): print("Comando: Alternar Punto de Interrupción")
+    def mock_perfilar(): print("Comando: Perfilar Algoritmo")
+    def mock_cobertura(): print("Comando: Ejecutar con Cobertura")
     def mock_limpiar_consola(): print("Comando: Limpiar Consola")
+    def mock_pausar_reanudar(): print("Comando: Pausar/Reanudar")
+    def mock_detener(): print("Comando: Detener Ejecución")
     
     current_theme_mode = ctk.get_appearance_mode().lower()
 
@@ -161,7 +198,10 @@ if __name__ == '__main__':
         'cortar': mock_cortar, 'copiar': mock_copiar, 'pegar': mock_pegar,
         'seleccionar_todo': mock_seleccionar_todo,
         'ejecutar_algoritmo': mock_ejecutar, 'ejecutar_paso_a_paso': mock_paso_a_paso,
+        'ejecutar_hasta_cursor': mock_hasta_cursor, 'alternar_punto_interrupcion': mock_punto_interrupcion,
+        'perfilar_algoritmo': mock_perfilar, 'ejecutar_con_cobertura': mock_cobertura,
         'limpiar_consola': mock_limpiar_consola,
+        'pausar_reanudar': mock_pausar_reanudar, 'detener_ejecucion': mock_detener,
         'set_theme': mock_set_theme,
         'get_current_theme_mode': mock_get_current_theme, # Para inicializar el radio button
         'mostrar_acerca_de': mock_acerca_de,
@@ -0,0 +1,57 @@
+# pseint_colombiano/gui/panel_problemas.py
+"""
+Lista de problemas (errores léxicos y sintácticos) del análisis en segundo
+plano, debajo del editor. Un clic en una fila llama a al_seleccionar con su
+Diagnostico (el editor lleva el cursor a esa posición).
+"""
+import customtkinter as ctk
+
+# Filas visibles antes de necesitar desplazarse
+FILAS_VISIBLES = 4
+
+
+class PanelProblemas(ctk.CTkFrame):
+    def __init__(self, master, al_seleccionar=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.al_seleccionar = al_seleccionar
+        self.diagnosticos = []
+        self.grid_columnconfigure(0, weight=1)
+        self.titulo = ctk.CTkLabel(self, text="Problemas", anchor="w", font=("Arial", 11, "bold"))
+        self.titulo.grid(row=0, column=0, sticky="ew", padx=6)
+        self.lista = ctk.CTkTextbox(self, font=("Consolas", 11), wrap="none", height=FILAS_VISIBLES * 18,
+                                    state="disabled", cursor="hand2")
+        self.lista.grid(row=1, column=0, sticky="ew", padx=2, pady=(0, 2))
+        self.lista.bind("<Button-1>", self._on_click)
+
+    def mostrar(self, diagnosticos):
+        """Reemplaza las filas por `diagnosticos`, ordenados por posición."""
+        self.diagnosticos = sorted(diagnosticos, key=lambda d: (d.linea, d.columna))
+        tipos = {"lexico": "léxico", "sintactico": "sintáctico"}
+        filas = "\n".join(f"{d.linea}:{d.columna}  [{tipos.get(d.tipo, d.tipo)}]  {d.mensaje}"
+                          for d in self.diagnosticos)
+        self.titulo.configure(text=f"Problemas ({len(self.diagnosticos)})")
+        self.lista.configure(state="normal")
+        self.lista.delete("1.0", "end")
+        self.lista.insert("1.0", filas)
+        self.lista.configure(state="disabled")
+
+    def _on_click(self, event):
+        fila = int(self.lista.index(f"@{event.x},{event.y}").split(".")[0]) - 1
+        if self.al_seleccionar is not None and 0 <= fila < len(self.diagnosticos):
+            self.al_seleccionar(self.diagnosticos[fila])
+
+
+if __name__ == '__main__':
+    # Necesita pantalla
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from core.analisis_fondo import analizar_con_diagnosticos
+
+    app = ctk.CTk()
+    app.geometry("600x200")
+    panel = PanelProblemas(app, al_seleccionar=lambda d: print(f"Ir a {d.linea}:{d.columna}"))
+    panel.pack(fill="both", expand=True)
+    resultado = analizar_con_diagnosticos("ALGORITMO A\n    MUESTRE <-\n    x <- \nFINALGORITMO\n")
+    panel.mostrar(resultado.diagnosticos)
+    app.mainloop()
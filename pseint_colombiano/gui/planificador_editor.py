@@ -0,0 +1,185 @@
+# pseint_colombiano/gui/planificador_editor.py
+"""
+Planificador de las actualizaciones del editor después de cada edición.
+
+Los eventos de teclado solo anotan qué líneas cambiaron; cada consumidor
+(números de línea, resaltado, autocompletado...) corre una vez por tick
+ocioso de Tk con la región acumulada desde su última ejecución, sin importar
+cuántas teclas llegaron entretanto. Un consumidor con espera_ms > 0 se
+ejecuta cuando pasan espera_ms sin ediciones nuevas: cada edición cancela la
+ejecución programada y la vuelve a programar.
+
+También mide la latencia de tecla a pintado: desde la primera tecla sin
+atender hasta que Tk terminó de repintar después del tick.
+"""
+import time
+from collections import deque
+
+# Latencias de tecla a pintado que se conservan para los percentiles
+MUESTRAS_LATENCIA = 1000
+
+
+def unir_regiones(a, b):
+    """Une dos regiones (primera, ultima) de líneas; None es todo el documento."""
+    if a is None or b is None:
+        return None
+    return min(a[0], b[0]), max(a[1], b[1])
+
+
+class _Consumidor:
+    __slots__ = ("nombre", "funcion", "espera_ms", "pendiente", "region", "evento", "id_after", "ejecuciones")
+
+    def __init__(self, nombre, funcion, espera_ms):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.espera_ms = espera_ms
+        self.pendiente = False
+        self.region = None
+        self.evento = None # Último evento de teclado recibido (el autocompletado mira la tecla)
+        self.id_after = None
+        self.ejecuciones = 0
+
+
+class PlanificadorEditor:
+    """
+    Reúne las ediciones y ejecuta a cada consumidor registrado como
+    funcion(region, evento), donde region es (primera, ultima) en líneas desde 1,
+    o None si cambió todo el documento.
+    """
+    def __init__(self, widget, muestras=MUESTRAS_LATENCIA):
+        self.widget = widget # Cualquier widget (o tkinter.Tcl()): solo se usan after, after_idle y after_cancel
+        self._consumidores = {}
+        self._tick = None # id de after_idle del próximo tick
+        self._inicio_latencia = None # perf_counter de la primera tecla sin atender
+        self.latencias = deque(maxlen=muestras)
+
+    def registrar(self, nombre, funcion, espera_ms=0):
+        self._consumidores[nombre] = _Consumidor(nombre, funcion, espera_ms)
+
+    def configurar_espera(self, nombre, espera_ms):
+        """Cambia la ventana de espera de un consumidor (0 = en el próximo tick)."""
+        self._consumidores[nombre].espera_ms = espera_ms
+
+    def marcar_tecla(self, event=None):
+        """Al presionar una tecla: empieza a medir la latencia si no hay otra medición en curso."""
+        if self._inicio_latencia is None:
+            self._inicio_latencia = time.perf_counter()
+
+    def notificar(self, region=None, evento=None, solo=None):
+        """
+        Anota una edición en `region` (None = todo) para todos los consumidores,
+        o solo para los nombrados en `solo`.
+        """
+        consumidores = self._consumidores.values() if solo is None else [self._consumidores[n] for n in solo]
+        inmediatos = False
+        for consumidor in consumidores:
+            consumidor.region = region if not consumidor.pendiente else unir_regiones(consumidor.region, region)
+            consumidor.evento = evento
+            consumidor.pendiente = True
+            if consumidor.espera_ms:
+                if consumidor.id_after is not None: # El trabajo programado quedó viejo
+                    self.widget.after_cancel(consumidor.id_after)
+                consumidor.id_after = self.widget.after(consumidor.espera_ms, self._ejecutar, consumidor)
+            else:
+                inmediatos = True
+        if inmediatos and self._tick is None:
+            self._tick = self.widget.after_idle(self._ejecutar_tick)
+
+    def vaciar(self):
+        """Ejecuta ya todo lo pendiente (por ejemplo, después de cargar un archivo)."""
+        if self._tick is not None:
+            self.widget.after_cancel(self._tick)
+            self._tick = None
+        for consumidor in list(self._consumidores.values()):
+            if consumidor.pendiente:
+                self._ejecutar(consumidor)
+
+    def cancelar(self):
+        """Descarta lo pendiente sin ejecutarlo."""
+        if self._tick is not None:
+            self.widget.after_cancel(self._tick)
+            self._tick = None
+        for consumidor in self._consumidores.values():
+            if consumidor.id_after is not None:
+                self.widget.after_cancel(consumidor.id_after)
+                consumidor.id_after = None
+            consumidor.pendiente = False
+        self._inicio_latencia = None
+
+    def _ejecutar_tick(self):
+        self._tick = None
+        for consumidor in list(self._consumidores.values()):
+            if consumidor.pendiente and not consumidor.espera_ms:
+                self._ejecutar(consumidor)
+        inicio, self._inicio_latencia = self._inicio_latencia, None
+        if inicio is not None:
+            # Tk repinta en callbacks ociosos programados antes que este: al correr, ya se pintó
+            self.widget.after_idle(self._registrar_latencia, inicio)
+
+    def _registrar_latencia(self, inicio):
+        self.latencias.append(time.perf_counter() - inicio)
+
+    def _ejecutar(self, consumidor):
+        if consumidor.id_after is not None:
+            self.widget.after_cancel(consumidor.id_after)
+            consumidor.id_after = None
+        region, evento = consumidor.region, consumidor.evento
+        consumidor.pendiente, consumidor.region, consumidor.evento = False, None, None
+        consumidor.ejecuciones += 1
+        consumidor.funcion(region, evento)
+
+    def percentil(self, p):
+        """Latencia de tecla a pintado (segundos) en el percentil p, o None sin muestras."""
+        if not self.latencias:
+            return None
+        ordenadas = sorted(self.latencias)
+        return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))]
+
+    def estadisticas(self):
+        """{"teclas", "p50_ms", "p99_ms", "ejecuciones": {consumidor: n}}"""
+        def ms(valor):
+            return None if valor is None else round(valor * 1000, 2)
+        return {
+            "teclas": len(self.latencias),
+            "p50_ms": ms(self.percentil(50)),
+            "p99_ms": ms(self.percentil(99)),
+            "ejecuciones": {c.nombre: c.ejecuciones for c in self._consumidores.values()},
+        }
+
+
+if __name__ == '__main__':
+    # Escritura rápida simulada (200 teclas, una cada 2 ms, más rápido que el resaltado) sobre un intérprete Tcl sin
+    # pantalla: el consumidor costoso corre una vez por tick y no una por tecla, y el
+    # autocompletado con espera de 120 ms solo cuando se deja de escribir.
+    import tkinter
+
+    tcl = tkinter.Tcl()
+    planificador = PlanificadorEditor(tcl)
+    regiones = []
+
+    def costoso(region, evento):
+        regiones.append(region)
+        fin = time.perf_counter() + 0.004 # Como un resaltado de 4 ms
+        while time.perf_counter() < fin:
+            pass
+
+    planificador.registrar("numeros_linea", lambda region, evento: None)
+    planificador.registrar("resaltado", costoso)
+    planificador.registrar("autocompletado", lambda region, evento: None, espera_ms=120)
+
+    def teclear(numero):
+        planificador.marcar_tecla()
+        linea = 100 + numero // 20 # Cada 20 teclas, otra línea: la región acumulada abarca ambas
+        planificador.notificar((linea, linea), evento=numero)
+
+    # Las teclas llegan a su ritmo aunque el editor esté ocupado (como la repetición del teclado)
+    for numero in range(200):
+        tcl.after(2 * numero, teclear, numero)
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < 1.6:
+        tcl.update()
+    estadisticas = planificador.estadisticas()
+    print(f"200 teclas: {estadisticas['ejecuciones']}")
+    print(f"Latencia de tecla a pintado: p50 {estadisticas['p50_ms']} ms, p99 {estadisticas['p99_ms']} ms "
+          f"({estadisticas['teclas']} mediciones)")
+    print(f"Regiones del resaltado que juntan dos líneas: {[r for r in regiones if r[0] != r[1]]}")
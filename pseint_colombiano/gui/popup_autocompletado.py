@@ -0,0 +1,131 @@
+# pseint_colombiano/gui/popup_autocompletado.py
+"""
+Popup de sugerencias del autocompletado.
+
+La ventana y sus filas se crean una sola vez; mostrar() solo cambia el texto
+de las filas que difieren, muestra u oculta las sobrantes y mueve la ventana.
+ocultar() la retira (withdraw) sin destruirla. El foco se queda en el editor:
+la selección se mueve con mover() y se confirma con elegir().
+"""
+import customtkinter as ctk
+
+# Filas del popup (el índice nunca devuelve más sugerencias que esto)
+MAX_FILAS = 8
+ALTO_FILA = 24
+ANCHO_POPUP = 180
+COLOR_SELECCION = ("#CCE4F7", "#264F78")
+
+
+class PopupAutocompletado:
+    """Llama a al_elegir(texto) cuando se elige una sugerencia (clic o elegir())."""
+    def __init__(self, editor, al_elegir, filas=MAX_FILAS):
+        self.editor = editor
+        self.al_elegir = al_elegir
+        self.ventana = ctk.CTkToplevel(editor)
+        self.ventana.withdraw()
+        self.ventana.overrideredirect(True)
+        self.ventana.attributes("-topmost", True)
+        self.filas = []
+        for indice in range(filas):
+            fila = ctk.CTkButton(self.ventana, text="", anchor="w", fg_color="transparent",
+                                 text_color=("#101010", "#DCE4EE"), hover_color=("#E5E5E5", "#333333"),
+                                 height=ALTO_FILA - 2, corner_radius=3,
+                                 command=lambda i=indice: self._on_clic(i))
+            self.filas.append(fila)
+        self.sugerencias = []
+        self.seleccion = 0
+        self.visible = False
+        self._geometria = None
+
+    def mostrar(self, sugerencias, x, y):
+        """Muestra `sugerencias` con la esquina superior izquierda en (x, y) de la pantalla."""
+        anteriores = len(self.sugerencias)
+        for indice, fila in enumerate(self.filas):
+            if indice < len(sugerencias):
+                if indice >= anteriores or self.sugerencias[indice] != sugerencias[indice]:
+                    fila.configure(text=sugerencias[indice])
+                if indice >= anteriores: # Las filas se empacan en orden: las nuevas van al final
+                    fila.pack(fill="x", padx=2, pady=1)
+            elif indice < anteriores:
+                fila.pack_forget()
+        self.sugerencias = list(sugerencias[:len(self.filas)])
+        self._marcar(0)
+        geometria = f"{ANCHO_POPUP}x{len(self.sugerencias) * ALTO_FILA + 4}+{x}+{y}"
+        if geometria != self._geometria:
+            self._geometria = geometria
+            self.ventana.geometry(geometria)
+        if not self.visible:
+            self.visible = True
+            self.ventana.deiconify()
+            self.ventana.lift()
+
+    def ocultar(self):
+        if self.visible:
+            self.visible = False
+            self.ventana.withdraw()
+
+    def mover(self, paso):
+        """Mueve la selección `paso` filas (con vuelta al otro extremo)."""
+        if self.sugerencias:
+            self._marcar((self.seleccion + paso) % len(self.sugerencias))
+
+    def elegir(self):
+        """Confirma la sugerencia seleccionada. Devuelve False si no había ninguna."""
+        if not self.visible or not self.sugerencias:
+            return False
+        self.al_elegir(self.sugerencias[self.seleccion])
+        return True
+
+    def contiene(self, widget):
+        return widget is not None and str(widget).startswith(str(self.ventana))
+
+    def _marcar(self, indice):
+        if self.seleccion < len(self.filas):
+            self.filas[self.seleccion].configure(fg_color="transparent")
+        self.seleccion = indice
+        if self.sugerencias:
+            self.filas[indice].configure(fg_color=COLOR_SELECCION)
+
+    def _on_clic(self, indice):
+        self._marcar(indice)
+        self.elegir()
+
+
+if __name__ == '__main__':
+    # Mostrar el popup 500 veces con listas distintas: reusar las filas frente a reconstruir la ventana
+    # y sus botones como antes. Necesita pantalla.
+    import time
+
+    app = ctk.CTk()
+    app.geometry("400x300+100+100")
+    app.update()
+    popup = PopupAutocompletado(app, al_elegir=lambda texto: print(f"Elegida: {texto}"))
+    palabras = [f"palabra{i}" for i in range(40)]
+
+    def medir(mostrar):
+        tiempos = []
+        for i in range(500):
+            inicio = time.perf_counter()
+            mostrar(palabras[i % 30:i % 30 + 1 + i % MAX_FILAS])
+            app.update_idletasks()
+            tiempos.append(time.perf_counter() - inicio)
+        tiempos.sort()
+        return tiempos[len(tiempos) // 2] * 1000, tiempos[int(len(tiempos) * 0.99)] * 1000
+
+    reusado = medir(lambda sugerencias: popup.mostrar(sugerencias, 150, 150))
+    popup.ocultar()
+    anterior = [None]
+    def reconstruir(sugerencias):
+        if anterior[0] is not None:
+            anterior[0].destroy()
+        ventana = anterior[0] = ctk.CTkToplevel(app)
+        ventana.overrideredirect(True)
+        ventana.geometry(f"{ANCHO_POPUP}x{len(sugerencias) * 28 + 4}+150+150")
+        for texto in sugerencias:
+            ctk.CTkButton(ventana, text=texto, anchor="w", fg_color="transparent", height=24).pack(fill="x")
+    reconstruido = medir(reconstruir)
+    anterior[0].destroy()
+    print(f"Popup reutilizado: p50 {reusado[0]:.2f} ms, p99 {reusado[1]:.2f} ms")
+    print(f"Popup reconstruido: p50 {reconstruido[0]:.2f} ms, p99 {reconstruido[1]:.2f} ms")
+    popup.mostrar(palabras[:5], 150, 150)
+    app.mainloop()
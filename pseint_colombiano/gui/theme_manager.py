@@ -32,6 +32,8 @@ class ThemeManager:
         # Notificar a los componentes que necesiten actualizarse (ej. resaltador)
         if hasattr(self.app, 'editor_frame') and hasattr(self.app.editor_frame, 'highlighter'):
             self.app.editor_frame.highlighter.update_highlighting_for_theme(self.current_theme)
+        if hasattr(self.app, 'editor_frame') and hasattr(self.app.editor_frame, 'margen'):
+            self.app.editor_frame.margen.configurar_tema(self.current_theme)
         
         # TODO: Actualizar otros elementos de la GUI que no se actualizan automáticamente
         # con customtkinter (si los hubiera).
@@ -1,18 +1,35 @@
 # pseint_colombiano/main.py
 """
 Punto de entrada principal para la aplicación PseudoCol.
+
+    python main.py                          abre la aplicación
+    python main.py --medir-inicio           abre, imprime los tiempos de arranque (JSON) y se cierra
+    python main.py --benchmark-inicio [N]   N arranques en procesos nuevos: mediana de cada tiempo
+
+customtkinter y la ventana se importan dentro de main(), para que su costo
+quede en "importacion"; el detalle por módulo sale con
+python -X importtime main.py --medir-inicio.
 """
-import customtkinter as ctk
-from gui.main_window import MainWindow # Asegúrate que la ruta sea correcta
+import sys
+import time
 
-# Configuración inicial de CustomTkinter (opcional, pero bueno tenerla)
-ctk.set_appearance_mode("System")  # Opciones: "System", "Dark", "Light"
-ctk.set_default_color_theme("blue") # Opciones: "blue", "green", "dark-blue"
+INICIO = time.perf_counter()
 
-def main():
+def main(medir_inicio=False):
     """Función principal para iniciar la aplicación."""
     try:
-        app = MainWindow()
+        import customtkinter as ctk
+        from gui.main_window import MainWindow # Asegúrate que la ruta sea correcta
+        importacion = time.perf_counter() - INICIO
+
+        # Configuración inicial de CustomTkinter (opcional, pero bueno tenerla)
+        ctk.set_appearance_mode("System")  # Opciones: "System", "Dark", "Light"
+        ctk.set_default_color_theme("blue") # Opciones: "blue", "green", "dark-blue"
+
+        app = MainWindow(inicio=INICIO, recuperar=not medir_inicio)
+        app.tiempos_inicio["importacion"] = importacion
+        if medir_inicio:
+            _reportar_inicio(app)
         app.mainloop()
     except ImportError as e:
         print(f"Error de importación: {e}")
@@ -22,5 +39,38 @@ def main():
         print(f"Ocurrió un error inesperado al iniciar la aplicación: {e}")
         # En una aplicación real, podrías registrar este error en un archivo.
 
+def _reportar_inicio(app):
+    """Cuando termina lo diferido, imprime los tiempos de arranque y cierra la ventana."""
+    import json
+    if "listo" not in app.tiempos_inicio:
+        app.after(20, _reportar_inicio, app)
+        return
+    tiempos = dict(app.tiempos_inicio)
+    # Hora de reloj del primer cuadro, para que benchmark_inicio sume el arranque del intérprete
+    tiempos["reloj_primer_cuadro"] = time.time() - (time.perf_counter() - INICIO - tiempos["primer_cuadro"])
+    print(json.dumps(tiempos))
+    app.destroy()
+
+def benchmark_inicio(repeticiones=5):
+    """Arranques en procesos nuevos; "proceso_a_primer_cuadro" incluye el arranque de Python."""
+    import json
+    import statistics
+    import subprocess
+    muestras = []
+    for _ in range(repeticiones):
+        lanzado = time.time()
+        salida = subprocess.run([sys.executable, __file__, "--medir-inicio"],
+                                capture_output=True, text=True, check=True).stdout
+        tiempos = json.loads(salida.strip().splitlines()[-1])
+        tiempos["proceso_a_primer_cuadro"] = tiempos.pop("reloj_primer_cuadro") - lanzado
+        muestras.append(tiempos)
+    print(f"Mediana de {repeticiones} arranques:")
+    for clave in ("importacion", "ventana", "primer_cuadro", "listo", "proceso_a_primer_cuadro"):
+        print(f"{clave:>24}: {statistics.median(m[clave] for m in muestras) * 1000:7.1f} ms")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if "--benchmark-inicio" in sys.argv:
+        indice = sys.argv.index("--benchmark-inicio")
+        benchmark_inicio(int(sys.argv[indice + 1]) if len(sys.argv) > indice + 1 else 5)
+    else:
+        main(medir_inicio="--medir-inicio" in sys.argv)
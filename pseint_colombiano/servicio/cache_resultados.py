@@ -0,0 +1,258 @@
+# pseint_colombiano/servicio/cache_resultados.py
+"""
+Caché en disco de resultados de ejecuciones deterministas, para no repetir
+recalificaciones ni entregas duplicadas.
+
+Clave: sha256 de (huella del AST sin posiciones, hash de la cinta de entrada,
+VERSION_MOTOR, límites). Valor: la transcripción de la salida y el resultado
+(estado, errores, límite), más el tiempo que costó producirlos.
+
+Almacén: SQLite en modo WAL, seguro para varios procesos trabajadores a la vez
+(cada proceso abre su propia conexión). El tamaño total está acotado; al
+superarlo se descartan las entradas usadas hace más tiempo (LRU). Un error del
+caché nunca hace fallar una ejecución: se trata como un fallo de caché. Si el
+almacén no se puede abrir, abrir_cache() devuelve None y se ejecuta sin caché;
+una entrada dañada se borra y cuenta como fallo.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+
+from ..core.reproduccion import VERSION_MOTOR
+
+# Tamaño máximo por defecto del almacén (transcripciones comprimidas y metadatos)
+MAX_BYTES_POR_DEFECTO = 256 * 1024 * 1024
+# Transcripciones más largas no se guardan (la salida se sigue comparando igual)
+MAX_CARACTERES_TRANSCRIPCION = 1024 * 1024
+# Bytes que se suman a cada entrada por clave, índices y columnas fijas
+_COSTO_FIJO_ENTRADA = 256
+# Entradas que se revisan por consulta al desalojar
+_LOTE_DESALOJO = 64
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    clave TEXT PRIMARY KEY,
+    estado TEXT NOT NULL,
+    errores TEXT NOT NULL,
+    limite TEXT,
+    transcripcion BLOB NOT NULL,
+    lineas INTEGER NOT NULL,
+    tiempo_s REAL NOT NULL,
+    tamano INTEGER NOT NULL,
+    ultimo_uso REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resultados_por_uso ON resultados (ultimo_uso);
+CREATE TABLE IF NOT EXISTS meta (nombre TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('tamano_total', 0);
+"""
+
+
+def hash_archivo(ruta):
+    """sha256 (hex) del contenido de un archivo; el de una cinta vacía si ruta es None."""
+    h = hashlib.sha256()
+    if ruta is not None:
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 16), b""):
+                h.update(bloque)
+    return h.hexdigest()
+
+
+def clave_resultado(huella_programa, hash_entrada, limites=None):
+    """Clave de caché de una ejecución."""
+    configuracion = "" if limites is None else f"{limites.max_pasos}|{limites.tiempo_maximo}|{limites.max_memoria}"
+    texto = "\0".join((VERSION_MOTOR, huella_programa, hash_entrada, configuracion))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class ResultadoCacheado:
+    """Lo guardado de una ejecución."""
+    __slots__ = ("estado", "errores", "limite", "lineas", "tiempo_s")
+
+    def __init__(self, estado, errores, limite, lineas, tiempo_s):
+        self.estado = estado
+        self.errores = errores
+        self.limite = limite
+        self.lineas = lineas # Líneas de salida, en el orden en que se emitieron
+        self.tiempo_s = tiempo_s # Lo que costó ejecutarlo (tiempo que ahorra cada acierto)
+
+    def __repr__(self):
+        return f"ResultadoCacheado(estado='{self.estado}', lineas={len(self.lineas)}, tiempo_s={self.tiempo_s:.4f})"
+
+
+class DestinoTranscripcion:
+    """Reenvía la salida a otro destino y guarda una copia (hasta max_caracteres) para el caché."""
+    def __init__(self, destino, max_caracteres=MAX_CARACTERES_TRANSCRIPCION):
+        self.destino = destino
+        self.max_caracteres = max_caracteres
+        self.lineas = []
+        self.caracteres = 0
+        self.excedida = False
+
+    def escribir_lineas(self, lineas):
+        if not self.excedida:
+            self.caracteres += sum(len(linea) + 1 for linea in lineas)
+            if self.caracteres > self.max_caracteres:
+                self.excedida = True
+                self.lineas = []
+            else:
+                self.lineas.extend(lineas)
+        self.destino.escribir_lineas(lineas)
+
+    def cerrar(self):
+        self.destino.cerrar()
+
+
+class CacheResultados:
+    """Almacén LRU acotado de resultados. Una instancia por proceso."""
+    def __init__(self, ruta, max_bytes=MAX_BYTES_POR_DEFECTO):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        # Autocommit: las transacciones se abren explícitamente en guardar()
+        self._conexion = sqlite3.connect(ruta, timeout=30.0, isolation_level=None)
+        try:
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute("PRAGMA synchronous=NORMAL") # Se puede perder lo último ante un corte: es un caché
+            self._conexion.executescript(_ESQUEMA)
+        except BaseException: # Ej. el archivo existe pero no es una base SQLite
+            self._conexion.close()
+            raise
+
+    def obtener(self, clave):
+        """ResultadoCacheado o None. Un acierto actualiza la fecha de último uso."""
+        try:
+            fila = self._conexion.execute(
+                "SELECT estado, errores, limite, transcripcion, lineas, tiempo_s FROM resultados WHERE clave = ?",
+                (clave,)).fetchone()
+            if fila is None:
+                return None
+            self._conexion.execute("UPDATE resultados SET ultimo_uso = ? WHERE clave = ?", (time.time(), clave))
+        except sqlite3.Error:
+            return None
+        estado, errores, limite, transcripcion, cantidad, tiempo_s = fila
+        try:
+            lineas = zlib.decompress(transcripcion).decode("utf-8").split("\n") if cantidad else []
+            errores = json.loads(errores)
+        except (zlib.error, UnicodeDecodeError, ValueError, TypeError):
+            self._descartar(clave) # Dañada: se vuelve a ejecutar y se guarda de nuevo
+            return None
+        return ResultadoCacheado(estado, errores, limite, lineas, tiempo_s)
+
+    def _descartar(self, clave):
+        """Borra una entrada y descuenta su tamaño del total. Los errores se ignoran."""
+        conexion = self._conexion
+        try:
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                fila = conexion.execute("SELECT tamano FROM resultados WHERE clave = ?", (clave,)).fetchone()
+                if fila is not None:
+                    conexion.execute("DELETE FROM resultados WHERE clave = ?", (clave,))
+                    conexion.execute("UPDATE meta SET valor = valor - ? WHERE nombre = 'tamano_total'", fila)
+                conexion.execute("COMMIT")
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            pass
+
+    def guardar(self, clave, estado, errores, limite, lineas, tiempo_s):
+        """Guarda un resultado y desaloja los menos usados si hace falta. Devuelve True si quedó guardado."""
+        transcripcion = zlib.compress("\n".join(lineas).encode("utf-8"))
+        errores = json.dumps(errores, ensure_ascii=False)
+        tamano = len(transcripcion) + len(errores) + _COSTO_FIJO_ENTRADA
+        if tamano > self.max_bytes:
+            return False
+        conexion = self._conexion
+        try:
+            conexion.execute("BEGIN IMMEDIATE") # Un solo escritor a la vez entre todos los procesos
+            try:
+                anterior = conexion.execute("SELECT tamano FROM resultados WHERE clave = ?", (clave,)).fetchone()
+                conexion.execute("INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 (clave, estado, errores, limite, transcripcion, len(lineas), tiempo_s,
+                                  tamano, time.time()))
+                (total,) = conexion.execute("SELECT valor FROM meta WHERE nombre = 'tamano_total'").fetchone()
+                total += tamano - (anterior[0] if anterior else 0)
+                total = self._desalojar(total, clave)
+                conexion.execute("UPDATE meta SET valor = ? WHERE nombre = 'tamano_total'", (total,))
+                conexion.execute("COMMIT")
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _desalojar(self, total, protegida):
+        """Borra las entradas usadas hace más tiempo hasta que total <= max_bytes. Devuelve el nuevo total."""
+        conexion = self._conexion
+        while total > self.max_bytes:
+            filas = conexion.execute("SELECT clave, tamano FROM resultados WHERE clave != ? "
+                                     "ORDER BY ultimo_uso LIMIT ?", (protegida, _LOTE_DESALOJO)).fetchall()
+            if not filas:
+                break
+            borradas = []
+            for clave, tamano in filas:
+                if total <= self.max_bytes:
+                    break
+                borradas.append((clave,))
+                total -= tamano
+            conexion.executemany("DELETE FROM resultados WHERE clave = ?", borradas)
+        return total
+
+    def estadisticas(self):
+        """{"entradas": n, "bytes": total} del almacén."""
+        (entradas,) = self._conexion.execute("SELECT COUNT(*) FROM resultados").fetchone()
+        (total,) = self._conexion.execute("SELECT valor FROM meta WHERE nombre = 'tamano_total'").fetchone()
+        return {"entradas": entradas, "bytes": total}
+
+    def cerrar(self):
+        self._conexion.close()
+
+
+# Un almacén por proceso, ruta y tope (los trabajadores del calificador lo reutilizan entre tareas).
+# None recuerda que no se pudo abrir, para no reintentarlo en cada tarea.
+_abiertos = {}
+
+
+def abrir_cache(ruta, max_bytes=MAX_BYTES_POR_DEFECTO):
+    """El almacén de `ruta`, o None si no se puede abrir (directorio inexistente, archivo dañado...)."""
+    if (ruta, max_bytes) not in _abiertos:
+        try:
+            _abiertos[(ruta, max_bytes)] = CacheResultados(ruta, max_bytes)
+        except (sqlite3.Error, OSError):
+            _abiertos[(ruta, max_bytes)] = None
+    return _abiertos[(ruta, max_bytes)]
+
+
+def _escribir_prueba(argumentos):
+    """Trabajador de la prueba de concurrencia (de nivel de módulo para poder enviarse al pool)."""
+    ruta, proceso = argumentos
+    cache = abrir_cache(ruta, max_bytes=200_000)
+    guardados = 0
+    for i in range(300):
+        guardados += cache.guardar(f"p{proceso}-{i}", "ok", [], None, [f"línea {i} del proceso {proceso}"] * 50, 0.001)
+        if i % 10 == 0:
+            cache.obtener(f"p{proceso}-0") # Se mantiene reciente: no debe desalojarse
+    return guardados
+
+
+if __name__ == '__main__':
+    # Desalojo LRU con un tope pequeño y escrituras concurrentes desde varios procesos.
+    import os
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "resultados.sqlite")
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            inicio = time.perf_counter()
+            guardados = sum(pool.map(_escribir_prueba, [(ruta, p) for p in range(4)]))
+            duracion = time.perf_counter() - inicio
+        cache = CacheResultados(ruta, max_bytes=200_000)
+        estadisticas = cache.estadisticas()
+        (suma,) = cache._conexion.execute("SELECT SUM(tamano) FROM resultados").fetchone()
+        print(f"{guardados} escrituras de 4 procesos en {duracion:.2f} s; quedan {estadisticas['entradas']} "
+              f"entradas, {estadisticas['bytes']} bytes (tope 200000, suma real {suma})")
+        print(f"Recientes conservadas: {[cache.obtener(f'p{p}-0') is not None for p in range(4)]}; "
+              f"antigua desalojada: {cache.obtener('p0-1') is None}")
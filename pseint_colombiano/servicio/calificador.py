@@ -0,0 +1,407 @@
+# pseint_colombiano/servicio/calificador.py
+"""
+Calificador por lotes: N programas x M casos de prueba sobre un pool de procesos.
+Cada programa se analiza una sola vez; los casos se ejecutan en paralelo con un
+tiempo límite por ejecución y la salida se compara en streaming contra la
+esperada. Los resultados se escriben como JSON lines a medida que terminan
+(en orden de llegada, no de envío: cada línea dice su programa y su caso).
+
+Casos de prueba: un directorio con pares <nombre>.in (datos para LEA) y
+<nombre>.out (salida esperada). Un caso sin .in se ejecuta sin entrada.
+
+El intérprete corta por tiempo en cada frontera de sentencia. Una sola sentencia
+que no termina no llega a ninguna: para eso cada caso tiene además un plazo duro
+(SIGALRM, solo en POSIX) de tiempo_limite + MARGEN_PLAZO_DURO, que se informa
+igual que el límite de tiempo del intérprete.
+
+Con cobertura=True cada trabajador devuelve los mapas de cobertura del caso
+(core/cobertura.py); el proceso principal los fusiona por programa y elige
+el subconjunto de casos que cubre lo mismo que todos.
+
+Con un caché de resultados (servicio/cache_resultados.py), un caso cuyo
+programa y entrada ya se ejecutaron no se vuelve a ejecutar: su transcripción
+guardada se compara contra la salida esperada actual. Los programas no
+deterministas y las ejecuciones con cobertura no usan el caché.
+"""
+import glob
+import json
+import os
+import pickle
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ..core.cobertura import Cobertura, MapaCobertura, seleccionar_casos
+from ..core.ejecutor import analizar, ejecutar_ast, LectorEntrada, ESTADO_OK, ESTADO_LIMITE_EXCEDIDO
+from ..core.limites import LimitesEjecucion
+from ..core.reproduccion import huella_ast, es_determinista
+from ..core.salida import SalidaBuffer, DestinoComparador
+from .cache_resultados import (abrir_cache, clave_resultado, hash_archivo, DestinoTranscripcion,
+                               MAX_BYTES_POR_DEFECTO)
+
+EXTENSION_PROGRAMA = ".pseudocol"
+
+# Estados de un resultado (además de los de core/ejecutor.py)
+ESTADO_CORRECTO = "correcto"
+ESTADO_INCORRECTO = "incorrecto"
+ESTADO_TIEMPO_AGOTADO = "tiempo_agotado"
+
+# Segundos más allá del tiempo límite antes de cortar un caso desde afuera del intérprete
+MARGEN_PLAZO_DURO = 1.0
+
+# Uso del caché de resultados en un caso
+CACHE_ACIERTO = "acierto"
+CACHE_FALLO = "fallo"
+
+
+class _PlazoDuroVencido(BaseException):
+    """Lo lanza SIGALRM. No hereda de Exception: el `except Exception` del intérprete no lo atrapa."""
+
+
+def _vencer_plazo_duro(signum, frame):
+    raise _PlazoDuroVencido()
+
+
+def _armar_plazo_duro(limites):
+    """Programa SIGALRM para el caso; devuelve False si no se puede (sin límite, Windows u otro hilo)."""
+    if limites.tiempo_maximo is None or not hasattr(signal, "setitimer") or \
+       threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signal.SIGALRM, _vencer_plazo_duro)
+    signal.setitimer(signal.ITIMER_REAL, limites.tiempo_maximo + MARGEN_PLAZO_DURO)
+    return True
+
+
+def buscar_casos(directorio_casos):
+    """Devuelve [(nombre, ruta_entrada o None, ruta_esperada)] ordenado por nombre."""
+    casos = []
+    for ruta_esperada in sorted(glob.glob(os.path.join(directorio_casos, "*.out"))):
+        base = ruta_esperada[:-len(".out")]
+        ruta_entrada = base + ".in"
+        casos.append((os.path.basename(base), ruta_entrada if os.path.exists(ruta_entrada) else None,
+                      ruta_esperada))
+    return casos
+
+
+def _analizar_programa(ruta):
+    """
+    Analiza un programa en el trabajador.
+    Devuelve (nombre, ast_serializado, resultado_de_error, determinista); el AST viaja con su huella.
+    """
+    nombre = os.path.basename(ruta)
+    with open(ruta, "r", encoding="utf-8") as f:
+        ast, errores_lexicos, errores_sintacticos = analizar(f.read())
+    if errores_lexicos or errores_sintacticos or ast is None:
+        estado = "error_lexico" if errores_lexicos else "error_sintactico"
+        mensajes = errores_lexicos or errores_sintacticos or ["No se pudo construir el AST."]
+        return nombre, None, {"programa": nombre, "caso": None, "estado": estado,
+                              "detalle": mensajes[0], "tiempo_s": 0.0}, False
+    huella_ast(ast) # Queda en ast.huella: los trabajadores no la recalculan
+    return nombre, pickle.dumps(ast, protocol=pickle.HIGHEST_PROTOCOL), None, es_determinista(ast)
+
+
+def _clasificar(estado, errores, limite, comparador):
+    """(estado del caso, detalle) a partir del resultado de la ejecución y la comparación de la salida."""
+    if estado == ESTADO_LIMITE_EXCEDIDO and limite == "tiempo":
+        return ESTADO_TIEMPO_AGOTADO, errores[0]
+    if estado != ESTADO_OK:
+        return estado, errores[0]
+    if comparador.coincide:
+        return ESTADO_CORRECTO, None
+    return ESTADO_INCORRECTO, comparador.primera_diferencia
+
+
+def _caso_desde_cache(almacen, clave, programa, caso, ruta_esperada, inicio):
+    """Resultado del caso a partir del caché, o None si no está."""
+    guardado = almacen.obtener(clave)
+    if guardado is None:
+        return None
+    comparador = DestinoComparador(ruta_esperada)
+    try:
+        if guardado.lineas:
+            comparador.escribir_lineas(guardado.lineas)
+        comparador.cerrar()
+        estado, detalle = _clasificar(guardado.estado, guardado.errores, guardado.limite, comparador)
+    finally:
+        comparador.cerrar()
+    return {
+        "programa": programa,
+        "caso": caso,
+        "estado": estado,
+        "detalle": detalle,
+        "tiempo_s": round(time.perf_counter() - inicio, 6),
+        "cache": CACHE_ACIERTO,
+        "cpu_ahorrado_s": round(guardado.tiempo_s, 6),
+    }
+
+
+def _ejecutar_caso(tarea):
+    """
+    Ejecuta un caso en el proceso trabajador. Debe ser de nivel de módulo para
+    poder enviarse al ProcessPoolExecutor.
+    """
+    programa, ast_serializado, caso, ruta_entrada, ruta_esperada, limites, medir_cobertura, cache = tarea
+    inicio = time.perf_counter()
+    almacen = clave = None
+    if cache is not None:
+        ruta_cache, max_bytes, huella = cache
+        almacen = abrir_cache(ruta_cache, max_bytes) # None: no se pudo abrir, se ejecuta sin caché
+        if almacen is not None:
+            clave = clave_resultado(huella, hash_archivo(ruta_entrada), limites)
+            resultado = _caso_desde_cache(almacen, clave, programa, caso, ruta_esperada, inicio)
+            if resultado is not None:
+                return resultado
+
+    ast = pickle.loads(ast_serializado)
+    cobertura = Cobertura.para(ast) if medir_cobertura else None
+    comparador = DestinoComparador(ruta_esperada)
+    transcripcion = DestinoTranscripcion(comparador) if almacen is not None else None
+    salida = SalidaBuffer(transcripcion or comparador)
+    entrada = open(ruta_entrada, "r", encoding="utf-8") if ruta_entrada else open(os.devnull, "r")
+    inicio_ejecucion = time.perf_counter()
+    try:
+        # El intérprete aplica los límites (tiempo de reloj, pasos, memoria) por sí mismo;
+        # el plazo duro solo corta lo que queda atrapado dentro de una sentencia
+        plazo_duro = _armar_plazo_duro(limites)
+        try:
+            try:
+                resultado = ejecutar_ast(ast, LectorEntrada(entrada), salida, limites, cobertura=cobertura)
+            finally:
+                if plazo_duro:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+            estado_ejecucion, errores, limite = resultado.estado, resultado.errores, resultado.limite
+        except _PlazoDuroVencido:
+            estado_ejecucion, limite = ESTADO_LIMITE_EXCEDIDO, "tiempo"
+            errores = [f"Límite de tiempo excedido ({limites.tiempo_maximo} s); "
+                       "detenido a la fuerza dentro de una sentencia."]
+        salida.cerrar()
+        estado, detalle = _clasificar(estado_ejecucion, errores, limite, comparador)
+    finally:
+        entrada.close()
+        comparador.cerrar()
+    fin = time.perf_counter()
+    caso_resultado = {
+        "programa": programa,
+        "caso": caso,
+        "estado": estado,
+        "detalle": detalle,
+        "tiempo_s": round(fin - inicio, 6),
+    }
+    if almacen is not None:
+        caso_resultado["cache"] = CACHE_FALLO
+        # Agotar el tiempo depende de la máquina y de la carga: ese resultado no se guarda
+        if estado != ESTADO_TIEMPO_AGOTADO and not transcripcion.excedida:
+            almacen.guardar(clave, estado_ejecucion, errores, limite,
+                            transcripcion.lineas, fin - inicio_ejecucion)
+    if cobertura is not None:
+        caso_resultado["cobertura"] = cobertura # El proceso principal lo reemplaza por su resumen
+    return caso_resultado
+
+
+def _ejecutar_lote(tareas):
+    """Varios casos por envío al pool, para amortizar el costo de IPC por ejecución."""
+    return [_ejecutar_caso(tarea) for tarea in tareas]
+
+
+class Calificador:
+    """Coordina el análisis de los programas y la ejecución paralela de los casos."""
+    def __init__(self, procesos=None, tiempo_limite=5.0, max_pasos=None, max_memoria=None, cobertura=False,
+                 cache=None, cache_max_bytes=MAX_BYTES_POR_DEFECTO):
+        self.procesos = procesos or os.cpu_count() or 1
+        self.limites = LimitesEjecucion(max_pasos=max_pasos, tiempo_maximo=tiempo_limite,
+                                        max_memoria=max_memoria)
+        self.medir_cobertura = cobertura
+        self.ruta_cache = cache # Archivo SQLite del caché de resultados (None = sin caché)
+        self.cache_max_bytes = cache_max_bytes
+        self.resumen = {}
+        self.cobertura = {} # programa -> reporte de cobertura fusionado (si medir_cobertura)
+
+    def _analizar_programas(self, pool, directorio_programas):
+        """
+        Analiza cada programa una vez (en paralelo).
+        Devuelve ({programa: ast_serializado}, [resultados de error], {programa: huella si es determinista}).
+        """
+        programas, errores, deterministas = {}, [], {}
+        rutas = sorted(glob.glob(os.path.join(directorio_programas, "*" + EXTENSION_PROGRAMA)))
+        for nombre, ast_serializado, error, determinista in pool.map(_analizar_programa, rutas):
+            if error is not None:
+                errores.append(error)
+            else:
+                programas[nombre] = ast_serializado
+                if determinista:
+                    deterministas[nombre] = pickle.loads(ast_serializado).huella
+        return programas, errores, deterministas
+
+    def calificar(self, directorio_programas, directorio_casos, flujo_resultados):
+        """
+        Califica todos los programas contra todos los casos y escribe un JSON por línea
+        en `flujo_resultados`. Devuelve el resumen (también queda en self.resumen).
+        """
+        inicio = time.perf_counter()
+        casos = buscar_casos(directorio_casos)
+        conteo = {}
+        mapas, coberturas = {}, {} # programa -> MapaCobertura / {caso: Cobertura}
+        uso_cache = {CACHE_ACIERTO: 0, CACHE_FALLO: 0}
+        cpu_ahorrado = 0.0
+
+        def registrar(resultado):
+            nonlocal cpu_ahorrado
+            conteo[resultado["estado"]] = conteo.get(resultado["estado"], 0) + 1
+            if "cache" in resultado:
+                uso_cache[resultado["cache"]] += 1
+                cpu_ahorrado += resultado.get("cpu_ahorrado_s", 0.0)
+            cobertura = resultado.get("cobertura")
+            if cobertura is not None:
+                programa = resultado["programa"]
+                coberturas.setdefault(programa, {})[resultado["caso"]] = cobertura
+                mapa = mapas[programa]
+                reporte = mapa.reporte(cobertura)
+                resultado["cobertura"] = {
+                    "lineas_pct": reporte["lineas"]["porcentaje"],
+                    "ramas_pct": reporte["ramas"]["porcentaje"],
+                    "ramas_tomadas": [f"{linea}:{rama}" for linea, rama in mapa.ramas_tomadas(cobertura)],
+                }
+            flujo_resultados.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+        tiempo_cpu = 0.0
+        with ProcessPoolExecutor(max_workers=self.procesos) as pool:
+            programas, resultados_error, deterministas = self._analizar_programas(pool, directorio_programas)
+            for resultado in resultados_error:
+                registrar(resultado)
+            if self.medir_cobertura:
+                mapas = {programa: MapaCobertura(pickle.loads(ast)) for programa, ast in programas.items()}
+            fin_analisis = time.perf_counter()
+
+            usar_cache = self.ruta_cache is not None and not self.medir_cobertura
+            tareas = [(programa, ast, caso, entrada, esperada, self.limites, self.medir_cobertura,
+                       (self.ruta_cache, self.cache_max_bytes, deterministas[programa])
+                       if usar_cache and programa in deterministas else None)
+                      for programa, ast in programas.items()
+                      for caso, entrada, esperada in casos]
+            # Lotes pequeños frente al total: el primero que termina se escribe primero,
+            # sin esperar a los lotes enviados antes que él
+            tamano_lote = max(1, len(tareas) // (self.procesos * 8))
+            lotes = [pool.submit(_ejecutar_lote, tareas[i:i + tamano_lote])
+                     for i in range(0, len(tareas), tamano_lote)]
+            for lote in as_completed(lotes):
+                for resultado in lote.result():
+                    tiempo_cpu += resultado["tiempo_s"]
+                    registrar(resultado)
+        flujo_resultados.flush()
+        self.cobertura = {programa: self._reporte_cobertura(mapas[programa], por_caso)
+                          for programa, por_caso in sorted(coberturas.items())}
+
+        fin = time.perf_counter()
+        self.resumen = {
+            "programas": len(programas) + len(resultados_error),
+            "casos": len(casos),
+            "ejecuciones": len(tareas),
+            "estados": conteo,
+            "tiempo_analisis_s": round(fin_analisis - inicio, 3),
+            "tiempo_ejecucion_s": round(fin - fin_analisis, 3),
+            "tiempo_cpu_casos_s": round(tiempo_cpu, 3),
+        }
+        if self.ruta_cache is not None:
+            consultas = uso_cache[CACHE_ACIERTO] + uso_cache[CACHE_FALLO]
+            self.resumen["cache"] = {
+                "aciertos": uso_cache[CACHE_ACIERTO],
+                "fallos": uso_cache[CACHE_FALLO],
+                "omitidas": len(tareas) - consultas, # No deterministas, con cobertura o sin almacén
+                "tasa_aciertos": round(uso_cache[CACHE_ACIERTO] / consultas, 3) if consultas else 0.0,
+                "cpu_ahorrado_s": round(cpu_ahorrado, 3),
+            }
+        if self.cobertura:
+            reportes = self.cobertura.values()
+            self.resumen["cobertura"] = {
+                "lineas_pct_media": round(sum(r["lineas"]["porcentaje"] for r in reportes) / len(reportes), 1),
+                "ramas_pct_media": round(sum(r["ramas"]["porcentaje"] for r in reportes) / len(reportes), 1),
+            }
+        return self.resumen
+
+    @staticmethod
+    def _reporte_cobertura(mapa, por_caso):
+        """Cobertura fusionada de todos los casos de un programa y los casos que bastan para lograrla."""
+        total = Cobertura(mapa.cantidad)
+        for cobertura in por_caso.values():
+            total.fusionar(cobertura)
+        reporte = mapa.reporte(total)
+        reporte["casos_seleccionados"] = seleccionar_casos(por_caso)
+        return reporte
+
+
+def generar_corpus_sintetico(directorio, num_programas=16, num_casos=16, sentencias=200):
+    """Crea programas y casos de prueba artificiales para el benchmark."""
+    dir_programas = os.path.join(directorio, "programas")
+    dir_casos = os.path.join(directorio, "casos")
+    os.makedirs(dir_programas, exist_ok=True)
+    os.makedirs(dir_casos, exist_ok=True)
+
+    cuerpo = ["    DEFINA a, b, c COMO ENTERO", "    DEFINA s COMO TEXTO", "    LEA a", "    LEA b"]
+    for i in range(sentencias):
+        cuerpo.append(f"    c = (a * {i} + b) % 97")
+        cuerpo.append("    s = s + c")
+        cuerpo.append("    SI c > 48 ENTONCES\n        MUESTRE \"alto \", c\n    SINO\n        MUESTRE \"bajo \", c\n    FINSI")
+    cuerpo.append("    MUESTRE s")
+    codigo = "ALGORITMO Sintetico\n" + "\n".join(cuerpo) + "\nFINALGORITMO\n"
+    for p in range(num_programas):
+        with open(os.path.join(dir_programas, f"entrega_{p:03d}{EXTENSION_PROGRAMA}"), "w", encoding="utf-8") as f:
+            f.write(codigo)
+
+    for k in range(num_casos):
+        a, b = k + 1, 2 * k + 3
+        lineas, s = [], ""
+        for i in range(sentencias):
+            c = (a * i + b) % 97
+            s += str(c)
+            lineas.append(f"alto {c}" if c > 48 else f"bajo {c}")
+        lineas.append(s)
+        with open(os.path.join(dir_casos, f"caso_{k:02d}.in"), "w", encoding="utf-8") as f:
+            f.write(f"{a}\n{b}\n")
+        with open(os.path.join(dir_casos, f"caso_{k:02d}.out"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lineas) + "\n")
+    return dir_programas, dir_casos
+
+
+if __name__ == '__main__':
+    # Benchmark: throughput con 1, 2, 4, ... procesos sobre un corpus sintético.
+    # Ejecutar desde la carpeta que contiene pseint_colombiano:
+    #   python -m pseint_colombiano.servicio.calificador
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dir_programas, dir_casos = generar_corpus_sintetico(tmp)
+        maximo = os.cpu_count() or 1
+        procesos = 1
+        base = None
+        while True:
+            calificador = Calificador(procesos=procesos)
+            with open(os.devnull, "w", encoding="utf-8") as nulo:
+                resumen = calificador.calificar(dir_programas, dir_casos, nulo)
+            throughput = resumen["ejecuciones"] / resumen["tiempo_ejecucion_s"]
+            base = base or throughput
+            print(f"{procesos:>2} procesos: análisis {resumen['tiempo_analisis_s']:.2f} s, "
+                  f"{resumen['ejecuciones']} ejecuciones en {resumen['tiempo_ejecucion_s']:.2f} s "
+                  f"({throughput:.1f}/s, aceleración x{throughput / base:.2f}) estados={resumen['estados']}")
+            if procesos >= maximo:
+                break
+            procesos = min(procesos * 2, maximo)
+
+        # La misma calificación midiendo cobertura (con el máximo de procesos)
+        calificador = Calificador(procesos=maximo, cobertura=True)
+        with open(os.devnull, "w", encoding="utf-8") as nulo:
+            resumen = calificador.calificar(dir_programas, dir_casos, nulo)
+        con_cobertura = resumen["ejecuciones"] / resumen["tiempo_ejecucion_s"]
+        programa, reporte = next(iter(calificador.cobertura.items()))
+        print(f"Con cobertura: {con_cobertura:.1f}/s ({(throughput / con_cobertura - 1) * 100:+.1f}% de tiempo); "
+              f"{programa}: líneas {reporte['lineas']['porcentaje']}%, ramas {reporte['ramas']['porcentaje']}%, "
+              f"casos suficientes {reporte['casos_seleccionados']} de {resumen['casos']}")
+
+        # Recalificación con caché: la primera pasada lo llena, la segunda no ejecuta nada
+        ruta_cache = os.path.join(tmp, "resultados.sqlite")
+        for pasada in ("primera", "segunda"):
+            calificador = Calificador(procesos=maximo, cache=ruta_cache)
+            with open(os.devnull, "w", encoding="utf-8") as nulo:
+                resumen = calificador.calificar(dir_programas, dir_casos, nulo)
+            print(f"Con caché, {pasada} pasada: {resumen['tiempo_ejecucion_s']:.2f} s, {resumen['cache']}, "
+                  f"estados={resumen['estados']}")
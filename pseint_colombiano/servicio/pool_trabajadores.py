@@ -0,0 +1,296 @@
+# pseint_colombiano/servicio/pool_trabajadores.py
+"""
+Pool de trabajadores precalentados para ejecutar programas con baja latencia.
+Los procesos se crean por adelantado (fork) con `core` ya importado y reciben
+las solicitudes por pipes. Se reciclan tras N ejecuciones o si su memoria
+crece demasiado, y un semáforo limita las ejecuciones concurrentes.
+
+Los reemplazos se crean desde los hilos que atienden solicitudes: hacer fork
+de un proceso con varios hilos puede dejar al hijo trabado en un candado que
+tenía otro hilo, así que salen de un forkserver (un proceso de un solo hilo
+con `core` precargado) o, donde no lo hay, con spawn.
+
+Incluye un servidor HTTP local mínimo que sirve de sustituto del front-end web.
+"""
+import io
+import json
+import multiprocessing
+import queue
+import threading
+import time
+
+from ..core.ejecutor import ejecutar_codigo, LectorEntrada
+from ..core.limites import LimitesEjecucion
+from ..core.salida import SalidaBuffer, DestinoMemoria
+
+try:
+    import resource # Solo POSIX
+except ImportError:
+    resource = None
+
+ESTADO_TIEMPO_AGOTADO = "tiempo_agotado"
+ESTADO_TRABAJADOR_CAIDO = "trabajador_caido"
+
+# Margen sobre el tiempo límite antes de dar por colgado a un trabajador y matarlo
+MARGEN_TIEMPO_LIMITE = 1.0
+
+
+def _memoria_maxima_kb():
+    """Pico de memoria residente del proceso actual en KB (0 si no se puede medir)."""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _bucle_trabajador(conexion):
+    """Bucle del proceso hijo: recibe solicitudes, ejecuta y responde hasta recibir None."""
+    while True:
+        try:
+            solicitud = conexion.recv()
+        except EOFError:
+            break
+        if solicitud is None:
+            break
+        destino = DestinoMemoria()
+        entrada = LectorEntrada(io.StringIO("".join(linea + "\n" for linea in solicitud.get("entrada", []))))
+        inicio = time.perf_counter()
+        resultado = ejecutar_codigo(solicitud["codigo"], entrada, SalidaBuffer(destino), solicitud["limites"])
+        conexion.send({
+            "estado": resultado.estado,
+            "salida": destino.lineas,
+            "errores": resultado.errores,
+            "estadisticas": resultado.estadisticas,
+            "tiempo_ejecucion_s": time.perf_counter() - inicio,
+            "memoria_kb": _memoria_maxima_kb(),
+        })
+    conexion.close()
+
+
+class _Trabajador:
+    """Proceso hijo y su extremo del pipe."""
+    def __init__(self, contexto):
+        self.conexion, conexion_hija = contexto.Pipe()
+        self.proceso = contexto.Process(target=_bucle_trabajador, args=(conexion_hija,), daemon=True)
+        self.proceso.start()
+        conexion_hija.close()
+        self.ejecuciones = 0
+        self.memoria_inicial_kb = None
+
+    def detener(self, forzar=False):
+        if not forzar:
+            try:
+                self.conexion.send(None)
+            except (BrokenPipeError, OSError):
+                forzar = True
+        if forzar and self.proceso.is_alive():
+            self.proceso.kill()
+        self.proceso.join(timeout=1)
+        self.conexion.close()
+
+
+class PoolTrabajadores:
+    """
+    Despacha ejecuciones a procesos precalentados.
+
+    num_trabajadores: procesos creados por adelantado.
+    max_ejecuciones: se recicla un trabajador después de este número de ejecuciones.
+    max_crecimiento_memoria_mb: se recicla si su pico de memoria crece más que esto.
+    max_concurrentes: tope de ejecuciones simultáneas (por defecto, num_trabajadores).
+    tiempo_limite, max_pasos, max_memoria: límites que aplica el intérprete (core/limites.py);
+    si un trabajador no responde tras tiempo_limite + MARGEN_TIEMPO_LIMITE, se mata.
+    """
+    def __init__(self, num_trabajadores=4, max_ejecuciones=500, max_crecimiento_memoria_mb=64,
+                 max_concurrentes=None, tiempo_limite=5.0, max_pasos=None, max_memoria=None):
+        metodos = multiprocessing.get_all_start_methods()
+        # fork hereda los módulos ya importados: el hijo arranca "caliente"
+        self._contexto = multiprocessing.get_context("fork" if "fork" in metodos else "spawn")
+        # Reemplazos (desde hilos): nunca fork; el forkserver ya tiene `core` importado
+        self._contexto_reemplazo = multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+        if "forkserver" in metodos:
+            self._contexto_reemplazo.set_forkserver_preload([ejecutar_codigo.__module__])
+        self.max_ejecuciones = max_ejecuciones
+        self.max_crecimiento_memoria_kb = max_crecimiento_memoria_mb * 1024
+        self.tiempo_limite = tiempo_limite
+        self.limites = LimitesEjecucion(max_pasos=max_pasos, tiempo_maximo=tiempo_limite,
+                                        max_memoria=max_memoria)
+        self._semaforo = threading.BoundedSemaphore(max_concurrentes or num_trabajadores)
+        self._libres = queue.Queue()
+        self._cerrado = False
+        self.reciclados = 0
+        for _ in range(num_trabajadores):
+            self._libres.put(_Trabajador(self._contexto))
+
+    def ejecutar(self, codigo, entrada=None):
+        """
+        Ejecuta `codigo` con las líneas de `entrada` para LEA en un trabajador libre.
+        Bloquea el hilo que llama (no el pool). Devuelve un dict con estado, salida y errores.
+        """
+        if self._cerrado:
+            raise RuntimeError("El pool de trabajadores está cerrado.")
+        if not isinstance(codigo, str):
+            raise TypeError("codigo debe ser un texto.")
+        entrada = [] if entrada is None else entrada
+        # Un texto también es iterable: list("abc") lo partiría en caracteres sin avisar
+        if not isinstance(entrada, (list, tuple)) or not all(isinstance(linea, str) for linea in entrada):
+            raise TypeError("entrada debe ser una lista de líneas de texto.")
+        with self._semaforo:
+            trabajador = self._libres.get()
+            try:
+                if trabajador is None: # No se pudo crear el reemplazo la vez anterior: se reintenta
+                    trabajador = _Trabajador(self._contexto_reemplazo)
+                respuesta, reemplazar = self._despachar(trabajador, codigo, list(entrada))
+                if reemplazar:
+                    anterior, trabajador = trabajador, None
+                    anterior.detener(forzar=respuesta["estado"] in (ESTADO_TIEMPO_AGOTADO, ESTADO_TRABAJADOR_CAIDO))
+                    try:
+                        trabajador = _Trabajador(self._contexto_reemplazo)
+                        self.reciclados += 1
+                    except Exception: # Sin procesos o sin memoria: la respuesta ya está, el lugar queda en None
+                        pass
+            finally:
+                self._libres.put(trabajador) # None conserva el lugar: se llena en el próximo uso
+            return respuesta
+
+    def _despachar(self, trabajador, codigo, entrada):
+        """(respuesta, reemplazar): ejecuta en `trabajador` y decide si hay que reciclarlo."""
+        try:
+            trabajador.conexion.send({"codigo": codigo, "entrada": entrada, "limites": self.limites})
+            if not trabajador.conexion.poll(self.tiempo_limite + MARGEN_TIEMPO_LIMITE):
+                return {"estado": ESTADO_TIEMPO_AGOTADO, "salida": [],
+                        "errores": [f"Superó {self.tiempo_limite} s"]}, True
+            respuesta = trabajador.conexion.recv()
+        except (EOFError, BrokenPipeError, OSError):
+            return {"estado": ESTADO_TRABAJADOR_CAIDO, "salida": [],
+                    "errores": ["El proceso trabajador terminó inesperadamente."]}, True
+        trabajador.ejecuciones += 1
+        memoria = respuesta.pop("memoria_kb", 0)
+        if trabajador.memoria_inicial_kb is None:
+            trabajador.memoria_inicial_kb = memoria
+        reemplazar = trabajador.ejecuciones >= self.max_ejecuciones or \
+            memoria - trabajador.memoria_inicial_kb > self.max_crecimiento_memoria_kb
+        return respuesta, reemplazar
+
+    def cerrar(self):
+        self._cerrado = True
+        while True:
+            try:
+                trabajador = self._libres.get_nowait()
+            except queue.Empty:
+                break
+            if trabajador is not None:
+                trabajador.detener()
+
+
+def crear_servidor_http(pool, host="127.0.0.1", puerto=0):
+    """
+    Servidor HTTP local (sustituto del front-end web).
+    POST /ejecutar con JSON {"codigo": "...", "entrada": ["linea1", ...]} -> JSON del resultado.
+    """
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class _Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Conexiones persistentes para el generador de carga
+        disable_nagle_algorithm = True # Encabezados y cuerpo van en escrituras separadas
+
+        def do_POST(self):
+            if self.path != "/ejecutar":
+                self.send_error(404)
+                return
+            try:
+                longitud = int(self.headers.get("Content-Length", 0))
+                if longitud < 0:
+                    raise ValueError("Content-Length negativo.")
+                solicitud = json.loads(self.rfile.read(longitud))
+                respuesta = pool.ejecutar(solicitud["codigo"], solicitud.get("entrada"))
+                cuerpo, codigo_http = json.dumps(respuesta, ensure_ascii=False).encode("utf-8"), 200
+            except (ValueError, KeyError, TypeError, AttributeError) as e: # JSON, campos o tipos inválidos
+                cuerpo, codigo_http = json.dumps({"error": str(e)}).encode("utf-8"), 400
+            except (RuntimeError, OSError) as e: # Pool cerrado o sin procesos para crear un trabajador
+                cuerpo, codigo_http = json.dumps({"error": str(e)}).encode("utf-8"), 503
+            self.send_response(codigo_http)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, formato, *args):
+            pass # Silencioso durante las pruebas de carga
+
+    return ThreadingHTTPServer((host, puerto), _Manejador)
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+if __name__ == '__main__':
+    # Generador de carga concurrente contra el servidor HTTP local.
+    # Ejecutar desde la carpeta que contiene pseint_colombiano:
+    #   python -m pseint_colombiano.servicio.pool_trabajadores
+    import http.client
+    import os
+    import socket
+    import subprocess
+    import sys
+    import tempfile
+
+    CODIGO = ('ALGORITMO Saludo\n    DEFINA nombre COMO TEXTO\n    LEA nombre\n'
+              '    MUESTRE "Hola, ", nombre\nFINALGORITMO\n')
+    CLIENTES, SOLICITUDES_POR_CLIENTE = 16, 50
+
+    pool = PoolTrabajadores(num_trabajadores=max(2, os.cpu_count() or 1), max_ejecuciones=200)
+    servidor = crear_servidor_http(pool)
+    hilo_servidor = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo_servidor.start()
+    puerto = servidor.server_address[1]
+
+    latencias, errores = [], []
+    candado = threading.Lock()
+
+    def cliente(indice):
+        conexion = http.client.HTTPConnection("127.0.0.1", puerto)
+        conexion.connect()
+        conexion.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        for i in range(SOLICITUDES_POR_CLIENTE):
+            cuerpo = json.dumps({"codigo": CODIGO, "entrada": [f"cliente{indice}-{i}"]})
+            inicio = time.perf_counter()
+            conexion.request("POST", "/ejecutar", cuerpo, {"Content-Type": "application/json"})
+            respuesta = json.loads(conexion.getresponse().read())
+            duracion = time.perf_counter() - inicio
+            with candado:
+                latencias.append(duracion)
+                if respuesta.get("salida") != [f"Hola, cliente{indice}-{i}"]:
+                    errores.append(respuesta)
+        conexion.close()
+
+    # Latencia sin contención: un solo cliente
+    cliente(-1)
+    secuencial, latencias = latencias, []
+    print(f"Pool caliente, 1 cliente:   p50={_percentil(secuencial, 50) * 1000:.2f} ms  "
+          f"p99={_percentil(secuencial, 99) * 1000:.2f} ms")
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(CLIENTES)]
+    for h in hilos: h.start()
+    for h in hilos: h.join()
+    total = time.perf_counter() - inicio
+    servidor.shutdown()
+    pool.cerrar()
+
+    print(f"Pool caliente, {CLIENTES} clientes: p50={_percentil(latencias, 50) * 1000:.2f} ms  "
+          f"p99={_percentil(latencias, 99) * 1000:.2f} ms  ({len(latencias)} solicitudes en {total:.2f} s, "
+          f"{len(latencias) / total:.0f}/s, errores={len(errores)}, reciclados={pool.reciclados})")
+
+    # Referencia: arranque en frío con un proceso nuevo por ejecución (CLI)
+    raiz = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    frio = []
+    with tempfile.NamedTemporaryFile("w", suffix=".pseudocol", delete=False, encoding="utf-8") as f:
+        f.write(CODIGO)
+    for _ in range(20):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "pseint_colombiano", "run", f.name], cwd=raiz,
+                       input="frio\n", text=True, capture_output=True)
+        frio.append(time.perf_counter() - inicio)
+    os.remove(f.name)
+    print(f"Proceso en frío, 1 cliente: p50={_percentil(frio, 50) * 1000:.2f} ms  p99={_percentil(frio, 99) * 1000:.2f} ms")
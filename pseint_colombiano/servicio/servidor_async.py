@@ -0,0 +1,236 @@
+# pseint_colombiano/servicio/servidor_async.py
+"""
+Servidor asyncio de sesiones interactivas (sustituto local del servidor de aula).
+Cada conexión TCP es una sesión: un programa que puede quedar esperando un LEA
+de un humano sin ocupar un hilo (core/interprete_async.py).
+
+Protocolo: un objeto JSON por línea.
+  cliente -> {"codigo": "..."} para iniciar; luego {"entrada": "..."} cada vez que se pida.
+  servidor -> {"salida": "..."}, {"pide_entrada": true} y al final {"fin": estado, "errores": [...]}.
+Un mensaje del cliente que no se entiende o supera MAX_BYTES_MENSAJE termina la
+sesión con {"fin": "solicitud_invalida", ...}.
+"""
+import asyncio
+import json
+
+from ..core.ejecutor import analizar, resultado_de_error, ESTADO_ERROR_LEXICO, ESTADO_ERROR_SINTACTICO
+from ..core.interprete_async import InterpreteAsync, PASOS_POR_QUANTUM
+from ..core.pseudo_error import PseudoRuntimeError
+
+# Tamaño máximo de una línea del cliente (el programa completo viaja en una sola)
+MAX_BYTES_MENSAJE = 4 * 1024 * 1024
+ESTADO_SOLICITUD_INVALIDA = "solicitud_invalida"
+
+
+class _MensajeInvalido(PseudoRuntimeError):
+    """La respuesta a un LEA no se pudo leer o no es {"entrada": ...}."""
+
+
+def _mensaje(objeto):
+    return (json.dumps(objeto, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class ServidorSesiones:
+    """Atiende sesiones concurrentes en un solo bucle de eventos y lleva la cuenta de su estado."""
+    def __init__(self, limites=None, quantum=PASOS_POR_QUANTUM):
+        self.limites = limites
+        self.quantum = quantum
+        self.activas = 0
+        self.esperando_entrada = 0
+        self.atendidas = 0
+
+    async def iniciar(self, host="127.0.0.1", puerto=0, backlog=1024):
+        """Devuelve el asyncio.Server ya escuchando."""
+        return await asyncio.start_server(self._atender, host, puerto, backlog=backlog, limit=MAX_BYTES_MENSAJE)
+
+    async def _atender(self, lector, escritor):
+        self.activas += 1
+        try:
+            try: # ValueError también si la línea supera MAX_BYTES_MENSAJE
+                linea = await lector.readline()
+                codigo = json.loads(linea)["codigo"]
+            except (ValueError, KeyError, TypeError, asyncio.LimitOverrunError):
+                escritor.write(_mensaje({"fin": ESTADO_SOLICITUD_INVALIDA, "errores": [
+                    f"Se esperaba {{\"codigo\": ...}} en una línea de hasta {MAX_BYTES_MENSAJE} bytes."]}))
+                await escritor.drain()
+                return
+            escritor.write(_mensaje(await self._ejecutar(codigo, lector, escritor)))
+            await escritor.drain()
+        except ConnectionError:
+            pass # El cliente se fue
+        finally:
+            self.activas -= 1
+            self.atendidas += 1
+            escritor.close()
+
+    async def _ejecutar(self, codigo, lector, escritor):
+        """Ejecuta la sesión y devuelve el mensaje final."""
+        # El análisis no cede el control: en un hilo, para no frenar a las demás sesiones con un programa grande
+        ast, errores_lexicos, errores_sintacticos = await asyncio.to_thread(analizar, codigo)
+        if errores_lexicos:
+            return {"fin": ESTADO_ERROR_LEXICO, "errores": errores_lexicos}
+        if errores_sintacticos or ast is None:
+            return {"fin": ESTADO_ERROR_SINTACTICO,
+                    "errores": errores_sintacticos or ["No se pudo construir el árbol de sintaxis (AST)."]}
+
+        async def leer():
+            escritor.write(_mensaje({"pide_entrada": True}))
+            await escritor.drain()
+            self.esperando_entrada += 1
+            try:
+                linea = await lector.readline()
+            except (ValueError, asyncio.LimitOverrunError):
+                linea = None # Demasiado larga
+            finally:
+                self.esperando_entrada -= 1
+            if linea == b"":
+                raise PseudoRuntimeError("La sesión se cerró mientras LEA esperaba una entrada.")
+            try: # Un mensaje mal formado termina la sesión con un error, no con una tarea rota
+                mensaje = json.loads(linea) if linea is not None else None
+            except ValueError:
+                mensaje = None
+            if not isinstance(mensaje, dict):
+                raise _MensajeInvalido(f"Se esperaba {{\"entrada\": ...}} como respuesta al LEA, "
+                                       f"en una línea de hasta {MAX_BYTES_MENSAJE} bytes.")
+            return str(mensaje.get("entrada", ""))
+
+        async def escribir(texto):
+            escritor.write(_mensaje({"salida": texto}))
+            await escritor.drain() # Contrapresión si el cliente lee lento
+
+        interprete = InterpreteAsync(leer, escribir, limites=self.limites,
+                                     quantum=self.quantum, reportar_errores=False)
+        await interprete.interpret(ast)
+        if isinstance(interprete.error_ejecucion, _MensajeInvalido):
+            return {"fin": ESTADO_SOLICITUD_INVALIDA, "errores": [str(interprete.error_ejecucion)]}
+        resultado = resultado_de_error(interprete.error_ejecucion)
+        return {"fin": resultado.estado, "errores": resultado.errores}
+
+
+async def _leer_mensaje(lector):
+    linea = await lector.readline()
+    if not linea:
+        raise ConnectionError("El servidor cerró la conexión.")
+    return json.loads(linea)
+
+
+async def _sesion_cliente(puerto, indice, codigo, semaforo, estacionadas, continuar):
+    """Cliente de prueba: inicia la sesión, espera el LEA, y al recibir la señal responde y lee el final."""
+    async with semaforo: # Limita las conexiones simultáneas en curso de establecerse
+        lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+        escritor.write(_mensaje({"codigo": codigo}))
+        salida = []
+        while True:
+            mensaje = await _leer_mensaje(lector)
+            if "salida" in mensaje:
+                salida.append(mensaje["salida"])
+            elif mensaje.get("pide_entrada"):
+                break
+    estacionadas.append(indice)
+    await continuar.wait()
+    inicio = asyncio.get_running_loop().time()
+    escritor.write(_mensaje({"entrada": f"estudiante{indice}"}))
+    while True:
+        mensaje = await _leer_mensaje(lector)
+        if "salida" in mensaje:
+            salida.append(mensaje["salida"])
+        elif "fin" in mensaje:
+            break
+    latencia = asyncio.get_running_loop().time() - inicio
+    escritor.close()
+    return salida == ["Nombre:", f"Hola, estudiante{indice}"] and mensaje["fin"] == "ok", latencia
+
+
+def _proceso_cliente(puerto, sesiones, codigo, conexion):
+    """Proceso generador de carga (en otro proceso para repartir los descriptores de archivo)."""
+    async def principal():
+        semaforo = asyncio.Semaphore(256)
+        estacionadas, continuar = [], asyncio.Event()
+        tareas = [asyncio.ensure_future(_sesion_cliente(puerto, i, codigo, semaforo, estacionadas, continuar))
+                  for i in range(sesiones)]
+        while len(estacionadas) < sesiones:
+            await asyncio.sleep(0.05)
+        conexion.send(len(estacionadas))
+        await asyncio.get_running_loop().run_in_executor(None, conexion.recv) # Señal del servidor
+        continuar.set()
+        resultados = await asyncio.gather(*tareas)
+        conexion.send([(correcta, latencia) for correcta, latencia in resultados])
+    asyncio.run(principal())
+
+
+if __name__ == '__main__':
+    # Prueba de carga: 10.000 sesiones estacionadas en LEA contra un solo proceso servidor.
+    # Ejecutar desde la carpeta que contiene pseint_colombiano:
+    #   python -m pseint_colombiano.servicio.servidor_async
+    import multiprocessing
+    import time
+
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    SESIONES = 10_000
+    CODIGO = ('ALGORITMO Saludo\n    DEFINA nombre COMO TEXTO\n    MUESTRE "Nombre:"\n    LEA nombre\n'
+              '    MUESTRE "Hola, ", nombre\nFINALGORITMO\n')
+
+    def memoria_mb():
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else 0.0
+
+    def percentil(valores, p):
+        ordenados = sorted(valores)
+        return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+    async def principal():
+        servicio = ServidorSesiones()
+        servidor = await servicio.iniciar()
+        puerto = servidor.sockets[0].getsockname()[1]
+        memoria_inicial = memoria_mb()
+
+        contexto = multiprocessing.get_context("spawn")
+        conexion, conexion_hija = contexto.Pipe()
+        cliente = contexto.Process(target=_proceso_cliente, args=(puerto, SESIONES, CODIGO, conexion_hija))
+        inicio = time.perf_counter()
+        cliente.start()
+        bucle = asyncio.get_running_loop()
+
+        estacionadas = await bucle.run_in_executor(None, conexion.recv)
+        establecimiento = time.perf_counter() - inicio
+        memoria = memoria_mb()
+        print(f"{estacionadas} sesiones esperando LEA en {establecimiento:.2f} s: servidor con "
+              f"{servicio.activas} activas, {servicio.esperando_entrada} esperando entrada; "
+              f"memoria {memoria:.1f} MB (+{(memoria - memoria_inicial) * 1024 / SESIONES:.1f} KB por sesión)")
+
+        # Un programa de cálculo no debe bloquear a las sesiones en espera
+        latido, detenido = [], asyncio.Event()
+        async def medir_latido():
+            while not detenido.is_set():
+                t = bucle.time()
+                await asyncio.sleep(0.01)
+                latido.append(bucle.time() - t - 0.01)
+        tarea_latido = asyncio.ensure_future(medir_latido())
+        calculo = "ALGORITMO C\n DEFINA x COMO ENTERO\n" + " x = x + 1\n" * 5000 + " MUESTRE x\nFINALGORITMO\n"
+        lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+        escritor.write(_mensaje({"codigo": calculo}))
+        while "fin" not in await _leer_mensaje(lector):
+            pass
+        escritor.close()
+        detenido.set()
+        await tarea_latido
+        print(f"Retraso máximo del bucle mientras corre un cálculo de 5.000 sentencias: "
+              f"{max(latido) * 1000:.2f} ms")
+
+        inicio = time.perf_counter()
+        conexion.send(True)
+        resultados = await bucle.run_in_executor(None, conexion.recv)
+        total = time.perf_counter() - inicio
+        cliente.join()
+        servidor.close()
+        await servidor.wait_closed()
+        latencias = [latencia for _, latencia in resultados]
+        print(f"Respuestas a las {len(resultados)} sesiones en {total:.2f} s: "
+              f"correctas={sum(correcta for correcta, _ in resultados)}, "
+              f"latencia p50={percentil(latencias, 50) * 1000:.1f} ms p99={percentil(latencias, 99) * 1000:.1f} ms "
+              f"(todas respondidas a la vez); atendidas={servicio.atendidas}")
+
+    asyncio.run(principal())
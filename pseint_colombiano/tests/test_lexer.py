@@ -0,0 +1,133 @@
+# pseint_colombiano/tests/test_lexer.py
+"""
+Regresión del Lexer de una sola pasada frente al algoritmo anterior (probar
+cada expresión de REGEX_TOKENS en orden sobre el resto del texto, con la
+columna contada desde el último salto de línea), con la misma tabla de tokens.
+
+Las diferencias intencionales frente a la versión anterior quedan fijadas
+aparte, con lo que daba antes:
+  - MOD es el operador OP_MOD (antes era un ID, porque ID iba antes que OP_MOD);
+  - las cadenas no cruzan líneas: una comilla sin cerrar es ERROR (antes la
+    cadena se tragaba las líneas siguientes sin contarlas).
+
+Ejecutar desde pseint_colombiano/: python -m pytest tests
+"""
+import glob
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.keywords_col import REGEX_TOKENS, PALABRAS_CLAVE
+from core.lexer import Lexer
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMAS = [
+    """ALGORITMO Notas
+    DEFINA nota, suma COMO REAL
+    DEFINA i COMO ENTERO; // contador
+    suma <- 0
+    i = 1
+    MIENTRAS i <= 3 HAGA
+        LEA nota
+        suma = suma + nota
+        i <- i + 1
+    FINMIENTRAS
+    SI suma / 3 >= 3.0 Y NO (suma == 0) ENTONCES
+        MUESTRE "Aprobó con ", suma / 3
+    SINO
+        MUESTRE 'Reprobó: ', suma MOD 5, " puntos" // comentario con "comillas"
+    FINSI
+FINALGORITMO
+""",
+    "Proceso Mínimo\n\tDefinir x Como Caracter\n\tx <- \"ñandú\"\n\tEscribir x, [1], a<>b, c!=d, 2^3 % 4\nFinProceso",
+    "ALGORITMO PruebaError\n @variableError = 10\nFINALGORITMO",
+    "",
+    "\n\n   \n",
+]
+
+
+def lexer_anterior(code):
+    """El algoritmo anterior a la pasada única (sin comentarios, igual que Lexer por defecto)."""
+    tokens, errores = [], []
+    restante, linea, columna = code, 1, 1
+    while restante:
+        posicion = len(code) - len(restante)
+        ultimo_salto = code.rfind("\n", 0, posicion)
+        columna = posicion + 1 if ultimo_salto == -1 else posicion - ultimo_salto
+        for tipo, patron in REGEX_TOKENS:
+            m = re.match(patron, restante)
+            if m:
+                valor = m.group(0)
+                if tipo == "NUEVALINEA":
+                    linea += 1
+                elif tipo == "ERROR":
+                    errores.append(f"Error Léxico: Caracter no reconocido '{valor}' en línea {linea}, columna {columna}")
+                elif tipo not in ("ESPACIO", "COMENTARIO"):
+                    tokens.append((tipo, valor, linea, columna))
+                restante = restante[len(valor):]
+                break
+        else:
+            restante = restante[1:]
+    tokens.append(("EOF", "EOF", linea, columna))
+    return tokens, errores
+
+
+def lexer_actual(code):
+    tokens, errores = Lexer(code).tokenize()
+    return [(t.type, t.value, t.line, t.column) for t in tokens], errores
+
+
+def test_programas_reales_identicos():
+    ejemplos = []
+    for ruta in sorted(glob.glob(os.path.join(RAIZ, "examples", "*.pseudocol"))):
+        with open(ruta, encoding="utf-8") as f:
+            ejemplos.append(f.read())
+    assert ejemplos, "No se encontraron programas en examples/"
+    for codigo in ejemplos + PROGRAMAS:
+        assert lexer_actual(codigo) == lexer_anterior(codigo)
+
+
+def test_codigo_aleatorio_identico():
+    piezas = list(PALABRAS_CLAVE) + ["si", "Mod", "x", "suma_1", "ñ", "é", "Yñ", "Oé", "3", "3.5", ".5",
+                                     '"', "'", '"a b"', "//", "/", "<-", "<=", "<>", "==", "=", "%", "(", ")",
+                                     "[", "]", ",", ";", ":", "@", "#", "\t", " ", " ", "\n", "\n"]
+    azar = random.Random(2024)
+    for _ in range(3000):
+        codigo = "".join(azar.choice(piezas) + azar.choice(("", " ")) for _ in range(azar.randrange(1, 25)))
+        assert lexer_actual(codigo) == lexer_anterior(codigo), repr(codigo)
+
+
+def test_palabra_clave_seguida_de_letra_no_ascii_es_id():
+    tipos = [t[:2] for t in lexer_actual("a Yñ b Oé Y2 Y")[0]]
+    assert tipos == [("ID", "a"), ("ID", "Y"), ("ID", "b"), ("ID", "O"), ("ID", "Y2"), ("OP_Y", "Y"), ("EOF", "EOF")]
+
+
+def test_diferencia_intencional_mod_es_operador():
+    # Antes: [ID 'a', ID 'MOD', NUMERO_ENTERO '3']
+    assert [t[0] for t in lexer_actual("a MOD 3 mod 2")[0]] == \
+        ["ID", "OP_MOD", "NUMERO_ENTERO", "OP_MOD", "NUMERO_ENTERO", "EOF"]
+
+
+def test_diferencia_intencional_cadena_sin_cerrar():
+    codigo = 'MUESTRE "hola\nx <- 1\nMUESTRE "b"'
+    # Antes: CADENA '"hola\nx <- 1\nMUESTRE "' en la línea 1 y luego ID 'b' también en la línea 1
+    tokens, errores = lexer_actual(codigo)
+    assert errores == ["Error Léxico: Caracter no reconocido '\"' en línea 1, columna 9"]
+    assert tokens == [("MUESTRE", "MUESTRE", 1, 1), ("ID", "hola", 1, 10),
+                      ("ID", "x", 2, 1), ("ASIGNACION", "<-", 2, 3), ("NUMERO_ENTERO", "1", 2, 6),
+                      ("MUESTRE", "MUESTRE", 3, 1), ("CADENA", '"b"', 3, 9), ("EOF", "EOF", 3, 9)]
+
+
+def test_por_lineas_igual_que_todo_el_texto():
+    # El resaltador tokeniza tramos de líneas con linea_inicial y los junta: ningún token cruza líneas
+    for codigo in PROGRAMAS[:2] + ['MUESTRE "abierta\nMUESTRE "b"']:
+        completo = Lexer(codigo, conservar_comentarios=True).tokenize()[0][:-1]
+        por_lineas = []
+        for numero, linea in enumerate(codigo.split("\n"), start=1):
+            por_lineas += Lexer(linea, conservar_comentarios=True, linea_inicial=numero).tokenize()[0][:-1]
+        assert [(t.type, t.value, t.line, t.column) for t in por_lineas] == \
+               [(t.type, t.value, t.line, t.column) for t in completo]
@@ -0,0 +1,52 @@
+# pseint_colombiano/tests/test_limites.py
+"""
+Límite de tiempo en programas cortos: el plazo lo marca un temporizador, no la
+cuenta de pasos, así que un programa de pocas sentencias caras también se detiene.
+
+Ejecutar desde pseint_colombiano/: python -m pytest tests
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ejecutor import analizar
+from core.interpreter import Interpreter
+from core.limites import LimitesEjecucion
+from core.pseudo_error import PseudoLimiteExcedidoError
+from core.salida import SalidaBuffer, DestinoMemoria
+
+
+def _programa_cuadrados(veces):
+    """Pocas sentencias, cada una el doble de cara que la anterior (x crece a 2^veces dígitos)."""
+    ast, errores_lexicos, errores_sintacticos = analizar(
+        "ALGORITMO Cuadrados\n DEFINA x COMO ENTERO\n x = 3\n" + " x = x * x\n" * veces + "FINALGORITMO\n")
+    assert not errores_lexicos and not errores_sintacticos
+    return ast
+
+
+def _interprete(tiempo_maximo):
+    return Interpreter(salida=SalidaBuffer(DestinoMemoria()), reportar_errores=False,
+                       limites=LimitesEjecucion(tiempo_maximo=tiempo_maximo))
+
+
+def test_programa_corto_se_detiene_por_tiempo():
+    interprete = _interprete(0.1)
+    inicio = time.monotonic()
+    interprete.interpret(_programa_cuadrados(26)) # 28 sentencias; sin límite tarda decenas de segundos
+    duracion = time.monotonic() - inicio
+    error = interprete.error_ejecucion
+    assert isinstance(error, PseudoLimiteExcedidoError) and error.limite == "tiempo"
+    assert error.estadisticas["pasos"] < 28
+    assert duracion < 5
+
+
+def test_plazo_vencido_no_afecta_la_siguiente_ejecucion():
+    interprete = _interprete(0.05)
+    programa = _programa_cuadrados(2)
+    interprete.interpret(programa)
+    assert interprete.error_ejecucion is None
+    time.sleep(0.1) # El temporizador de la ejecución anterior ya se habría cumplido
+    interprete.interpret(programa)
+    assert interprete.error_ejecucion is None
@@ -0,0 +1,199 @@
+# pseint_colombiano/utils/autocompletado.py
+"""
+Índice de autocompletado del editor: un trie de prefijos con las palabras
+clave y los identificadores declarados con DEFINA en el programa actual.
+
+Buscar un prefijo cuesta lo que mide el prefijo más lo que mide el subárbol
+que cuelga de él, no lo que mide la lista completa de palabras. Las
+sugerencias se ordenan por frecuencia de uso: veces que la palabra aparece
+en el programa más las veces que se eligió del popup (con más peso).
+"""
+import heapq
+import time
+from collections import Counter, deque
+
+from core.keywords_col import AUTOCOMPLETE_SUGGESTIONS
+
+# Sugerencias que se muestran como máximo
+MAX_SUGERENCIAS = 8
+# Cuánto suma a la frecuencia de una palabra cada vez que se elige del popup
+PESO_ELEGIDA = 5
+# Latencias por tecla que se conservan para los percentiles
+MUESTRAS_LATENCIA = 1000
+
+_FIN = "" # Clave del nodo donde termina una palabra (ningún carácter es la cadena vacía)
+
+
+class TriePrefijos:
+    """
+    Trie sin distinción de mayúsculas. Cada palabra se guarda con su forma
+    original en el nodo donde termina (bajo la clave _FIN).
+    """
+    def __init__(self, palabras=()):
+        self._raiz = {}
+        self._cantidad = 0
+        for palabra in palabras:
+            self.insertar(palabra)
+
+    def __len__(self):
+        return self._cantidad
+
+    def __contains__(self, palabra):
+        nodo = self._nodo(palabra.upper())
+        return nodo is not None and _FIN in nodo
+
+    def _nodo(self, clave):
+        nodo = self._raiz
+        for caracter in clave:
+            nodo = nodo.get(caracter)
+            if nodo is None:
+                return None
+        return nodo
+
+    def insertar(self, palabra):
+        nodo = self._raiz
+        for caracter in palabra.upper():
+            nodo = nodo.setdefault(caracter, {})
+        if _FIN not in nodo:
+            self._cantidad += 1
+        nodo[_FIN] = palabra
+
+    def eliminar(self, palabra):
+        """Quita la palabra y los nodos que quedan vacíos. No hace nada si no estaba."""
+        camino = [self._raiz]
+        clave = palabra.upper()
+        for caracter in clave:
+            siguiente = camino[-1].get(caracter)
+            if siguiente is None:
+                return
+            camino.append(siguiente)
+        if _FIN not in camino[-1]:
+            return
+        del camino[-1][_FIN]
+        self._cantidad -= 1
+        for i in range(len(clave) - 1, -1, -1): # Podar desde la hoja los nodos vacíos
+            if camino[i + 1]:
+                break
+            del camino[i][clave[i]]
+
+    def con_prefijo(self, prefijo):
+        """Formas originales de las palabras que empiezan con `prefijo` (en cualquier orden)."""
+        nodo = self._nodo(prefijo.upper())
+        if nodo is None:
+            return
+        pila = [nodo]
+        while pila:
+            nodo = pila.pop()
+            for caracter, hijo in nodo.items():
+                if caracter == _FIN:
+                    yield hijo
+                else:
+                    pila.append(hijo)
+
+
+def identificadores_declarados(tokens):
+    """Nombres declarados con DEFINA (DEFINA a, b COMO TIPO) en una secuencia de tokens."""
+    declarados = set()
+    linea_defina = None
+    for token in tokens:
+        if token.type == "DEFINA":
+            linea_defina = token.line
+        elif linea_defina is not None:
+            if token.type == "ID" and token.line == linea_defina:
+                declarados.add(token.value)
+            elif token.type != "COMA" or token.line != linea_defina:
+                linea_defina = None
+    return declarados
+
+
+class IndiceAutocompletado:
+    """Palabras clave fijas más los identificadores del programa, con su frecuencia de uso."""
+    def __init__(self, palabras_clave=AUTOCOMPLETE_SUGGESTIONS, max_sugerencias=MAX_SUGERENCIAS):
+        self.max_sugerencias = max_sugerencias
+        self._trie = TriePrefijos(palabras_clave)
+        self._palabras_clave = frozenset(p.upper() for p in palabras_clave)
+        self._identificadores = set()
+        self._usos = Counter()     # {PALABRA: apariciones en el programa}
+        self._elegidas = Counter() # {PALABRA: veces elegida del popup}
+        self.latencias = deque(maxlen=MUESTRAS_LATENCIA)
+
+    def actualizar_programa(self, tokens):
+        """Toma los identificadores declarados y la frecuencia de cada palabra de los tokens del programa."""
+        declarados = identificadores_declarados(tokens)
+        for nombre in self._identificadores - declarados:
+            if nombre.upper() not in self._palabras_clave:
+                self._trie.eliminar(nombre)
+        for nombre in declarados - self._identificadores:
+            self._trie.insertar(nombre)
+        self._identificadores = declarados
+        self._usos = Counter(token.value.upper() for token in tokens if token.value[:1].isalpha())
+
+    def frecuencia(self, palabra):
+        clave = palabra.upper()
+        return self._usos[clave] + PESO_ELEGIDA * self._elegidas[clave]
+
+    def sugerencias(self, prefijo):
+        """Hasta max_sugerencias palabras que empiezan con `prefijo`, las más usadas primero."""
+        clave = prefijo.upper()
+        usos, elegidas = self._usos, self._elegidas
+        def orden(palabra):
+            clave_palabra = palabra.upper()
+            return -(usos[clave_palabra] + PESO_ELEGIDA * elegidas[clave_palabra]), clave_palabra
+        candidatas = (p for p in self._trie.con_prefijo(prefijo) if p.upper() != clave)
+        return heapq.nsmallest(self.max_sugerencias, candidatas, key=orden)
+
+    def registrar_eleccion(self, palabra):
+        self._elegidas[palabra.upper()] += 1
+
+    def registrar_latencia(self, segundos):
+        self.latencias.append(segundos)
+
+    def estadisticas(self):
+        """{"teclas", "p50_ms", "p99_ms"} de la latencia de sugerencias por tecla."""
+        if not self.latencias:
+            return {"teclas": 0, "p50_ms": None, "p99_ms": None}
+        ordenadas = sorted(self.latencias)
+        def ms(p):
+            return round(ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))] * 1000, 3)
+        return {"teclas": len(ordenadas), "p50_ms": ms(50), "p99_ms": ms(99)}
+
+
+if __name__ == '__main__':
+    # Latencia por tecla del trie frente a recorrer la lista con startswith, con las palabras
+    # clave más 5000 identificadores declarados. Ejecutar desde pseint_colombiano/ (python -m utils.autocompletado).
+    import random
+    from core.lexer import Lexer
+
+    nombres = [f"{raiz}{i}" for i, raiz in zip(range(5000), ["contador", "suma", "total", "nota", "valor"] * 1000)]
+    codigo = "ALGORITMO Prueba\n" + "".join(f"    DEFINA {n} COMO ENTERO\n" for n in nombres) \
+             + "    MUESTRE suma6, suma6, nota8\nFINALGORITMO\n"
+    tokens, _ = Lexer(codigo).tokenize()
+
+    indice = IndiceAutocompletado()
+    inicio = time.perf_counter()
+    indice.actualizar_programa(tokens)
+    print(f"Índice con {len(indice._trie)} palabras en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    print(f"'su'  -> {indice.sugerencias('su')[:4]}")
+    indice.registrar_eleccion("SUBPROCESO")
+    print(f"'su'  -> {indice.sugerencias('su')[:4]} (después de elegir SUBPROCESO)")
+    print(f"'MUE' -> {indice.sugerencias('mue')}")
+
+    # La búsqueda lineal cuesta lo mismo con cualquier prefijo; el trie, según cuántas palabras empiezan con él
+    lista = AUTOCOMPLETE_SUGGESTIONS + nombres
+    def lineal(prefijo):
+        prefijo = prefijo.upper()
+        return heapq.nsmallest(MAX_SUGERENCIAS, (s for s in lista if s.upper().startswith(prefijo)),
+                               key=lambda p: (-indice.frecuencia(p), p.upper()))
+    palabras = random.Random(1).choices(nombres + AUTOCOMPLETE_SUGGESTIONS, k=300)
+    for nombre, buscar in (("lista + startswith", lineal), ("trie", indice.sugerencias)):
+        tiempos = {}
+        for palabra in palabras:
+            for largo in range(2, len(palabra) + 1): # Una búsqueda por tecla mientras se escribe
+                inicio = time.perf_counter()
+                buscar(palabra[:largo])
+                tiempos.setdefault(min(largo, 4), []).append(time.perf_counter() - inicio)
+        partes = []
+        for largo, muestras in sorted(tiempos.items()):
+            muestras.sort()
+            partes.append(f"{largo}{'+' if largo == 4 else ''} letras p50 {muestras[len(muestras) // 2] * 1000:.3f} ms")
+        print(f"{nombre:>18}: {', '.join(partes)}")
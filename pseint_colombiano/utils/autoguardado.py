@@ -0,0 +1,345 @@
+# pseint_colombiano/utils/autoguardado.py
+"""
+Autoguardado en segundo plano con un diario de ediciones, para recuperar el
+trabajo si la aplicación se cierra mal (un programa colgado, un corte de luz).
+
+Cada documento con cambios sin guardar tiene en el directorio de recuperación:
+    <id>.base         JSON {ruta, pid, generacion, instante, texto}, escrito
+                      de forma atómica (temporal + rename);
+    <id>.<g>.diario   las ediciones posteriores a la base de generación g, una
+                      línea JSON por delta [inicio, fin, texto]: reemplazar
+                      texto[inicio:fin] por `texto`.
+
+anotar(texto) no espera: deja el texto como pendiente (el más nuevo gana) y un
+hilo calcula el delta contra lo último anotado y lo agrega al diario. Cuando el
+diario pasa de MAX_BYTES_DIARIO, o un delta es casi todo el texto, se compacta:
+base nueva con generación g + 1 y se borra el diario viejo. Si la aplicación
+muere entre las dos cosas, recuperar usa solo el diario de la generación de la
+base, así que nunca aplica deltas a la base equivocada.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+from utils.file_handler import escribir_atomico
+
+DIRECTORIO_RECUPERACION = os.path.join(os.path.expanduser("~"), ".pseudocol", "recuperacion")
+# Tamaño del diario a partir del cual se compacta en una base nueva
+MAX_BYTES_DIARIO = 64 * 1024
+
+
+def calcular_delta(anterior, nuevo):
+    """(inicio, fin, texto) tal que anterior[:inicio] + texto + anterior[fin:] == nuevo; None si son iguales."""
+    if anterior == nuevo:
+        return None
+    limite = min(len(anterior), len(nuevo))
+    # Búsqueda binaria del prefijo y del sufijo comunes: cada comparación de rebanadas corre en C
+    bajo, alto = 0, limite
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if anterior[bajo:medio] == nuevo[bajo:medio]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    inicio = bajo
+    bajo, alto = 0, limite - inicio
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if anterior[len(anterior) - medio:len(anterior) - bajo] == nuevo[len(nuevo) - medio:len(nuevo) - bajo]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return inicio, len(anterior) - bajo, nuevo[inicio:len(nuevo) - bajo]
+
+
+def aplicar_delta(texto, delta):
+    inicio, fin, reemplazo = delta
+    return texto[:inicio] + reemplazo + texto[fin:]
+
+
+def _proceso_vivo(pid):
+    """True si el proceso `pid` sigue corriendo (su documento no se puede recuperar: aún es suyo)."""
+    if pid == os.getpid():
+        return True
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        manejador = kernel32.OpenProcess(0x1000, False, pid) # PROCESS_QUERY_LIMITED_INFORMATION
+        if not manejador:
+            return False
+        codigo = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(manejador, ctypes.byref(codigo))
+        kernel32.CloseHandle(manejador)
+        return codigo.value == 259 # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError: # Existe, pero es de otro usuario
+        return True
+    return True
+
+
+class BufferRecuperado:
+    """Documento con cambios sin guardar de una sesión que no cerró bien."""
+    __slots__ = ("identificador", "ruta", "texto", "instante")
+
+    def __init__(self, identificador, ruta, texto, instante):
+        self.identificador = identificador
+        self.ruta = ruta # None si nunca se guardó
+        self.texto = texto
+        self.instante = instante # time.time() de la última edición anotada
+
+    def __repr__(self):
+        return f"BufferRecuperado({self.identificador!r}, ruta={self.ruta!r}, {len(self.texto)} caracteres)"
+
+
+def leer_buffer(identificador, directorio=DIRECTORIO_RECUPERACION):
+    """Base más su diario. Una última línea cortada (la aplicación murió escribiéndola) se ignora."""
+    with open(os.path.join(directorio, f"{identificador}.base"), encoding="utf-8") as f:
+        base = json.load(f)
+    texto, instante = base["texto"], base["instante"]
+    diario = os.path.join(directorio, f"{identificador}.{base['generacion']}.diario")
+    if os.path.exists(diario):
+        instante = max(instante, os.path.getmtime(diario))
+        with open(diario, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    texto = aplicar_delta(texto, json.loads(linea))
+                except ValueError:
+                    break
+    return BufferRecuperado(identificador, base["ruta"], texto, instante)
+
+
+def buffers_recuperables(directorio=DIRECTORIO_RECUPERACION):
+    """Documentos de sesiones que ya no corren, el más reciente primero. Los ilegibles se omiten."""
+    if not os.path.isdir(directorio):
+        return []
+    buffers = []
+    for nombre in os.listdir(directorio):
+        if not nombre.endswith(".base"):
+            continue
+        identificador = nombre[:-len(".base")]
+        try:
+            with open(os.path.join(directorio, nombre), encoding="utf-8") as f:
+                pid = json.load(f)["pid"]
+            if not _proceso_vivo(pid):
+                buffers.append(leer_buffer(identificador, directorio))
+        except (OSError, ValueError, KeyError):
+            continue
+    buffers.sort(key=lambda buffer: buffer.instante, reverse=True)
+    return buffers
+
+
+def descartar_buffer(identificador, directorio=DIRECTORIO_RECUPERACION):
+    """Borra la base y los diarios de `identificador`."""
+    if not os.path.isdir(directorio):
+        return
+    for nombre in os.listdir(directorio):
+        if nombre == f"{identificador}.base" or (nombre.startswith(f"{identificador}.") and nombre.endswith(".diario")):
+            try:
+                os.remove(os.path.join(directorio, nombre))
+            except OSError:
+                pass
+
+
+class Autoguardado:
+    """
+    Diario del documento abierto. `ruta` es la del archivo (None si no tiene);
+    se guarda en la base para restaurarlo con su nombre. Los errores de disco
+    no llegan a quien edita: quedan en `ultimo_error`.
+    """
+    def __init__(self, directorio=DIRECTORIO_RECUPERACION, max_bytes_diario=MAX_BYTES_DIARIO):
+        self.directorio = directorio
+        self.max_bytes_diario = max_bytes_diario
+        self.identificador = f"{os.getpid()}-{int(time.time() * 1000)}"
+        self.ruta = None
+        self._condicion = threading.Condition()
+        self._pendiente = None     # (texto, ruta) aún sin anotar
+        self._descartar = False    # Borrar el diario antes de anotar lo pendiente
+        self._heredado = None      # Identificador de un BufferRecuperado que se borra al escribir la base
+        self._trabajando = False
+        self._cerrado = False
+        self._hilo = None
+        # Solo los usa el hilo trabajador
+        self._texto = None         # Texto de la base más el diario actual (None: sin base)
+        self._ruta_base = None
+        self._generacion = 0
+        self._diario = None
+        self.deltas_anotados = 0
+        self.compactaciones = 0
+        self.ultimo_error = None
+
+    def anotar(self, texto):
+        """Agrega el texto actual al diario en segundo plano. Nunca espera a disco."""
+        with self._condicion:
+            self._pendiente = (texto, self.ruta)
+            self._despertar()
+
+    def adoptar(self, buffer):
+        """Continúa el diario de un BufferRecuperado ya restaurado en el editor; el suyo se borra después."""
+        with self._condicion:
+            self.ruta = buffer.ruta
+            self._pendiente = (buffer.texto, buffer.ruta)
+            self._heredado = buffer.identificador
+            self._despertar()
+
+    def descartar(self):
+        """El documento se guardó (o se descartaron sus cambios): borra su diario."""
+        with self._condicion:
+            self._pendiente = None
+            self._descartar = True
+            self._despertar()
+
+    def esperar(self, tiempo_maximo=None):
+        """Espera a que el diario quede al día (para pruebas y para cerrar). Devuelve False si se agotó el tiempo."""
+        limite = None if tiempo_maximo is None else time.monotonic() + tiempo_maximo
+        with self._condicion:
+            while self._pendiente is not None or self._descartar or self._trabajando:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._condicion.wait(restante)
+        return True
+
+    def cerrar(self, descartar=False):
+        """Termina el hilo (después de anotar lo pendiente). Con descartar=True borra antes el diario."""
+        if descartar:
+            self.descartar()
+        self.esperar(tiempo_maximo=2.0)
+        with self._condicion:
+            self._cerrado = True
+            self._condicion.notify_all()
+
+    def _despertar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._trabajar, name="autoguardado", daemon=True)
+            self._hilo.start()
+        self._condicion.notify_all()
+
+    def _trabajar(self):
+        while True:
+            with self._condicion:
+                while self._pendiente is None and not self._descartar and not self._cerrado:
+                    self._condicion.wait()
+                if self._cerrado and self._pendiente is None and not self._descartar:
+                    self._cerrar_diario()
+                    return
+                pendiente, descartar, heredado = self._pendiente, self._descartar, self._heredado
+                self._pendiente, self._descartar, self._heredado = None, False, None
+                self._trabajando = True
+            try:
+                if descartar:
+                    self._borrar()
+                if pendiente is not None:
+                    self._anotar(*pendiente)
+                    if heredado is not None:
+                        descartar_buffer(heredado, self.directorio)
+            except Exception as e: # Disco lleno, sin permisos, texto que no se puede codificar...
+                # El hilo sigue vivo: se reintenta (con una base nueva) en la próxima edición
+                self.ultimo_error = e
+                self._texto = None
+            finally:
+                with self._condicion:
+                    self._trabajando = False
+                    self._condicion.notify_all()
+
+    def _anotar(self, texto, ruta):
+        if self._texto is None or ruta != self._ruta_base:
+            self._compactar(texto, ruta)
+            return
+        delta = calcular_delta(self._texto, texto)
+        if delta is None:
+            return
+        if len(delta[2]) > len(texto) // 2 or self._diario.tell() > self.max_bytes_diario:
+            self._compactar(texto, ruta) # Un delta casi tan grande como el texto no ahorra nada
+            return
+        self._diario.write(json.dumps(delta, ensure_ascii=False) + "\n")
+        self._diario.flush()
+        os.fsync(self._diario.fileno())
+        self._texto = texto
+        self.deltas_anotados += 1
+
+    def _compactar(self, texto, ruta):
+        """Base nueva (atómica) y diario vacío de la generación siguiente; después se borra el diario viejo."""
+        os.makedirs(self.directorio, exist_ok=True)
+        anterior = self._ruta_diario() if self._texto is not None else None
+        self._cerrar_diario()
+        self._generacion += 1
+        base = {"ruta": ruta, "pid": os.getpid(), "generacion": self._generacion,
+                "instante": time.time(), "texto": texto}
+        escribir_atomico(os.path.join(self.directorio, f"{self.identificador}.base"),
+                         json.dumps(base, ensure_ascii=False))
+        self._diario = open(self._ruta_diario(), "w", encoding="utf-8", newline="\n")
+        if anterior is not None and os.path.exists(anterior):
+            os.remove(anterior)
+        self._texto = texto
+        self._ruta_base = ruta
+        self.compactaciones += 1
+
+    def _borrar(self):
+        self._cerrar_diario()
+        self._texto = None
+        descartar_buffer(self.identificador, self.directorio)
+
+    def _cerrar_diario(self):
+        if self._diario is not None:
+            self._diario.close()
+            self._diario = None
+
+    def _ruta_diario(self):
+        return os.path.join(self.directorio, f"{self.identificador}.{self._generacion}.diario")
+
+
+if __name__ == '__main__':
+    # Un alumno escribe 3000 caracteres sobre un programa de 3000 líneas: cuánto espera cada
+    # anotar() frente a reescribir el archivo entero como antes, cuánto ocupa el diario y si el
+    # documento se recupera igual. Ejecutar desde pseint_colombiano/ (python -m utils.autoguardado).
+    import random
+    import shutil
+    import tempfile
+
+    directorio = tempfile.mkdtemp()
+    lineas = [f"    MUESTRE \"Línea {i}\", x" for i in range(3000)]
+    texto = "ALGORITMO Grande\n" + "\n".join(lineas) + "\nFINALGORITMO\n"
+    autoguardado = Autoguardado(directorio)
+    autoguardado.ruta = os.path.join(directorio, "grande.pseudocol")
+    azar = random.Random(1)
+
+    esperas, escrituras = [], []
+    for tecla in range(3000):
+        posicion = azar.randrange(len(texto)) if tecla % 40 == 0 else posicion + 1
+        texto = texto[:posicion] + "x" + texto[posicion:]
+        inicio = time.perf_counter()
+        autoguardado.anotar(texto)
+        esperas.append(time.perf_counter() - inicio)
+        if tecla % 100 == 0: # Guardado completo como antes, una vez cada 100 teclas para no tardar tanto
+            inicio = time.perf_counter()
+            with open(autoguardado.ruta, "w", encoding="utf-8") as f:
+                f.write(texto)
+                f.flush()
+                os.fsync(f.fileno())
+            escrituras.append(time.perf_counter() - inicio)
+        if tecla % 10 == 0:
+            time.sleep(0.001)
+    autoguardado.esperar()
+    esperas.sort()
+    escrituras.sort()
+    bytes_diario = sum(os.path.getsize(os.path.join(directorio, n)) for n in os.listdir(directorio) if n.endswith(".diario"))
+    print(f"anotar(): p50 {esperas[len(esperas) // 2] * 1e6:.1f} µs, máx {esperas[-1] * 1000:.2f} ms "
+          f"(guardar el archivo entero: p50 {escrituras[len(escrituras) // 2] * 1000:.2f} ms)")
+    print(f"{autoguardado.deltas_anotados} deltas, {autoguardado.compactaciones} compactaciones, "
+          f"diario de {bytes_diario / 1024:.1f} KiB para un texto de {len(texto) / 1024:.0f} KiB")
+
+    # Simula una caída: el proceso del diario "ya no existe"
+    autoguardado._cerrar_diario()
+    base = os.path.join(directorio, f"{autoguardado.identificador}.base")
+    with open(base, encoding="utf-8") as f:
+        contenido = json.load(f)
+    contenido["pid"] = 2 ** 22 + 1
+    escribir_atomico(base, json.dumps(contenido))
+    recuperados = buffers_recuperables(directorio)
+    print(f"Recuperado: {recuperados}, idéntico: {recuperados[0].texto == texto}")
+    shutil.rmtree(directorio)
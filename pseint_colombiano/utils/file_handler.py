@@ -2,18 +2,82 @@
 """
 Utilidades para manejar la carga y guardado de archivos de pseudocódigo.
 """
+import io
+import os
+import shutil
 import tkinter as tk
 from tkinter import filedialog
 
 FILE_EXTENSION = ".pseudocol"
 FILE_TYPES = [("Archivos PseudoCol", f"*{FILE_EXTENSION}"), ("Todos los archivos", "*.*")]
+# Caracteres por parte al leer un archivo por partes (leer_por_partes)
+CARACTERES_POR_PARTE = 256 * 1024
 
-def abrir_archivo():
-    """Abre un diálogo para seleccionar un archivo y devuelve su contenido y ruta."""
+def elegir_archivo_para_abrir(ventana_padre=None):
+    """Abre un diálogo para seleccionar un archivo y devuelve su ruta (None si se canceló)."""
     filepath = filedialog.askopenfilename(
         defaultextension=FILE_EXTENSION,
-        filetypes=FILE_TYPES
+        filetypes=FILE_TYPES,
+        parent=ventana_padre
     )
+    return filepath or None
+
+def leer_por_partes(filepath, caracteres=CARACTERES_POR_PARTE):
+    """
+    Generador de (texto, fraccion_leida) con el contenido del archivo en partes
+    de hasta `caracteres` caracteres, con los saltos de línea normalizados como
+    open() en modo texto. Los errores de lectura o de decodificación se propagan.
+    """
+    with open(filepath, "rb") as binario:
+        total = os.fstat(binario.fileno()).st_size or 1
+        texto = io.TextIOWrapper(binario, encoding="utf-8")
+        while True:
+            parte = texto.read(caracteres)
+            if not parte:
+                break
+            yield parte, min(1.0, binario.tell() / total)
+
+def escribir_atomico(filepath, contenido):
+    """
+    Escribe `contenido` en un temporal junto a `filepath` y lo renombra encima:
+    si algo falla a mitad (o se cae la aplicación), el archivo anterior queda intacto.
+    El archivo conserva los permisos que tenía.
+    """
+    temporal = f"{filepath}.~{os.getpid()}.tmp"
+    try:
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(contenido)
+            f.flush()
+            os.fsync(f.fileno())
+        try: # El temporal nace con los permisos de la umask, no con los del original
+            shutil.copymode(filepath, temporal)
+        except FileNotFoundError:
+            pass # Archivo nuevo
+        os.replace(temporal, filepath)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    _sincronizar_directorio(os.path.dirname(os.path.abspath(filepath)))
+
+def _sincronizar_directorio(directorio):
+    """En POSIX el renombrado vive en el directorio: sin su fsync, un corte de energía puede deshacerlo."""
+    if os.name != "posix":
+        return # En Windows no se puede abrir un directorio para fsync
+    try:
+        descriptor = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass # Algunos sistemas de archivos no lo admiten; el archivo ya quedó reemplazado
+    finally:
+        os.close(descriptor)
+
+def abrir_archivo():
+    """Abre un diálogo para seleccionar un archivo y devuelve su contenido y ruta."""
+    filepath = elegir_archivo_para_abrir()
     if not filepath:
         return None, None
     try:
@@ -35,8 +99,7 @@ def guardar_archivo_como(contenido_actual, ventana_padre=None):
     if not filepath:
         return None
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(contenido_actual)
+        escribir_atomico(filepath, contenido_actual)
         return filepath
     except Exception as e:
         print(f"Error al guardar archivo: {e}")
@@ -47,8 +110,7 @@ def guardar_archivo(filepath, contenido_actual, ventana_padre=None):
     if not filepath:
         return guardar_archivo_como(contenido_actual, ventana_padre)
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(contenido_actual)
+        escribir_atomico(filepath, contenido_actual)
         return filepath
     except Exception as e:
         print(f"Error al guardar archivo: {e}")
@@ -1,144 +1,318 @@
 # pseint_colombiano/utils/syntax_highlighter.py
 """
-Módulo para el resaltado de sintaxis básico en un CTkTextbox.
+Resaltado de sintaxis incremental para un CTkTextbox (o un tk.Text).
+
+Cada pasada compara el texto con el de la pasada anterior y vuelve a etiquetar
+solo las líneas que cambiaron: el prefijo y el sufijo comunes conservan sus
+etiquetas, que Tk desplaza junto con el texto. Las líneas visibles se etiquetan
+de inmediato; el resto, en tramos cortos cuando la interfaz está ociosa.
+
+Los tokens son los del Lexer del intérprete (con comentarios): lo que se
+resalta es exactamente lo que el parser va a ver. Ningún token cruza líneas
+(las cadenas no pueden contener saltos: una comilla sin cerrar es ERROR), así
+que se guardan por línea y tokens() los reutiliza para el autocompletado sin
+volver a tokenizar lo ya etiquetado. Los diagnósticos no los usan: el análisis
+de fondo (core/analisis_fondo.py) tokeniza su propia copia del texto en otro
+hilo, y tokens() reescribe token.line en estos mismos objetos.
+
+Los índices son "línea.columna" (no "1.0+Nc", que Tk resuelve recorriendo el
+texto) y cada etiqueta se agrega con una sola llamada por tramo, con todos sus
+rangos. Cambiar de tema solo cambia los colores de las etiquetas.
 """
-import re
+import time
 from core.keywords_col import PALABRAS_CLAVE # Ajusta la importación según tu estructura
+from core.lexer import Lexer, Token, mensaje_error_lexico
+
+# Colores de cada etiqueta por tema
+COLORES_TEMA = {
+    "light": {
+        "keyword": "#0000FF",      # Azul para palabras clave
+        "comment": "#008000",      # Verde para comentarios
+        "string": "#A31515",       # Rojo oscuro para cadenas
+        "number": "#098658",       # Verde azulado para números
+        "type": "#2B91AF",         # Cian para tipos de dato
+        "function_def": "#795E26", # Marrón para def de función/algoritmo
+    },
+    "dark": {
+        "keyword": "#569CD6",
+        "comment": "#6A9955",
+        "string": "#CE9178",
+        "number": "#B5CEA8",
+        "type": "#4EC9B0",
+        "function_def": "#DCDCAA",
+    },
+}
+ETIQUETAS = tuple(COLORES_TEMA["light"])
+
+# Etiqueta de cada tipo de token; las demás palabras clave van con "keyword"
+ETIQUETA_POR_TIPO = {
+    "COMENTARIO": "comment",
+    "CADENA": "string",
+    "NUMERO_ENTERO": "number",
+    "NUMERO_REAL": "number",
+    "ALGORITMO": "function_def", # También PROCESO
+    "FUNCION": "function_def",   # También SUBPROCESO
+}
+ETIQUETA_POR_TIPO.update((tipo, "type") for tipo in PALABRAS_CLAVE.values() if tipo.startswith("TIPO_"))
+TIPOS_PALABRA_CLAVE = frozenset(PALABRAS_CLAVE.values())
+
+# Duración máxima de cada tramo en segundo plano (segundos) y líneas etiquetadas entre mediciones del reloj
+TIEMPO_POR_TRAMO = 0.008
+LINEAS_POR_LOTE = 100
+
 
 class SyntaxHighlighter:
-    def __init__(self, textbox):
+    def __init__(self, textbox, tema="light"):
         self.textbox = textbox
-        self.configure_tags()
-        self.patterns = self._build_patterns()
-
-    def configure_tags(self):
-        """Configura los tags de color para el resaltado."""
-        # Colores para tema claro (puedes ajustarlos)
-        self.textbox.tag_config("keyword", foreground="#0000FF") # Azul para palabras clave
-        self.textbox.tag_config("comment", foreground="#008000") # Verde para comentarios
-        self.textbox.tag_config("string", foreground="#A31515")  # Rojo oscuro para cadenas
-        self.textbox.tag_config("number", foreground="#098658")  # Verde azulado para números
-        self.textbox.tag_config("type", foreground="#2B91AF")    # Cian para tipos de dato
-        self.textbox.tag_config("function_def", foreground="#795E26") # Marrón para def de función/algoritmo
-        
-        # TODO: Añadir colores específicos para tema oscuro y cambiar dinámicamente
-
-    def _build_patterns(self):
-        """Construye los patrones regex para el resaltado."""
-        # Construir regex para palabras clave, asegurando que sean palabras completas (word boundaries \b)
-        # Hacerlo insensible a mayúsculas y minúsculas con (?i)
-        keywords_plain = [kw for kw in PALABRAS_CLAVE.keys() if not PALABRAS_CLAVE[kw].startswith("TIPO_") and kw not in ["ALGORITMO", "PROCESO", "FUNCION", "SUBPROCESO"]]
-        keyword_pattern = r"(?i)\b(" + "|".join(keywords_plain) + r")\b"
-        
-        types_plain = [kw for kw, token_name in PALABRAS_CLAVE.items() if token_name.startswith("TIPO_")]
-        type_pattern = r"(?i)\b(" + "|".join(types_plain) + r")\b"
-
-        # Patrón para ALGORITMO, PROCESO, FUNCION, SUBPROCESO
-        func_def_keywords = ["ALGORITMO", "PROCESO", "FUNCION", "SUBPROCESO"]
-        func_def_pattern = r"(?i)\b(" + "|".join(func_def_keywords) + r")\b"
-
-        comment_pattern = r"//[^\n]*"
-        string_pattern = r'"[^"]*"|\'[^\']*\''
-        number_pattern = r"\b\d+\.?\d*\b|\b\.\d+\b" # Números enteros y reales
-
-        return {
-            "keyword": re.compile(keyword_pattern),
-            "type": re.compile(type_pattern),
-            "function_def": re.compile(func_def_pattern),
-            "comment": re.compile(comment_pattern),
-            "string": re.compile(string_pattern),
-            "number": re.compile(number_pattern),
-        }
+        # CTkTextbox.tag_add acepta un solo rango; el tk.Text interno acepta todos los de una etiqueta
+        self._texto_tk = getattr(textbox, "_textbox", textbox)
+        self._texto = ""             # Contenido de la última pasada
+        self._lineas = [""]          # El mismo contenido, por línea
+        self._tokens = [[]]          # Tokens de cada línea (None si falta tokenizarla)
+        self._pendientes = bytearray(1) # 1 en las líneas que falta etiquetar
+        self._cantidad_pendientes = 0
+        self._programado = None      # id del tramo en segundo plano (after_idle)
+        self.suspendido = False      # Sin tramos en segundo plano (ej. mientras se carga un archivo)
+        self.configure_tags(tema)
+
+    def configure_tags(self, tema="light"):
+        """Configura los colores de las etiquetas para el tema ("light" o "dark")."""
+        for etiqueta, color in COLORES_TEMA.get(tema, COLORES_TEMA["light"]).items():
+            self._texto_tk.tag_config(etiqueta, foreground=color)
+
+    @property
+    def pendientes(self):
+        """Líneas que aún falta etiquetar."""
+        return self._cantidad_pendientes
 
     def highlight(self, event=None):
-        """Aplica el resaltado de sintaxis al contenido del textbox."""
-        content = self.textbox.get("1.0", "end-1c")
-        
-        # Limpiar tags existentes para evitar solapamientos incorrectos
-        for tag in self.patterns.keys():
-            self.textbox.tag_remove(tag, "1.0", "end")
-
-        # Aplicar tags según los patrones, de más específico a más general
-        # o manejar el orden para que no se pisen mal.
-        # Los comentarios deben ir primero para que no se resalten keywords dentro de ellos.
-        self._apply_tag_for_pattern(content, "comment", self.patterns["comment"])
-        self._apply_tag_for_pattern(content, "string", self.patterns["string"])
-        self._apply_tag_for_pattern(content, "keyword", self.patterns["keyword"])
-        self._apply_tag_for_pattern(content, "type", self.patterns["type"])
-        self._apply_tag_for_pattern(content, "function_def", self.patterns["function_def"])
-        self._apply_tag_for_pattern(content, "number", self.patterns["number"])
-
-    def _apply_tag_for_pattern(self, content, tag_name, pattern):
-        for match in pattern.finditer(content):
-            start_index = f"1.0+{match.start()}c"
-            end_index = f"1.0+{match.end()}c"
-            self.textbox.tag_add(tag_name, start_index, end_index)
+        """Etiqueta las líneas cambiadas que están a la vista y programa el resto."""
+        self._sincronizar()
+        if self._cantidad_pendientes:
+            self._resaltar_visibles()
+        if self._cantidad_pendientes and self._programado is None and not self.suspendido:
+            self._programado = self._texto_tk.after_idle(self._continuar)
 
-    def update_highlighting_for_theme(self, theme_mode):
-        """Actualiza los colores de los tags según el tema."""
-        if theme_mode == "dark":
-            self.textbox.tag_config("keyword", foreground="#569CD6")
-            self.textbox.tag_config("comment", foreground="#6A9955")
-            self.textbox.tag_config("string", foreground="#CE9178")
-            self.textbox.tag_config("number", foreground="#B5CEA8")
-            self.textbox.tag_config("type", foreground="#4EC9B0")
-            self.textbox.tag_config("function_def", foreground="#DCDCAA")
-        else: # light
-            self.textbox.tag_config("keyword", foreground="#0000FF")
-            self.textbox.tag_config("comment", foreground="#008000")
-            self.textbox.tag_config("string", foreground="#A31515")
-            self.textbox.tag_config("number", foreground="#098658")
-            self.textbox.tag_config("type", foreground="#2B91AF")
-            self.textbox.tag_config("function_def", foreground="#795E26")
-        
-        # Reaplicar el resaltado para que los nuevos colores tomen efecto en el texto existente
+    def suspender(self):
+        """Deja de etiquetar en segundo plano; highlight() solo atiende lo visible hasta reanudar()."""
+        self.suspendido = True
+        if self._programado is not None:
+            self._texto_tk.after_cancel(self._programado)
+            self._programado = None
+
+    def reanudar(self):
+        self.suspendido = False
         self.highlight()
 
+    def _sincronizar(self):
+        """Marca como pendientes las líneas que difieren de la pasada anterior."""
+        # Sin copiar el texto si Tk no registró cambios desde la última vez (importa en archivos grandes)
+        if not self._texto_tk.edit_modified():
+            return
+        self._texto_tk.edit_modified(False)
+        texto = self._texto_tk.get("1.0", "end-1c")
+        if texto == self._texto:
+            return
+        lineas = texto.split("\n")
+        anteriores = self._lineas
+        comunes = min(len(lineas), len(anteriores))
+        inicio = 0
+        while inicio < comunes and lineas[inicio] == anteriores[inicio]:
+            inicio += 1
+        fin = 0 # Líneas iguales al final (sin volver a contar las del prefijo)
+        while fin < comunes - inicio and lineas[-1 - fin] == anteriores[-1 - fin]:
+            fin += 1
+        # lineas[inicio:-fin] reemplazan a anteriores[inicio:-fin]
+        reemplazadas = slice(inicio, len(anteriores) - fin)
+        nuevas = len(lineas) - fin - inicio
+        self._cantidad_pendientes += nuevas - self._pendientes[reemplazadas].count(1)
+        self._pendientes[reemplazadas] = b"\x01" * nuevas
+        self._tokens[reemplazadas] = [None] * nuevas
+        self._texto, self._lineas = texto, lineas
+
+    def _resaltar_visibles(self):
+        texto_tk = self._texto_tk
+        primera = int(texto_tk.index("@0,0").split(".")[0]) - 1
+        ultima = int(texto_tk.index(f"@0,{texto_tk.winfo_height()}").split(".")[0])
+        for desde, hasta in self._tramos_pendientes(primera, ultima):
+            self._etiquetar(desde, hasta)
+
+    def _continuar(self):
+        """Tramo en segundo plano: primero lo visible (pudo haberse desplazado), luego en orden."""
+        self._programado = None
+        limite = time.perf_counter() + TIEMPO_POR_TRAMO
+        self._sincronizar() # Por si el texto cambió sin pasar por highlight()
+        self._resaltar_visibles()
+        for desde, hasta in self._tramos_pendientes(0, len(self._pendientes)):
+            while desde < hasta and time.perf_counter() < limite:
+                lote = min(hasta, desde + LINEAS_POR_LOTE)
+                self._etiquetar(desde, lote)
+                desde = lote
+            if desde < hasta:
+                break
+        if self._cantidad_pendientes and not self.suspendido:
+            self._programado = self._texto_tk.after_idle(self._continuar)
+
+    def _tramos_pendientes(self, desde, hasta):
+        """Rangos [inicio, fin) de líneas pendientes consecutivas entre desde y hasta."""
+        pendientes = self._pendientes
+        hasta = min(hasta, len(pendientes))
+        while desde < hasta:
+            inicio = pendientes.find(1, desde, hasta)
+            if inicio < 0:
+                return
+            fin = pendientes.find(0, inicio, hasta)
+            fin = hasta if fin < 0 else fin
+            yield inicio, fin
+            desde = fin
+
+    def _etiquetar(self, desde, hasta):
+        """Tokeniza y vuelve a etiquetar las líneas desde..hasta-1 (base 0) con una llamada por etiqueta."""
+        tokens, _ = Lexer("\n".join(self._lineas[desde:hasta]), conservar_comentarios=True,
+                          linea_inicial=desde + 1).tokenize()
+        tokens.pop() # EOF
+        por_linea = [[] for _ in range(hasta - desde)]
+        rangos = {etiqueta: [] for etiqueta in ETIQUETAS}
+        etiqueta_de, palabras_clave = ETIQUETA_POR_TIPO.get, TIPOS_PALABRA_CLAVE
+        for token in tokens:
+            por_linea[token.line - desde - 1].append(token)
+            etiqueta = etiqueta_de(token.type)
+            if etiqueta is None:
+                # Solo las palabras: OP_MOD también es '%', OP_Y no es '&'
+                if token.type not in palabras_clave or not token.value[0].isalpha():
+                    continue
+                etiqueta = "keyword"
+            indices = rangos[etiqueta]
+            columna = token.column - 1
+            indices.append(f"{token.line}.{columna}")
+            indices.append(f"{token.line}.{columna + len(token.value)}")
+        self._tokens[desde:hasta] = por_linea
+        texto_tk = self._texto_tk
+        inicio, fin = f"{desde + 1}.0", f"{hasta}.end"
+        for etiqueta, indices in rangos.items():
+            texto_tk.tag_remove(etiqueta, inicio, fin)
+            if indices:
+                texto_tk.tag_add(etiqueta, *indices)
+        self._cantidad_pendientes -= self._pendientes[desde:hasta].count(1)
+        self._pendientes[desde:hasta] = bytes(hasta - desde)
+
+    def tokens(self):
+        """
+        (tokens, errores) de todo el texto, como los devuelve Lexer.tokenize() para el
+        parser: sin comentarios y con EOF. Solo se tokenizan las líneas que faltan.
+        Solo desde el hilo de Tk: corrige token.line en los tokens guardados.
+        """
+        self._sincronizar()
+        for desde, hasta in self._tramos_pendientes(0, len(self._pendientes)):
+            self._etiquetar(desde, hasta)
+        resultado, errores = [], []
+        agregar = resultado.append
+        for linea, tokens in enumerate(self._tokens, start=1):
+            for token in tokens:
+                token.line = linea
+                if token.type == "ERROR":
+                    errores.append(mensaje_error_lexico(token.value, linea, token.column))
+                elif token.type != "COMENTARIO":
+                    agregar(token)
+        agregar(self._token_eof())
+        return resultado, errores
+
+    def _token_eof(self):
+        """EOF en la posición en que lo pone Lexer: la del último lexema (espacios y saltos incluidos)."""
+        lineas = self._lineas
+        ultima = lineas[-1]
+        if not ultima:
+            if len(lineas) == 1:
+                return Token("EOF", "EOF", 1, 1)
+            return Token("EOF", "EOF", len(lineas), len(lineas[-2]) + 1) # El salto de línea final
+        sin_espacios = ultima.rstrip(" \t")
+        if len(sin_espacios) < len(ultima):
+            return Token("EOF", "EOF", len(lineas), len(sin_espacios) + 1)
+        tokens = self._tokens[-1]
+        if not tokens: # No debería pasar: todo carácter que no es espacio da un token (ERROR si no se reconoce)
+            return Token("EOF", "EOF", len(lineas), 1)
+        return Token("EOF", "EOF", len(lineas), tokens[-1].column)
+
+    def update_highlighting_for_theme(self, theme_mode):
+        """Cambia los colores según el tema; las etiquetas ya puestas no se recalculan."""
+        self.configure_tags(theme_mode)
+
+
 if __name__ == '__main__':
-    # Ejemplo de uso (requiere un root de CTk y un CTkTextbox)
-    import customtkinter as ctk
-
-    app = ctk.CTk()
-    app.geometry("600x400")
-    app.title("Syntax Highlighter Test")
-
-    ctk.set_appearance_mode("light") # o "dark"
-
-    textbox = ctk.CTkTextbox(app, font=("Consolas", 12), wrap="none")
-    textbox.pack(expand=True, fill="both", padx=10, pady=10)
-    
-    highlighter = SyntaxHighlighter(textbox)
-    textbox.bind("<KeyRelease>", highlighter.highlight) # Resaltar al soltar tecla
-
-    sample_code = """ALGORITMO MiPrueba
-    // Este es un comentario
-    DEFINA saludo COMO TEXTO
-    DEFINA numero COMO ENTERO
-    
-    saludo = "Hola, mundo!"
-    numero = 123 + 45.67
-    
-    MUESTRE saludo
-    MUESTRE numero
-    
-    SI numero > 100 ENTONCES
-        MUESTRE "Es grande"
-    SINO
-        MUESTRE "Es pequeño"
-    FINSI
-FINALGORITMO
-"""
-    textbox.insert("1.0", sample_code)
-    highlighter.highlight() # Resaltado inicial
+    # Latencia por tecla en un archivo de 3000 líneas: una pasada completa como la
+    # de antes (todo el texto, una llamada por token con índices "1.0+Nc") frente a
+    # la incremental, y tokens para el parser reutilizando los del resaltado.
+    # Necesita pantalla.
+    # Ejecutar desde la carpeta pseint_colombiano:
+    #   python -m utils.syntax_highlighter
+    import statistics
+    import tkinter as tk
+
+    raiz = tk.Tk()
+    raiz.geometry("900x700")
+    editor = tk.Text(raiz, font=("Consolas", 12), wrap="none", undo=True)
+    editor.pack(expand=True, fill="both")
+    raiz.update()
+
+    lineas = ["ALGORITMO Grande", "    DEFINA a, b COMO ENTERO", "    DEFINA s COMO TEXTO"]
+    for i in range(600):
+        lineas += [f"    // Bloque {i}", f"    a = (b * {i} + 3.5) % 97", '    s = "valor " + a',
+                   "    SI a > 48 ENTONCES", "        MUESTRE s"]
+    lineas.append("FINALGORITMO")
+    editor.insert("1.0", "\n".join(lineas))
+
+    resaltador = SyntaxHighlighter(editor)
+    inicio = time.perf_counter()
+    resaltador.highlight()
+    visible = time.perf_counter() - inicio
+    while resaltador.pendientes:
+        raiz.update()
+    print(f"Archivo de {len(lineas)} líneas: visible en {visible * 1000:.1f} ms, "
+          f"completo en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    def resaltar_completo():
+        contenido = editor.get("1.0", "end-1c")
+        for etiqueta in ETIQUETAS:
+            editor.tag_remove(etiqueta, "1.0", "end")
+        inicios = [0] # Posición de cada línea en el contenido
+        for numero, linea in enumerate(contenido.split("\n")):
+            inicios.append(inicios[numero] + len(linea) + 1)
+        for token in Lexer(contenido, conservar_comentarios=True).tokenize()[0][:-1]:
+            etiqueta = ETIQUETA_POR_TIPO.get(token.type)
+            if etiqueta is None and token.type in TIPOS_PALABRA_CLAVE and token.value[0].isalpha():
+                etiqueta = "keyword"
+            if etiqueta is not None:
+                inicio = inicios[token.line - 1] + token.column - 1
+                editor.tag_add(etiqueta, f"1.0+{inicio}c", f"1.0+{inicio + len(token.value)}c")
 
-    def toggle_theme():
-        current_mode = ctk.get_appearance_mode()
-        new_mode = "dark" if current_mode == "Light" else "light"
-        ctk.set_appearance_mode(new_mode)
-        highlighter.update_highlighting_for_theme(new_mode.lower())
+    def teclear(resaltar, teclas=100):
+        """Escribe en la mitad del archivo y mide lo que tarda el resaltado de cada tecla."""
+        editor.see("1500.0")
+        raiz.update()
+        tiempos = []
+        for i in range(teclas):
+            editor.insert(f"1500.{4 + i}", "x" if i % 5 else " ")
+            inicio = time.perf_counter()
+            resaltar()
+            tiempos.append(time.perf_counter() - inicio)
+            raiz.update()
+        tiempos.sort()
+        return statistics.median(tiempos), tiempos[int(len(tiempos) * 0.99) - 1]
 
+    for nombre, resaltar in (("Pasada completa", resaltar_completo), ("Incremental", resaltador.highlight)):
+        mediana, p99 = teclear(resaltar)
+        print(f"{nombre + ':':<17} mediana {mediana * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms por tecla")
 
-    theme_button = ctk.CTkButton(app, text="Cambiar Tema", command=toggle_theme)
-    theme_button.pack(pady=5)
+    inicio = time.perf_counter()
+    tokens, _ = resaltador.tokens()
+    reutilizados = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    iguales = [(t.type, t.value, t.line, t.column) for t in tokens] == \
+              [(t.type, t.value, t.line, t.column) for t in Lexer(editor.get("1.0", "end-1c")).tokenize()[0]]
+    print(f"Tokens para el parser: {reutilizados * 1000:.1f} ms reutilizando, "
+          f"{(time.perf_counter() - inicio) * 1000:.1f} ms tokenizando de nuevo (iguales: {iguales})")
 
-    app.mainloop()
\ No newline at end of file
+    inicio = time.perf_counter()
+    resaltador.update_highlighting_for_theme("dark")
+    print(f"Cambio de tema: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+    raiz.destroy()